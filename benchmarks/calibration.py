@@ -0,0 +1,85 @@
+"""
+Benchmark threshold calibration over a recorded practice session.
+
+Each simulated node records a trace of a pilot flying laps. The search is
+timed for a single node on the current process, then for the whole
+session through the executor pool.
+
+Usage: python benchmarks/calibration.py [nodes] [seconds] [grid size]
+"""
+
+import sys
+import time
+import asyncio
+
+import numpy as np
+
+from pulsarity.hardware import CalibrationTrace, SimulatedNode, calibrate
+from pulsarity.hardware.calibration import calibrate_traces
+from pulsarity.utils.executor import executor
+
+
+async def record_session(node_count: int, duration: float) -> list[CalibrationTrace]:
+    """
+    Record the RSSI traces of simulated nodes with their crossing counts
+    """
+    rng = np.random.default_rng(0)
+    traces = []
+
+    for index in range(node_count):
+        node = SimulatedNode(
+            index, lap_time=8.0, peak_rssi=110.0 + 10 * index, seed=index
+        )
+        # Keep every crossing of the session for counting, laps are at
+        # least a quarter of the mean lap time
+        node.retained_passes = int(4 * duration / node.lap_time) + 2
+        await node.connect()
+        start = asyncio.get_running_loop().time()
+
+        times = start + np.arange(int(duration * node.sample_rate)) / node.sample_rate
+        samples = np.array([node.signal_at(time) for time in times])
+        samples += rng.normal(0, node.noise, len(samples))
+
+        margin = 4 * node.pass_width
+        crossings = sum(
+            start + margin < time < times[-1] - margin for time in node.passes
+        )
+        traces.append(CalibrationTrace(index, index + 1, samples, crossings))
+
+    return traces
+
+
+async def main(node_count: int, duration: float, grid_size: int) -> None:
+    """
+    Run the benchmark
+    """
+    traces = await record_session(node_count, duration)
+    print(
+        f"Session: {node_count} nodes, {duration:.0f} s, "
+        f"{grid_size * grid_size} candidate pairs"
+    )
+
+    begin = time.perf_counter()
+    proposal = calibrate_traces(traces[:1], grid_size=grid_size)
+    print(f"Single node: {(time.perf_counter() - begin) * 1000:.1f} ms")
+    print(f"  {proposal}")
+
+    executor.set_executor()
+    begin = time.perf_counter()
+    result = await calibrate(traces, grid_size=grid_size)
+    elapsed = time.perf_counter() - begin
+    await executor.shutdown_executor()
+
+    errors = sum(proposal.error for proposal in result.nodes.values())
+    print(f"Session on executor pool: {elapsed * 1000:.1f} ms, total error {errors}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(
+        main(
+            int(args[0]) if len(args) > 0 else 8,
+            float(args[1]) if len(args) > 1 else 180.0,
+            int(args[2]) if len(args) > 2 else 64,
+        )
+    )
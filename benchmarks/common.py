@@ -0,0 +1,46 @@
+"""
+Shared setup for the benchmarks
+"""
+
+import contextlib
+from collections.abc import AsyncIterator
+
+from tortoise import Tortoise, connections
+
+from pulsarity.webserver import generate_app
+from pulsarity.extensions import PulsarityApp
+
+DB_CONFIG = {
+    "connections": {
+        "system": {
+            "engine": "tortoise.backends.sqlite",
+            "credentials": {"file_path": ":memory:"},
+        },
+        "event": {
+            "engine": "tortoise.backends.sqlite",
+            "credentials": {"file_path": ":memory:"},
+        },
+    },
+    "apps": {
+        "system": {"models": ["pulsarity.database"], "default_connection": "system"},
+        "event": {"models": ["pulsarity.database"], "default_connection": "event"},
+    },
+}
+
+
+@contextlib.asynccontextmanager
+async def benchmark_app() -> AsyncIterator[PulsarityApp]:
+    """
+    Start an application backed by in-memory databases
+
+    :yield: The started application with an active app context
+    """
+    await Tortoise.init(DB_CONFIG)
+    await Tortoise.generate_schemas()
+
+    app = generate_app(test_mode=True)
+    try:
+        async with app.test_app(), app.app_context():
+            yield app
+    finally:
+        await connections.close_all()
@@ -0,0 +1,79 @@
+"""
+Benchmark the database startup on the storage of the current directory,
+comparing the upgrade of unstamped databases with the version check of
+databases already upgraded. Run on the target hardware, such as the SD
+card of a timer, for meaningful results.
+
+Usage: python benchmarks/database_startup.py [restarts]
+"""
+
+import sys
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+from tortoise import Tortoise, connections
+
+from pulsarity.database import setup_default_objects
+from pulsarity.database.migrations import (
+    migrate_race_formats,
+    migrate_pilot_attributes,
+    outdated_connections,
+    stamp_connections,
+)
+from pulsarity.database.tuning import SQLITE_ENGINE
+
+
+async def startup(directory: Path, check: bool) -> float:
+    """
+    Open the databases and upgrade them like the server startup
+
+    :return: The duration of the startup in seconds
+    """
+    begin = time.perf_counter()
+    await Tortoise.init(
+        {
+            "connections": {
+                name: {
+                    "engine": SQLITE_ENGINE,
+                    "credentials": {"file_path": str(directory / f"{name}.db")},
+                }
+                for name in ("system", "event")
+            },
+            "apps": {
+                name: {"models": ["pulsarity.database"], "default_connection": name}
+                for name in ("system", "event")
+            },
+        }
+    )
+
+    outdated = await outdated_connections() if check else connections.all()
+    if outdated:
+        await Tortoise.generate_schemas(True)
+        await migrate_race_formats()
+        await migrate_pilot_attributes()
+        await setup_default_objects()
+        await stamp_connections(outdated)
+
+    duration = time.perf_counter() - begin
+    await connections.close_all()
+    return duration
+
+
+async def main(restarts: int) -> None:
+    """
+    Run the benchmark
+    """
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        first = await startup(Path(directory), check=True)
+        full = [await startup(Path(directory), check=False) for _ in range(restarts)]
+        fast = [await startup(Path(directory), check=True) for _ in range(restarts)]
+
+    print(f"   first start: {first * 1000:7.1f} ms")
+    print(f"  full upgrade: {sum(full) / restarts * 1000:7.1f} ms per restart")
+    print(f" version check: {sum(fast) / restarts * 1000:7.1f} ms per restart")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,179 @@
+"""
+Benchmark block crossing detection against a scalar reference.
+
+Traces are recorded from simulated nodes before timing so both detectors
+process identical samples. The reference processes the samples one at a
+time the way per-sample node firmware would. Detection is timed at the
+block size streamed by simulated nodes and at larger block sizes, with
+both the per-sample and the array paths of the detector.
+
+Usage: python benchmarks/detection.py [nodes] [sample rate] [seconds] [block sizes...]
+"""
+
+import sys
+import time
+import asyncio
+from array import array
+
+import numpy as np
+
+from pulsarity.hardware import SimulatedNode
+from pulsarity.hardware.detection import (
+    DetectorSettings,
+    DetectorState,
+    detect_block,
+    _detect_scalar,
+    _detect_vectorized,
+    _find_peak,
+)
+
+SETTINGS = DetectorSettings(enter_at=110.0, exit_at=90.0, smoothing=8)
+
+
+def detect_reference(
+    samples: array, start_time: float, sample_rate: float, settings: DetectorSettings
+) -> list[tuple[float, float]]:
+    """
+    Detect crossings in a full trace with a per-sample loop
+    """
+    # pylint: disable=R0914
+    window = settings.smoothing
+    history = [samples[0]] * (window - 1)
+    total = sum(history)
+    crossing = False
+    segment: list[float] = []
+    segment_start = 0.0
+    results = []
+
+    for index, sample in enumerate(samples):
+        history.append(sample)
+        total += sample
+        value = total / window
+        total -= history.pop(0)
+
+        if not crossing and value >= settings.enter_at:
+            crossing = True
+            segment = []
+            segment_start = start_time + (index - (window - 1) / 2) / sample_rate
+
+        if crossing:
+            if value < settings.exit_at:
+                offset, peak = _find_peak(np.array(segment))
+                results.append((segment_start + offset / sample_rate, peak))
+                crossing = False
+            else:
+                segment.append(value)
+
+    return results
+
+
+async def record_traces(
+    node_count: int, sample_rate: float, duration: float
+) -> list[tuple[float, array]]:
+    """
+    Record the RSSI traces of simulated nodes
+    """
+    start = asyncio.get_running_loop().time()
+    traces = []
+
+    for index in range(node_count):
+        node = SimulatedNode(index, sample_rate=sample_rate, lap_time=2.0, seed=index)
+        await node.connect()
+
+        count = int(duration * sample_rate)
+        trace = array(
+            "f",
+            (
+                node.signal_at(start + i / sample_rate)
+                + node._noise_random.gauss(0, node.noise)  # pylint: disable=W0212
+                for i in range(count)
+            ),
+        )
+        traces.append((start, trace))
+
+    return traces
+
+
+def run_blocks(
+    traces: list[tuple[float, array]],
+    sample_rate: float,
+    block_size: int,
+    detect=detect_block,
+) -> list[list[tuple[float, float]]]:
+    """
+    Process each trace in blocks with the provided detector
+    """
+    detected = []
+
+    for start, trace in traces:
+        samples = np.frombuffer(trace, dtype=np.float32)
+        state = DetectorState()
+        results: list[tuple[float, float]] = []
+
+        for offset in range(0, len(samples), block_size):
+            block_start = start + offset / sample_rate
+            found, state = detect(
+                np.asarray(samples[offset : offset + block_size], dtype=np.float64),
+                block_start,
+                sample_rate,
+                SETTINGS,
+                state,
+            )
+            results.extend(found)
+
+        detected.append(results)
+
+    return detected
+
+
+async def main(
+    node_count: int, sample_rate: float, duration: float, block_sizes: list[int]
+) -> None:
+    """
+    Run the benchmark
+    """
+    traces = await record_traces(node_count, sample_rate, duration)
+    total = node_count * int(duration * sample_rate)
+
+    begin = time.perf_counter()
+    reference = [
+        detect_reference(trace, start, sample_rate, SETTINGS) for start, trace in traces
+    ]
+    scalar_time = time.perf_counter() - begin
+
+    print(f"Samples: {total} across {node_count} nodes")
+    print(f"Scalar reference: {total / scalar_time / 1e6:.2f} M samples/s")
+
+    paths = (
+        ("detect_block", detect_block),
+        ("per-sample path", _detect_scalar),
+        ("array path", _detect_vectorized),
+    )
+    for block_size in block_sizes:
+        for name, detect in paths:
+            begin = time.perf_counter()
+            found = run_blocks(traces, sample_rate, block_size, detect)
+            block_time = time.perf_counter() - begin
+
+            for expected, detected in zip(reference, found):
+                assert len(expected) == len(detected)
+                assert np.allclose(expected, detected)
+
+            print(
+                f"{name} ({block_size} sample blocks): "
+                f"{total / block_time / 1e6:.2f} M samples/s, "
+                f"{scalar_time / block_time:.1f}x, "
+                f"realtime capacity {total / block_time / sample_rate:.0f} nodes"
+            )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(
+        main(
+            int(args[0]) if len(args) > 0 else 8,
+            float(args[1]) if len(args) > 1 else 1000.0,
+            float(args[2]) if len(args) > 2 else 60.0,
+            [int(arg) for arg in args[3:]] or [SimulatedNode(0).block_size, 250, 1000],
+        )
+    )
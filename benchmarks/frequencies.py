@@ -0,0 +1,67 @@
+"""
+Benchmark scoring candidate frequency sets for heats of each size, compared
+to scoring the sets one at a time.
+
+Usage: python benchmarks/frequencies.py [minimum spacing in MHz]
+"""
+
+import sys
+import time
+from itertools import permutations
+
+import numpy as np
+
+from pulsarity.race.frequencies import (
+    FrequencySettings,
+    band_frequencies,
+    candidate_sets,
+    optimize_frequencies,
+)
+
+
+def score_reference(values: list[int], settings: FrequencySettings) -> float:
+    """
+    Score a single frequency set without pilot preferences
+    """
+    imd = 0.0
+    for first, second in permutations(values, 2):
+        product = 2 * first - second
+        distance = min(abs(product - value) for value in values)
+        imd += (max(settings.imd_width - distance, 0.0) / settings.imd_width) ** 2
+
+    spacing = min(b - a for a, b in zip(values, values[1:]))
+    return min(spacing / settings.min_spacing, 2.0) * settings.spacing_weight - imd
+
+
+def main(min_spacing: int) -> None:
+    """
+    Run the benchmark
+    """
+    settings = FrequencySettings(min_spacing=min_spacing)
+    frequencies = band_frequencies(settings.bands)
+    print(f"{len(frequencies)} frequencies, {min_spacing} MHz minimum spacing")
+
+    for count in range(3, 9):
+        sets = candidate_sets(frequencies, count, min_spacing, settings.max_candidates)
+        histories = [[int(f)] for f in frequencies[: count // 2]]
+
+        begin = time.perf_counter()
+        optimize_frequencies(count, histories, settings)
+        elapsed = time.perf_counter() - begin
+
+        sample = sets[:2000]
+        begin = time.perf_counter()
+        for row in sample:
+            score_reference(frequencies[row].tolist(), settings)
+        reference = (time.perf_counter() - begin) / max(len(sample), 1)
+
+        print(
+            f"{count} nodes: {len(sets)} sets in {elapsed * 1000:.0f} ms, "
+            f"{len(sets) / elapsed:,.0f} sets/s "
+            f"(one at a time {1 / reference:,.0f} sets/s)"
+        )
+
+
+if __name__ == "__main__":
+    np.seterr(all="raise")
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
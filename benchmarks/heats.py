@@ -0,0 +1,85 @@
+"""
+Benchmark seeding a large field into heats, and the number of pilots left
+without their preferred frequency before and after resolving conflicts.
+
+Usage: python benchmarks/heats.py [pilots]
+"""
+
+import sys
+import time
+import random
+
+from pulsarity.race.enums import SeedingMethod
+from pulsarity.race.heats import HeatPlan, HeatSettings, seed_heats
+
+# pylint: disable=W0212
+from pulsarity.race import heats
+
+FREQUENCIES = (5658, 5695, 5732, 5769, 5806, 5843, 5880, 5917)
+
+
+def _unmet(
+    plans: list[HeatPlan], preferred: dict[int, int], settings: HeatSettings
+) -> int:
+    """
+    Count the pilots not assigned their preferred frequency
+    """
+    return sum(
+        1
+        for plan in plans
+        for node, pilot_id in enumerate(plan.pilots)
+        if pilot_id and preferred[pilot_id] != settings.frequencies[node]
+    )
+
+
+def _unswapped(
+    ranking: list[int], preferences: list[int], settings: HeatSettings
+) -> list[HeatPlan]:
+    """
+    Seed heats by the seeding method alone
+    """
+    heat_of = heats._initial_heats(
+        len(ranking), len(settings.frequencies), settings.method
+    )
+    members: list[list[int]] = [[] for _ in range(max(heat_of) + 1)]
+    for rank, heat in enumerate(heat_of):
+        members[heat].append(rank)
+
+    return [
+        heats._assign_nodes(ranks, ranking, preferences, settings.frequencies)
+        for ranks in members
+    ]
+
+
+def main(pilot_count: int) -> None:
+    """
+    Run the benchmark
+    """
+    rng = random.Random(0)
+    ranking = list(range(1, pilot_count + 1))
+    print(f"{pilot_count} pilots")
+
+    for size in (4, 8):
+        frequencies = FREQUENCIES[:size]
+        preferences = [rng.choice(frequencies) for _ in ranking]
+        preferred = dict(zip(ranking, preferences))
+
+        for method in SeedingMethod:
+            settings = HeatSettings(frequencies, method)
+            before = _unmet(
+                _unswapped(ranking, preferences, settings), preferred, settings
+            )
+
+            begin = time.perf_counter()
+            plans = seed_heats(ranking, preferences, settings)
+            elapsed = time.perf_counter() - begin
+
+            after = _unmet(plans, preferred, settings)
+            print(
+                f"{size} nodes {method.name}: {len(plans)} heats in "
+                f"{elapsed * 1000:.1f} ms, unmet preferences {before} -> {after}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
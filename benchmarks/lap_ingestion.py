@@ -0,0 +1,97 @@
+"""
+Benchmark lap crossing ingestion and its effect on transition jitter.
+
+Usage: python benchmarks/lap_ingestion.py [crossings per second]
+"""
+
+import sys
+import time
+import asyncio
+import statistics
+
+from pulsarity.extensions import PulsarityApp
+from pulsarity.database import Lap
+from pulsarity.race.laps import CrossingRecord
+
+from common import benchmark_app
+
+
+async def measure_jitter(app: PulsarityApp, count: int, interval: float) -> list[float]:
+    """
+    Schedule transitions at fixed deadlines and measure their lateness
+    """
+    loop = asyncio.get_running_loop()
+    lateness: list[float] = []
+
+    async def _probe(deadline: float) -> None:
+        lateness.append(loop.time() - deadline)
+
+    start = loop.time() + 0.1
+    for i in range(count):
+        deadline = start + i * interval
+        app.schedule_background_task(deadline, _probe, deadline)
+
+    await asyncio.sleep(count * interval + 0.2)
+    return lateness
+
+
+async def produce(app: PulsarityApp, rate: int, duration: float) -> float:
+    """
+    Record crossings at the requested rate in 10 ms bursts
+
+    :return: The mean cost of a record call in microseconds
+    """
+    loop = asyncio.get_running_loop()
+    recorder = app.race_manager.lap_recorder
+    burst = max(rate // 100, 1)
+    elapsed = 0.0
+    recorded = 0
+
+    end = loop.time() + duration
+    while loop.time() < end:
+        now = loop.time()
+        begin = time.perf_counter()
+        for i in range(burst):
+            recorder.record(CrossingRecord(i % 8, i % 8 + 1, now, 150.0))
+        elapsed += time.perf_counter() - begin
+        recorded += burst
+        await asyncio.sleep(0.01)
+
+    return elapsed / recorded * 1e6
+
+
+def summarize(label: str, lateness: list[float]) -> None:
+    """
+    Print lateness statistics in milliseconds
+    """
+    values = [value * 1000 for value in lateness]
+    print(
+        f"{label}: mean {statistics.mean(values):.3f} ms, "
+        f"stdev {statistics.pstdev(values):.3f} ms, max {max(values):.3f} ms"
+    )
+
+
+async def main(rate: int) -> None:
+    """
+    Run the benchmark
+    """
+    async with benchmark_app() as app:
+        summarize("Idle jitter", await measure_jitter(app, 20, 0.1))
+
+        recorder = app.race_manager.lap_recorder
+        recorder.begin(asyncio.get_running_loop().time())
+
+        producer = asyncio.create_task(produce(app, rate, 2.5))
+        lateness = await measure_jitter(app, 20, 0.1)
+        cost = await producer
+
+        recorder.end()
+        await asyncio.gather(*app.background_tasks)
+
+        summarize("Loaded jitter", lateness)
+        print(f"Record cost: {cost:.2f} us per crossing at {rate} crossings/s")
+        print(f"Persisted crossings: {await Lap.all().count()} of {len(recorder)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
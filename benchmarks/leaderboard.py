@@ -0,0 +1,63 @@
+"""
+Benchmark live leaderboard updates for a large endurance race, and the
+size of the published diffs compared to sending full standings.
+
+Usage: python benchmarks/leaderboard.py [pilots] [laps per pilot]
+"""
+
+import sys
+import json
+import time
+import random
+
+from pulsarity.race.enums import RankingMethod
+from pulsarity.race.leaderboard import Leaderboard
+
+
+def main(pilot_count: int, lap_count: int) -> None:
+    """
+    Run the benchmark
+    """
+    rng = random.Random(0)
+    times = [0.0] * pilot_count
+    crossings = []
+
+    for _ in range(lap_count):
+        for pilot in range(pilot_count):
+            times[pilot] += rng.gauss(30.0, 3.0)
+            crossings.append((times[pilot], pilot + 1))
+
+    crossings.sort()
+    print(f"{pilot_count} pilots, {len(crossings)} crossings")
+
+    for ranking in RankingMethod:
+        leaderboard = Leaderboard(ranking=ranking)
+
+        begin = time.perf_counter()
+        for timestamp, pilot_id in crossings:
+            leaderboard.add_crossing(pilot_id, timestamp)
+        elapsed = time.perf_counter() - begin
+
+        print(f"{ranking.name}: {elapsed / len(crossings) * 1e6:.2f} us per crossing")
+
+    leaderboard = Leaderboard()
+    diff_bytes = 0
+    snapshot_bytes = 0
+
+    for timestamp, pilot_id in crossings:
+        delta = leaderboard.add_crossing(pilot_id, timestamp)
+        diff_bytes += len(json.dumps(delta.to_dict()))
+        snapshot_bytes += len(json.dumps(leaderboard.snapshot()))
+
+    print(
+        f"Payload per crossing: diff {diff_bytes / len(crossings):.0f} bytes, "
+        f"snapshot {snapshot_bytes / len(crossings):.0f} bytes"
+    )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 64,
+        int(args[1]) if len(args) > 1 else 100,
+    )
@@ -0,0 +1,93 @@
+"""
+Benchmark the import time of the webserver, with validation models
+generated lazily and with the pilot models generated at import like
+previous versions, and the cost of generating the models of each database
+class on first use and afterwards.
+
+Usage: python benchmarks/model_generation.py [imports]
+"""
+
+import sys
+import time
+import statistics
+import subprocess
+
+from tortoise import Tortoise
+
+import pulsarity.database
+
+_LAZY = """
+import time
+begin = time.perf_counter()
+import pulsarity.webserver
+print(time.perf_counter() - begin)
+"""
+
+_EAGER = """
+import time
+begin = time.perf_counter()
+import pulsarity.webserver
+from pulsarity.database import Pilot
+Pilot.generate_pydaantic_model()
+Pilot.generate_pydaantic_queryset()
+print(time.perf_counter() - begin)
+"""
+
+
+def import_time(code: str) -> float:
+    """
+    Measure the duration of importing in a new interpreter
+
+    :return: The duration in seconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return float(result.stdout)
+
+
+def generation_time(model: type[pulsarity.database.Pilot]) -> tuple[float, float]:
+    """
+    Measure generating the validation models of a database class
+
+    :return: The duration of the first and of a later generation in seconds
+    """
+    begin = time.perf_counter()
+    model.generate_pydaantic_model()
+    model.generate_pydaantic_queryset()
+    first = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    model.generate_pydaantic_model()
+    model.generate_pydaantic_queryset()
+    cached = time.perf_counter() - begin
+
+    return first, cached
+
+
+def main(count: int) -> None:
+    """
+    Run the benchmark
+    """
+    # Alternate the runs so both see the same disk cache and system load
+    lazy, eager = [], []
+    for _ in range(count):
+        lazy.append(import_time(_LAZY))
+        eager.append(import_time(_EAGER))
+
+    lazy_ms = statistics.median(lazy) * 1000
+    eager_ms = statistics.median(eager) * 1000
+    print(f"     lazy models: {lazy_ms:7.1f} ms to import")
+    print(f"    eager models: {eager_ms:7.1f} ms to import")
+
+    Tortoise.init_models(["pulsarity.database"], "event")
+    for name in ("Pilot", "PilotAttribute", "RaceFormat", "SavedRace", "Lap", "Heat"):
+        first, cached = generation_time(getattr(pulsarity.database, name))
+        print(
+            f"{name:>16}: {first * 1000:7.2f} ms first use, "
+            f"{cached * 1000 * 1000:7.2f} us cached"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 11)
@@ -0,0 +1,55 @@
+"""
+Benchmark importing a regional pilot list from CSV in batched transactions
+compared to creating each pilot individually.
+
+Usage: python benchmarks/pilot_import.py [pilots]
+"""
+
+import sys
+import time
+import asyncio
+
+from pulsarity.database import Pilot, PilotAttribute
+from pulsarity.race.pilot_import import csv_rows, import_pilots
+
+from common import benchmark_app
+
+
+async def _chunks(data: bytes, size: int = 65536):
+    """
+    Split a body into chunks as received by the server
+    """
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def main(count: int) -> None:
+    """
+    Run the benchmark
+    """
+    lines = ["callsign,name,phonetic,team,class"]
+    lines += [f"pilot{i},Pilot {i},,team{i % 40},{i % 3}" for i in range(count)]
+    data = "\n".join(lines).encode()
+
+    async with benchmark_app():
+        begin = time.perf_counter()
+        summary = await import_pilots(csv_rows(_chunks(data)))
+        elapsed = time.perf_counter() - begin
+
+        print(f"{count} pilots, {len(data)} B of CSV")
+        print(
+            f"Batched import: {elapsed:.2f} s, {summary.created} created, "
+            f"{await PilotAttribute.all().count()} attributes"
+        )
+
+        begin = time.perf_counter()
+        for i in range(min(count, 500)):
+            pilot = await Pilot.create(callsign=f"single{i}", name="", phonetic="")
+            await PilotAttribute.create(pilot=pilot, name="team", value="team")
+            await PilotAttribute.create(pilot=pilot, name="class", value="0")
+        single = (time.perf_counter() - begin) / min(count, 500)
+        print(f"Individual creates: {single * count:.2f} s estimated for {count}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,95 @@
+"""
+Benchmark the memory used per crossing by the compact race data compared
+to model instances and dicts, and the speed of its bulk conversions.
+
+Usage: python benchmarks/race_data.py [crossings]
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import tracemalloc
+from uuid import uuid4
+from collections.abc import Callable
+
+from tortoise import Tortoise, connections
+
+from pulsarity.database import SavedRace, Lap
+from pulsarity.race.data import RaceData
+
+
+def measure(build: Callable[[], object], count: int) -> float:
+    """
+    Measure the bytes allocated per crossing while building a container
+    """
+    tracemalloc.start()
+    container = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+
+    return size / count
+
+
+async def main(count: int) -> None:
+    """
+    Run the benchmark
+    """
+    await Tortoise.init(
+        db_url="sqlite://:memory:",
+        modules={"event": ["pulsarity.database.race"]},
+    )
+    await Tortoise.generate_schemas()
+
+    rng = random.Random(0)
+    rows = [
+        (i % 8, i % 8 + 1, i * 0.05 + rng.random(), 100.0 + rng.random() * 50)
+        for i in range(count)
+    ]
+    race = await SavedRace.create(start_time=0.0)
+
+    def build_models() -> list[Lap]:
+        return [
+            Lap(race=race, node_index=n, pilot_id=p, timestamp=t, peak_rssi=r)
+            for n, p, t, r in rows
+        ]
+
+    def build_dicts() -> list[dict]:
+        return [
+            {"node_index": n, "pilot_id": p, "timestamp": t, "peak_rssi": r}
+            for n, p, t, r in rows
+        ]
+
+    def build_data() -> RaceData:
+        data = RaceData(uuid4())
+        data.extend(rows)
+        return data
+
+    print(f"{count} crossings")
+    print(f"Lap models: {measure(build_models, count):.0f} B per crossing")
+    print(f"dicts: {measure(build_dicts, count):.0f} B per crossing")
+    print(f"RaceData: {measure(build_data, count):.1f} B per crossing")
+
+    data = build_data()
+    print(f"RaceData columns: {data.nbytes / count:.1f} B per crossing")
+
+    begin = time.perf_counter()
+    await Lap.bulk_create(data.to_laps(race), batch_size=1000)
+    print(f"to_laps + bulk_create: {time.perf_counter() - begin:.2f} s")
+
+    begin = time.perf_counter()
+    loaded = await RaceData.from_db(race)
+    print(f"from_db: {time.perf_counter() - begin:.2f} s ({len(loaded)} crossings)")
+
+    begin = time.perf_counter()
+    encoded = json.dumps(data.to_json())
+    RaceData.from_json(json.loads(encoded))
+    print(f"JSON round trip: {time.perf_counter() - begin:.3f} s, {len(encoded)} B")
+
+    await connections.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,70 @@
+"""
+Benchmark the cost of sending RSSI blocks to the process pool.
+
+Compares pickling the samples into the worker against passing the span
+of a shared memory buffer. The worker only sums the samples so the
+measurement is dominated by the transfer.
+
+Usage: python benchmarks/shared_buffer.py [rounds]
+"""
+
+import sys
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pulsarity.hardware import SharedRssiBuffer, SampleSpan
+from pulsarity.hardware.buffer import read_span
+
+
+def sum_samples(samples: NDArray[np.float32]) -> float:
+    """
+    Worker receiving a copy of the samples
+    """
+    return float(samples.sum())
+
+
+def sum_span(span: SampleSpan) -> float:
+    """
+    Worker reading the samples from shared memory
+    """
+    return float(read_span(span).sum())
+
+
+async def main(rounds: int) -> None:
+    """
+    Run the benchmark
+    """
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(1) as pool:
+        # Start the worker before timing
+        await loop.run_in_executor(pool, sum_samples, np.zeros(1, np.float32))
+
+        for size in (1_000, 10_000, 100_000, 1_000_000):
+            samples = np.random.default_rng(0).random(size, dtype=np.float32)
+            buffer = SharedRssiBuffer(size * 4)
+
+            begin = time.perf_counter()
+            for _ in range(rounds):
+                await loop.run_in_executor(pool, sum_samples, samples)
+            copied = (time.perf_counter() - begin) / rounds
+
+            begin = time.perf_counter()
+            for _ in range(rounds):
+                span = buffer.write(samples)
+                await loop.run_in_executor(pool, sum_span, span)
+            shared = (time.perf_counter() - begin) / rounds
+
+            buffer.close()
+            print(
+                f"{size:>9} samples: pickled {copied * 1e6:9.1f} us, "
+                f"shared {shared * 1e6:9.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
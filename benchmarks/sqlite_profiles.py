@@ -0,0 +1,100 @@
+"""
+Benchmark lap write and read throughput of the SQLite profiles on the
+storage of the current directory. Run on the target hardware, such as the
+SD card of a timer, for meaningful results.
+
+Usage: python benchmarks/sqlite_profiles.py [laps]
+"""
+
+import sys
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+from tortoise import Tortoise, connections
+
+from pulsarity.database import SavedRace, Lap
+from pulsarity.database.tuning import (
+    SQLITE_ENGINE,
+    SQLITE_PROFILES,
+    WalCheckpointer,
+    apply_sqlite_profile,
+)
+
+
+async def run_profile(directory: Path, profile: str | None, count: int) -> None:
+    """
+    Measure a single profile on a fresh database file
+    """
+    config = {
+        "event": {
+            "engine": SQLITE_ENGINE,
+            "credentials": {"file_path": str(directory / f"{profile}.db")},
+        }
+    }
+    if profile is not None:
+        config = apply_sqlite_profile(config, profile)
+    else:
+        config["event"]["credentials"]["journal_mode"] = "DELETE"
+
+    await Tortoise.init(
+        {
+            "connections": config,
+            "apps": {
+                "event": {
+                    "models": ["pulsarity.database.race"],
+                    "default_connection": "event",
+                }
+            },
+        }
+    )
+    await Tortoise.generate_schemas()
+
+    race = await SavedRace.create(start_time=0.0)
+
+    # Laps are written one at a time as they are recorded
+    begin = time.perf_counter()
+    for i in range(count):
+        await Lap.create(
+            race=race, node_index=i % 8, pilot_id=None, timestamp=i, peak_rssi=0
+        )
+    single = count / (time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    laps = [
+        Lap(race=race, node_index=i % 8, pilot_id=None, timestamp=i, peak_rssi=0)
+        for i in range(count * 10)
+    ]
+    await Lap.bulk_create(laps, batch_size=1000)
+    bulk = count * 10 / (time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    for _ in range(20):
+        rows = await Lap.filter(race=race).values_list("node_index", "timestamp")
+    read = 20 * len(rows) / (time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    await WalCheckpointer.checkpoint()
+    checkpoint = time.perf_counter() - begin
+
+    print(
+        f"{profile or 'rollback journal':>16}: {single:8.0f} single inserts/s, "
+        f"{bulk:8.0f} bulk inserts/s, {read:9.0f} rows read/s, "
+        f"checkpoint {checkpoint * 1000:.1f} ms"
+    )
+
+    await connections.close_all()
+
+
+async def main(count: int) -> None:
+    """
+    Run the benchmark
+    """
+    with tempfile.TemporaryDirectory(dir=".") as directory:
+        for profile in (None, *SQLITE_PROFILES):
+            await run_profile(Path(directory), profile, count)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
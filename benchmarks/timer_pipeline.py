@@ -0,0 +1,82 @@
+"""
+Benchmark the latency from simulated node samples to client delivery.
+
+Latency is measured from the gate crossing to the lap event being received
+by a broker subscriber, the same path used by the websocket. It includes
+the node's reporting delay after the crossing.
+
+Usage: python benchmarks/timer_pipeline.py [nodes] [sample rate] [seconds]
+"""
+
+import sys
+import asyncio
+import statistics
+
+from pulsarity.events import RaceSequenceEvt
+from pulsarity.hardware import SimulatedNode
+
+from common import benchmark_app
+
+
+async def main(node_count: int, sample_rate: float, duration: float) -> None:
+    """
+    Run the benchmark
+    """
+    async with benchmark_app() as app:
+        loop = asyncio.get_running_loop()
+        interface = app.timer_interface
+
+        for index in range(node_count):
+            node = SimulatedNode(
+                index, sample_rate=sample_rate, lap_time=1.0, lap_variation=0.1
+            )
+            node.pilot_id = index + 1
+            interface.add_node(node)
+
+        samples = 0
+
+        def _count_samples(block) -> None:
+            nonlocal samples
+            samples += len(block.samples)
+
+        interface.add_rssi_listener(_count_samples)
+
+        start = loop.time()
+        app.race_manager.lap_recorder.begin(start)
+        await interface.start()
+
+        latencies: list[float] = []
+
+        async def _subscriber() -> None:
+            async for _, _, event_id, _, data in app.event_broker.subscribe():
+                if event_id == RaceSequenceEvt.LAP_RECORD.id:
+                    crossing_time = start + data["timestamp"]
+                    latencies.append(loop.time() - crossing_time)
+
+        subscriber = asyncio.create_task(_subscriber())
+        await asyncio.sleep(duration)
+        subscriber.cancel()
+
+        await interface.stop()
+        app.race_manager.lap_recorder.end()
+
+        report_delay = interface.nodes[0].report_delay  # type: ignore
+        values = [(latency - report_delay) * 1000 for latency in latencies]
+
+        print(f"Samples processed: {samples / duration:.0f} per second")
+        print(f"Laps delivered: {len(values)}")
+        print(
+            f"Delivery latency after report: mean {statistics.mean(values):.3f} ms, "
+            f"max {max(values):.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(
+        main(
+            int(args[0]) if len(args) > 0 else 8,
+            float(args[1]) if len(args) > 1 else 1000.0,
+            float(args[2]) if len(args) > 2 else 10.0,
+        )
+    )
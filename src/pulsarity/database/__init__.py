@@ -7,6 +7,8 @@ from .role import Role
 from .permission import Permission
 from .pilot import Pilot, PilotAttribute
 from .raceformat import RaceFormat, RaceSchedule
+from .race import SavedRace, Lap
+from .heat import Heat, HeatSlot
 
 __all__ = [
     "User",
@@ -16,6 +18,10 @@ __all__ = [
     "PilotAttribute",
     "RaceFormat",
     "RaceSchedule",
+    "SavedRace",
+    "Lap",
+    "Heat",
+    "HeatSlot",
 ]
 
 
@@ -2,16 +2,18 @@
 Abstract definition of database classes
 """
 
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
 from tortoise import fields
 from tortoise.models import Model
-from tortoise.contrib.pydantic import (
-    PydanticModel,
-    PydanticListModel,
-    pydantic_model_creator,
-    pydantic_queryset_creator,
-)
+
+if TYPE_CHECKING:
+    from tortoise.contrib.pydantic import PydanticModel, PydanticListModel
+
+_pydantic_models: dict[type[Model], "type[PydanticModel]"] = {}
+"""Generated validation models by database class"""
+_pydantic_querysets: dict[type[Model], "type[PydanticListModel]"] = {}
+"""Generated list validation models by database class"""
 
 
 class _PulsarityBase(Model):
@@ -23,30 +25,43 @@ class _PulsarityBase(Model):
     """Internal identifier"""
 
     @classmethod
-    def generate_pydaantic_model(cls) -> type[PydanticModel]:
+    def generate_pydaantic_model(cls) -> "type[PydanticModel]":
         """
-        Generate a validation model for the database object
+        Generate a validation model for the database object. The model is
+        generated on first use and reused afterwards.
 
         :return: The generated model
         """
-        return pydantic_model_creator(cls)
+        if cls not in _pydantic_models:
+            # pylint: disable=C0415
+            from tortoise.contrib.pydantic import pydantic_model_creator
+
+            _pydantic_models[cls] = pydantic_model_creator(cls)
+
+        return _pydantic_models[cls]
 
     @classmethod
-    def generate_pydaantic_queryset(cls) -> type[PydanticListModel]:
+    def generate_pydaantic_queryset(cls) -> "type[PydanticListModel]":
         """
-        Generate a validation model for the database object
+        Generate a validation model for a list of the database object. The
+        model is generated on first use and reused afterwards.
 
         :return: The generated model
         """
-        return pydantic_queryset_creator(cls)
+        if cls not in _pydantic_querysets:
+            # pylint: disable=C0415
+            from tortoise.contrib.pydantic import pydantic_queryset_creator
+
+            _pydantic_querysets[cls] = pydantic_queryset_creator(cls)
+
+        return _pydantic_querysets[cls]
 
     @classmethod
     async def get_by_id(cls, id_: int) -> Self | None:
         """
-        Attempt to retrieve a user by uuid
+        Attempt to retrieve an object by id
 
-        :param session: _description_
-        :param uuid: _description_
-        :return: _description_
+        :param id_: The id of the object
+        :return: The object, None if it does not exist
         """
-        return await cls.get_or_none(auth_id=id_)
+        return await cls.get_or_none(id=id_)
@@ -0,0 +1,332 @@
+"""
+Management of per-event database files
+"""
+
+import re
+import copy
+import shutil
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any
+
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.backends.base.config_generator import expand_db_url
+from tortoise.utils import generate_schema_for_client
+
+from .pilot import Pilot
+from .race import SavedRace, Lap
+from .writebehind import write_behind
+from .migrations import (
+    migrate_race_formats,
+    migrate_pilot_attributes,
+    outdated_connections,
+    stamp_connections,
+)
+from ..utils.config import configs
+
+logger = logging.getLogger(__name__)
+
+_NAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_\-]{0,63}")
+
+_ARCHIVE_PREFIX = "archive_"
+"""Prefix of the connection names of attached archives"""
+
+
+class EventDatabases:
+    """
+    Stores each event in its own SQLite file. The connection used by the
+    event models is replaced when switching events, so the active event
+    changes without restarting the server. Past events are moved to an
+    archive directory and can be attached as read-only connections for
+    historical queries.
+    """
+
+    suffix: str = ".db"
+    """File name suffix of event databases"""
+
+    def __init__(self, directory: str | Path = "events") -> None:
+        """
+        Class initialization
+
+        :param directory: Directory of the event files, defaults to "events"
+        """
+        self.directory = Path(directory)
+        """Directory of the event files"""
+        self._lock = asyncio.Lock()
+
+    @property
+    def archive_directory(self) -> Path:
+        """Directory of the archived event files"""
+        return self.directory / "archive"
+
+    @property
+    def connection_name(self) -> str:
+        """Name of the connection used by the event models"""
+        # pylint: disable=W0212
+        return str(Pilot._meta.default_connection)
+
+    def _path(self, name: str, archived: bool = False) -> Path:
+        """
+        Get the path of an event file
+
+        :param name: The name of the event
+        :param archived: Whether the event is archived, defaults to False
+        :raises ValueError: The name is not a valid event name
+        :return: The path of the file
+        """
+        if _NAME_PATTERN.fullmatch(name) is None:
+            raise ValueError(f"Invalid event name: {name!r}")
+
+        directory = self.archive_directory if archived else self.directory
+        return directory / f"{name}{self.suffix}"
+
+    def _list(self, directory: Path) -> list[str]:
+        """
+        List the events stored in a directory
+
+        :param directory: The directory
+        :return: The event names in alphabetical order
+        """
+        if not directory.is_dir():
+            return []
+
+        return sorted(
+            path.stem
+            for path in directory.glob(f"*{self.suffix}")
+            if _NAME_PATTERN.fullmatch(path.stem)
+        )
+
+    def list_events(self) -> list[str]:
+        """
+        List the events that can be switched to
+
+        :return: The event names
+        """
+        return self._list(self.directory)
+
+    def list_archives(self) -> list[str]:
+        """
+        List the archived events
+
+        :return: The event names
+        """
+        return self._list(self.archive_directory)
+
+    @staticmethod
+    def _connection_info(alias: str, path: Path, **pragmas: str) -> dict[str, Any]:
+        """
+        Build the settings of a connection to another file from the settings
+        of an existing connection
+
+        :param alias: The name of the existing connection
+        :param path: The path of the file
+        :param pragmas: Pragmas to add to the connection
+        :return: The connection settings
+        """
+        info = connections.db_config[alias]
+        info = copy.deepcopy(expand_db_url(info) if isinstance(info, str) else info)
+        info["credentials"].update(file_path=str(path), **pragmas)
+        return info
+
+    @property
+    def active_path(self) -> Path:
+        """The file of the active event"""
+        info = connections.db_config[self.connection_name]
+        if isinstance(info, str):
+            info = expand_db_url(info)
+        return Path(info["credentials"]["file_path"])
+
+    @property
+    def active(self) -> str | None:
+        """Name of the active event, None if the active file is not in the
+        event directory"""
+        path = self.active_path
+        if path.parent.resolve() != self.directory.resolve():
+            return None
+
+        return path.stem
+
+    async def switch(self, name: str, create: bool = False) -> Path:
+        """
+        Make an event the active event. Pending deferred writes are flushed
+        to the previous event first. The schema of the event is created or
+        upgraded as needed. The event is stored in the config to be reopened
+        on the next startup.
+
+        :param name: The name of the event
+        :param create: Create the event if it does not exist, defaults to
+        False
+        :raises FileNotFoundError: The event does not exist and is not created
+        :return: The path of the event file
+        """
+        path = self._path(name)
+        if not create and not path.is_file():
+            raise FileNotFoundError(f"Event {name} does not exist")
+
+        async with self._lock:
+            await write_behind.flush()
+
+            alias = self.connection_name
+            previous = connections.get(alias)
+            previous_info = connections.db_config[alias]
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connections.db_config[alias] = self._connection_info(alias, path)
+            connections.discard(alias)
+
+            try:
+                client = connections.get(alias)
+                if await outdated_connections([client]):
+                    await generate_schema_for_client(client, safe=True)
+                    await migrate_race_formats()
+                    await migrate_pilot_attributes()
+                    await stamp_connections([client])
+
+            except Exception:
+                # Reopen the previous event if the new one fails to open
+                await connections.get(alias).close()
+                connections.discard(alias)
+                connections.db_config[alias] = previous_info
+                raise
+
+            finally:
+                await previous.close()
+
+        if configs.get_config("GENERAL", "ACTIVE_EVENT") != name:
+            configs.set_config("GENERAL", "ACTIVE_EVENT", name)
+
+        logger.info("Switched to event %s", name)
+        return path
+
+    async def reopen(self) -> str | None:
+        """
+        Make the event that was active when the server stopped the active
+        event again. The configured event database stays active if no
+        event was switched to or the event cannot be opened.
+
+        :return: The name of the reopened event, None if not reopened
+        """
+        name = configs.get_config("GENERAL", "ACTIVE_EVENT")
+        if not isinstance(name, str) or not name or name == self.active:
+            return None
+
+        try:
+            await self.switch(name)
+        except (ValueError, FileNotFoundError) as ex:
+            logger.error("Unable to reopen event %s: %s", name, ex)
+            return None
+
+        return name
+
+    async def archive(self, name: str) -> Path:
+        """
+        Move an event to the archive directory
+
+        :param name: The name of the event
+        :raises ValueError: The event is active
+        :raises FileNotFoundError: The event does not exist
+        :raises FileExistsError: An archived event has the same name
+        :return: The path of the archived file
+        """
+        path = self._path(name)
+        target = self._path(name, archived=True)
+
+        async with self._lock:
+            if path.resolve() == self.active_path.resolve():
+                raise ValueError("The active event cannot be archived")
+            if not path.is_file():
+                raise FileNotFoundError(f"Event {name} does not exist")
+            if target.exists():
+                raise FileExistsError(f"Event {name} is already archived")
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            for extension in ("", "-wal", "-shm"):
+                source = path.with_name(path.name + extension)
+                if source.exists():
+                    shutil.move(source, target.with_name(target.name + extension))
+
+        logger.info("Archived event %s", name)
+        return target
+
+    async def attach(self, name: str) -> BaseDBAsyncClient:
+        """
+        Open an archived event for reading. Use the connection with
+        `using_db` to query the models of the archived event.
+
+        :param name: The name of the archived event
+        :raises FileNotFoundError: The archived event does not exist
+        :return: The read-only connection
+        """
+        path = self._path(name, archived=True)
+        if not path.is_file():
+            raise FileNotFoundError(f"Archived event {name} does not exist")
+
+        alias = f"{_ARCHIVE_PREFIX}{name}"
+        if alias not in connections.db_config:
+            connections.db_config[alias] = self._connection_info(
+                self.connection_name, path, query_only="ON"
+            )
+
+        return connections.get(alias)
+
+    async def read_archive(self, name: str) -> list[dict]:
+        """
+        Read the saved races of an archived event. The archive is attached
+        on first use and stays attached for later reads.
+
+        :param name: The name of the archived event
+        :raises ValueError: The name is not a valid event name
+        :raises FileNotFoundError: The archived event does not exist
+        :return: The races in order of their start, each with its laps in
+        order of their timestamp
+        """
+        client = await self.attach(name)
+
+        saved = await SavedRace.all().using_db(client).order_by("start_time", "id")
+        races: dict[int, dict[str, Any]] = {
+            race.id: {"uuid": race.uuid, "start_time": race.start_time, "laps": []}
+            for race in saved
+        }
+
+        laps = (
+            await Lap.all()
+            .using_db(client)
+            .order_by("timestamp", "id")
+            .values("id", "race_id", "node_index", "pilot_id", "timestamp", "peak_rssi")
+        )
+        for lap in laps:
+            race = races[lap.pop("race_id")]
+            race["laps"].append({**lap, "race_uuid": race["uuid"]})
+
+        return list(races.values())
+
+    async def detach(self, name: str) -> None:
+        """
+        Close an attached archived event
+
+        :param name: The name of the archived event
+        """
+        alias = f"{_ARCHIVE_PREFIX}{name}"
+        if alias not in connections.db_config:
+            return
+
+        await connections.get(alias).close()
+        connections.discard(alias)
+        del connections.db_config[alias]
+
+    def attached(self) -> list[str]:
+        """
+        List the attached archived events
+
+        :return: The event names
+        """
+        return sorted(
+            alias.removeprefix(_ARCHIVE_PREFIX)
+            for alias in connections.db_config
+            if alias.startswith(_ARCHIVE_PREFIX)
+        )
+
+
+event_databases = EventDatabases()
@@ -0,0 +1,59 @@
+"""
+ORM classes for Heat data
+"""
+
+from __future__ import annotations
+
+from tortoise import fields
+
+from .base import _PulsarityBase
+from .pilot import Pilot
+
+# pylint: disable=R0903,E1136
+
+
+class Heat(_PulsarityBase):
+    """
+    A group of pilots racing against each other at the same time
+    """
+
+    name = fields.CharField(max_length=80)
+    """User-facing name"""
+    round_index = fields.IntField(default=0)
+    """The round of the event the heat belongs to"""
+    position = fields.IntField(default=0)
+    """Order of the heat within its round"""
+    slots: fields.ReverseRelation[HeatSlot]
+    """Pilots assigned to the heat. Access through awaitable attributes."""
+
+    class Meta:
+        """Tortoise ORM metadata"""
+
+        app = "event"
+        table = "heat"
+
+
+class HeatSlot(_PulsarityBase):
+    """
+    The assignment of a pilot to a timer node in a heat
+    """
+
+    heat: fields.ForeignKeyRelation[Heat] = fields.ForeignKeyField(
+        "event.Heat", related_name="slots"
+    )
+    """The heat of the slot"""
+    node_index = fields.IntField()
+    """Index of the timer node of the slot"""
+    pilot: fields.ForeignKeyNullableRelation[Pilot] = fields.ForeignKeyField(
+        "event.Pilot", related_name="heat_slots", null=True
+    )
+    """The pilot assigned to the slot, None if the slot is empty"""
+    seed = fields.IntField(null=True)
+    """Position of the pilot in the ranking the heat was seeded from"""
+
+    class Meta:
+        """Tortoise ORM metadata"""
+
+        app = "event"
+        table = "heat_slot"
+        unique_together = (("heat", "node_index"),)
@@ -0,0 +1,242 @@
+"""
+Timing of database queries
+"""
+
+import re
+import sys
+import asyncio
+import contextlib
+import time
+import bisect
+import logging
+import functools
+from collections import deque
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import tortoise
+from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.backends.sqlite.client import SqliteClient
+
+logger = logging.getLogger(__name__)
+
+_EXECUTE_METHODS = (
+    "execute_insert",
+    "execute_many",
+    "execute_query",
+    "execute_query_dict",
+    "execute_script",
+)
+
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+"?(\w+)"?', re.IGNORECASE)
+
+_LIBRARY_PATHS = (
+    str(Path(tortoise.__file__ or "").parent),
+    str(Path(asyncio.__file__ or "").parent),
+    str(contextlib.__file__),
+)
+"""Modules issuing queries on behalf of the caller"""
+
+_timing: ContextVar[bool] = ContextVar("_timing", default=False)
+"""Whether a query of the current context is already being timed"""
+
+BUCKETS_MS: tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+"""Upper bounds of the latency histogram buckets in milliseconds. Slower
+queries are counted in a final overflow bucket."""
+
+
+@dataclass
+class QueryStats:
+    """
+    Latency of the queries of a model and operation
+    """
+
+    count: int = 0
+    """Number of queries"""
+    total_ms: float = 0.0
+    """Combined duration of the queries"""
+    max_ms: float = 0.0
+    """Duration of the slowest query"""
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+    """Number of queries per latency bucket"""
+
+    def add(self, duration_ms: float) -> None:
+        """
+        Record a query
+
+        :param duration_ms: The duration of the query
+        """
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+
+
+@dataclass
+class SlowQuery:
+    """
+    A query exceeding the slow query threshold
+    """
+
+    model: str
+    """Name of the queried model"""
+    operation: str
+    """The SQL statement type"""
+    duration_ms: float
+    """Duration of the query"""
+    location: str
+    """Call site of the query in the project"""
+    query: str
+    """The SQL of the query"""
+
+
+def _call_site() -> str:
+    """
+    Find the innermost frame on the stack outside of the database layers
+
+    :return: The file, line and function of the frame
+    """
+    frame = sys._getframe(1)  # pylint: disable=W0212
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and not filename.startswith(_LIBRARY_PATHS):
+            with contextlib.suppress(ValueError):
+                filename = str(Path(filename).relative_to(Path.cwd()))
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back  # type: ignore[assignment]
+
+    return "unknown"
+
+
+class QueryTimer:
+    """
+    Records the latency of every query of the instrumented database
+    clients by model and operation. Queries slower than the threshold are
+    logged with the location in the project issuing them.
+    """
+
+    slow_threshold_ms: float = 100.0
+    """Duration above which a query is logged, 0 to disable"""
+
+    def __init__(self, recent: int = 50) -> None:
+        """
+        Class initialization
+
+        :param recent: Number of recent slow queries kept, defaults to 50
+        """
+        self.stats: dict[tuple[str, str], QueryStats] = {}
+        """Query latency by model and operation"""
+        self.slow_queries: deque[SlowQuery] = deque(maxlen=recent)
+        """The most recent slow queries"""
+        self._models: dict[str, str] = {}
+        self._originals: dict[tuple[type, str], Callable] = {}
+
+    def _model_name(self, table: str) -> str:
+        """
+        Get the name of the model stored in a table
+
+        :param table: The name of the table
+        :return: The name of the model, the table name if unknown
+        """
+        if table not in self._models:
+            # pylint: disable=W0212
+            for app in Tortoise.apps.values():
+                for model in app.values():
+                    self._models[model._meta.db_table] = model.__name__
+            self._models.setdefault(table, table)
+
+        return self._models[table]
+
+    def record(self, query: str, duration: float) -> None:
+        """
+        Record the duration of a query
+
+        :param query: The SQL of the query
+        :param duration: The duration in seconds
+        """
+        operation = query.lstrip().split(None, 1)[0].upper() if query.strip() else ""
+        match = _TABLE_PATTERN.search(query)
+        model = self._model_name(match.group(1)) if match else ""
+
+        duration_ms = duration * 1000
+        self.stats.setdefault((model, operation), QueryStats()).add(duration_ms)
+
+        if 0 < self.slow_threshold_ms < duration_ms:
+            location = _call_site()
+            logger.warning(
+                "Slow %s on %s (%.1f ms) at %s: %s",
+                operation,
+                model or "database",
+                duration_ms,
+                location,
+                query,
+            )
+            self.slow_queries.append(
+                SlowQuery(model, operation, duration_ms, location, query)
+            )
+
+    def reset(self) -> None:
+        """
+        Clear the recorded queries
+        """
+        self.stats.clear()
+        self.slow_queries.clear()
+        self._models.clear()
+
+    def _timed(
+        self, method: Callable[..., Coroutine[Any, Any, Any]]
+    ) -> Callable[..., Coroutine[Any, Any, Any]]:
+        """
+        Wrap a query method of a database client to time it
+
+        :param method: The original method
+        :return: The timed method
+        """
+
+        @functools.wraps(method)
+        async def wrapper(client: Any, query: str, *args: Any, **kwargs: Any) -> Any:
+            # Queries issued by an already timed query are part of it
+            if _timing.get():
+                return await method(client, query, *args, **kwargs)
+
+            token = _timing.set(True)
+            start = time.perf_counter()
+            try:
+                return await method(client, query, *args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                _timing.reset(token)
+                self.record(query, duration)
+
+        return wrapper
+
+    def install(self, client_class: type[BaseDBAsyncClient] = SqliteClient) -> None:
+        """
+        Time the queries of a database client class and its subclasses
+
+        :param client_class: The client class, defaults to SqliteClient
+        """
+        classes = [client_class]
+        while classes:
+            cls = classes.pop()
+            classes.extend(cls.__subclasses__())
+
+            for name in _EXECUTE_METHODS:
+                if name in vars(cls) and (cls, name) not in self._originals:
+                    self._originals[(cls, name)] = vars(cls)[name]
+                    setattr(cls, name, self._timed(vars(cls)[name]))
+
+    def uninstall(self) -> None:
+        """
+        Stop timing queries
+        """
+        for (cls, name), method in self._originals.items():
+            setattr(cls, name, method)
+        self._originals.clear()
+
+
+query_timer = QueryTimer()
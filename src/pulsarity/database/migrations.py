@@ -0,0 +1,204 @@
+"""
+Migrations of existing databases
+"""
+
+import io
+import zlib
+import pickle
+import logging
+from collections.abc import Iterable
+
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.backends.sqlite.client import SqliteClient
+from tortoise.transactions import in_transaction
+from tortoise.utils import get_schema_sql
+
+from .raceformat import RaceFormat, RaceSchedule
+from .pilot import PilotAttribute
+from .permission import UserPermission
+from ..utils.config import configs
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_REVISION = 1
+"""Revision of the migrations and default objects. Increment it when adding
+a migration or a default object that the model tables do not reflect, so
+existing databases are upgraded on the next start."""
+
+_SCHEDULE_COLUMNS = {
+    "stage_time_sec": "INT NOT NULL DEFAULT 0",
+    "random_stage_delay": "INT NOT NULL DEFAULT 0",
+    "unlimited_time": "INT NOT NULL DEFAULT 0",
+    "race_time_sec": "INT NOT NULL DEFAULT 0",
+    "overtime_sec": "INT NOT NULL DEFAULT 0",
+}
+
+
+class _ScheduleUnpickler(pickle.Unpickler):
+    """
+    Unpickler only able to load race schedules. Databases may be imported
+    from other systems, so arbitrary objects are never loaded.
+    """
+
+    def find_class(self, module: str, name: str) -> type:
+        if (module, name) == (RaceSchedule.__module__, RaceSchedule.__name__):
+            return RaceSchedule
+
+        raise pickle.UnpicklingError(f"Forbidden class in schedule: {module}.{name}")
+
+
+def load_pickled_schedule(data: bytes) -> RaceSchedule:
+    """
+    Load a race schedule stored by previous versions
+
+    :param data: The pickled schedule
+    :raises pickle.UnpicklingError: The data is not a pickled schedule
+    :return: The schedule
+    """
+    try:
+        schedule = _ScheduleUnpickler(io.BytesIO(data)).load()
+    except (EOFError, ValueError, TypeError, AttributeError) as ex:
+        raise pickle.UnpicklingError(str(ex)) from ex
+
+    if not isinstance(schedule, RaceSchedule):
+        raise pickle.UnpicklingError("Pickled object is not a schedule")
+
+    return schedule
+
+
+async def migrate_race_formats() -> int:
+    """
+    Move race schedules stored as pickled blobs by previous versions into
+    the typed columns of the format table. Schedules failing to load keep
+    the default values of the columns.
+
+    :return: The number of migrated formats
+    """
+    # pylint: disable=W0212
+
+    connection = RaceFormat._meta.db
+    table = RaceFormat._meta.db_table
+
+    _, rows = await connection.execute_query(f'PRAGMA table_info("{table}")')
+    columns = {row["name"] for row in rows}
+    if "_schedule" not in columns:
+        return 0
+
+    migrated = 0
+    async with in_transaction(RaceFormat._meta.default_connection) as transaction:
+        for column, definition in _SCHEDULE_COLUMNS.items():
+            if column not in columns:
+                await transaction.execute_script(
+                    f'ALTER TABLE "{table}" ADD COLUMN "{column}" {definition}'
+                )
+
+        _, rows = await transaction.execute_query(
+            f'SELECT "id", "_schedule" FROM "{table}"'
+        )
+        for row in rows:
+            try:
+                schedule = load_pickled_schedule(bytes(row["_schedule"]))
+            except pickle.UnpicklingError as ex:
+                logger.error("Unable to migrate race format %s: %s", row["id"], ex)
+                continue
+
+            await transaction.execute_query(
+                f'UPDATE "{table}" SET "stage_time_sec"=?, "random_stage_delay"=?, '
+                '"unlimited_time"=?, "race_time_sec"=?, "overtime_sec"=? '
+                'WHERE "id"=?',
+                [
+                    schedule.stage_time_sec,
+                    schedule.random_stage_delay,
+                    schedule.unlimited_time,
+                    schedule.race_time_sec,
+                    schedule.overtime_sec,
+                    row["id"],
+                ],
+            )
+            migrated += 1
+
+        await transaction.execute_script(
+            f'ALTER TABLE "{table}" DROP COLUMN "_schedule"'
+        )
+
+    logger.info("Migrated %d pickled race schedules", migrated)
+    return migrated
+
+
+async def migrate_pilot_attributes() -> bool:
+    """
+    Add the value column to pilot attribute tables created by previous
+    versions
+
+    :return: True if the column was added
+    """
+    # pylint: disable=W0212
+
+    connection = PilotAttribute._meta.db
+    table = PilotAttribute._meta.db_table
+
+    _, rows = await connection.execute_query(f'PRAGMA table_info("{table}")')
+    if any(row["name"] == "value" for row in rows):
+        return False
+
+    await connection.execute_script(f'ALTER TABLE "{table}" ADD COLUMN "value" TEXT')
+
+    logger.info("Added values to pilot attributes")
+    return True
+
+
+def schema_stamp(client: BaseDBAsyncClient) -> int:
+    """
+    Compute the version stamp of a database. The stamp changes whenever
+    the tables of its models, the migrations or the default objects change.
+
+    :param client: The connection of the database
+    :return: The stamp, a positive 31 bit integer
+    """
+    stamp = zlib.crc32(get_schema_sql(client, safe=True).encode())
+    stamp = zlib.crc32(str(SCHEMA_REVISION).encode(), stamp)
+
+    for permission_class in UserPermission.__subclasses__():
+        for permission in permission_class:
+            stamp = zlib.crc32(permission.value.encode(), stamp)
+
+    username = str(configs.get_config("SECRETS", "DEFAULT_USERNAME"))
+    stamp = zlib.crc32(username.encode(), stamp)
+
+    return (stamp & 0x7FFFFFFF) or 1
+
+
+async def outdated_connections(
+    clients: Iterable[BaseDBAsyncClient] | None = None,
+) -> list[BaseDBAsyncClient]:
+    """
+    Find the databases whose stored stamp does not match the current
+    version. Only SQLite databases store a stamp, others are always
+    outdated.
+
+    :param clients: The connections to check, defaults to all connections
+    :return: The outdated connections
+    """
+    outdated = []
+    for client in connections.all() if clients is None else clients:
+        if isinstance(client, SqliteClient):
+            _, rows = await client.execute_query("PRAGMA user_version")
+            if rows[0][0] == schema_stamp(client):
+                continue
+
+        outdated.append(client)
+
+    return outdated
+
+
+async def stamp_connections(clients: Iterable[BaseDBAsyncClient]) -> None:
+    """
+    Store the current version stamp in upgraded databases
+
+    :param clients: The upgraded connections
+    """
+    for client in clients:
+        if isinstance(client, SqliteClient):
+            stamp = schema_stamp(client)
+            await client.execute_script(f"PRAGMA user_version = {stamp}")
@@ -89,4 +89,7 @@ class SystemDefaultPerms(UserPermission):
 
     READ_PILOTS = auto()
     WRITE_PILOTS = auto()
+    READ_HEATS = auto()
+    WRITE_HEATS = auto()
     RACE_EVENTS = auto()
+    MARSHAL_RACES = auto()
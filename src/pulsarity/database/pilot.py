@@ -4,6 +4,8 @@ ORM classes for Pilot data
 
 from __future__ import annotations
 
+import json
+
 from tortoise import fields
 
 from .base import _PulsarityBase
@@ -17,6 +19,9 @@ class PilotAttribute(_PulsarityBase):
     """
 
     name = fields.CharField(max_length=80)
+    """Name of the attribute"""
+    value = fields.TextField(null=True)
+    """Value of the attribute"""
     pilot: fields.ForeignKeyRelation[Pilot] = fields.ForeignKeyField(
         "event.Pilot", related_name="attributes"
     )
@@ -76,6 +81,31 @@ class Pilot(_PulsarityBase):
     def __repr__(self):
         return f"<Pilot {self.id}>"
 
+    @property
+    def frequency_history(self) -> list[int]:
+        """
+        Parses the frequencies this pilot has been assigned, most recent first.
+        Entries are either plain frequencies or objects with the frequency
+        under the "f" key.
+
+        :return: The frequencies in MHz
+        """
+        if not self.used_frequencies:
+            return []
+
+        try:
+            entries = json.loads(self.used_frequencies)
+        except ValueError:
+            return []
+
+        history = []
+        for entry in entries if isinstance(entries, list) else []:
+            frequency = entry.get("f") if isinstance(entry, dict) else entry
+            if isinstance(frequency, int) and frequency > 0:
+                history.append(frequency)
+
+        return history
+
     @property
     def display_callsign(self) -> str:
         """
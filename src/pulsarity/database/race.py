@@ -0,0 +1,57 @@
+"""
+ORM classes for recorded race data
+"""
+
+from __future__ import annotations
+
+from uuid import uuid4
+
+from tortoise import fields
+
+from .base import _PulsarityBase
+
+# pylint: disable=R0903,E1136
+
+
+class SavedRace(_PulsarityBase):
+    """
+    A race that has been run and recorded
+    """
+
+    uuid = fields.UUIDField(default=uuid4, unique=True)
+    """Identifier assigned to the race when recording begins"""
+    start_time = fields.FloatField()
+    """The start of the race in milliseconds since epoch"""
+    laps: fields.ReverseRelation[Lap]
+    """Laps recorded for the race. Access through awaitable attributes."""
+
+    class Meta:
+        """Tortoise ORM metadata"""
+
+        app = "event"
+        table = "saved_race"
+
+
+class Lap(_PulsarityBase):
+    """
+    A gate crossing recorded during a race
+    """
+
+    race: fields.ForeignKeyRelation[SavedRace] = fields.ForeignKeyField(
+        "event.SavedRace", related_name="laps"
+    )
+    """The race the lap was recorded in"""
+    node_index = fields.IntField()
+    """Index of the timer node reporting the crossing"""
+    pilot_id = fields.IntField(null=True)
+    """Pilot assigned to the node, None if no pilot was assigned"""
+    timestamp = fields.FloatField()
+    """Time of the crossing in seconds since the start of the race"""
+    peak_rssi = fields.FloatField()
+    """Peak RSSI value of the crossing"""
+
+    class Meta:
+        """Tortoise ORM metadata"""
+
+        app = "event"
+        table = "lap"
@@ -2,7 +2,6 @@
 ORM classes for Format data
 """
 
-import pickle
 from dataclasses import dataclass
 
 from tortoise import fields
@@ -10,7 +9,7 @@ from tortoise import fields
 from .base import _PulsarityBase
 
 
-@dataclass
+@dataclass(frozen=True)
 class RaceSchedule:
     """
     Settings for scheduling a race
@@ -35,12 +34,23 @@ class RaceFormat(_PulsarityBase):
     which forces RotorHazard to switch to that formatwhen running races within the class.
     """
 
-    # pylint: disable=R0903
+    # pylint: disable=R0902,R0903
 
     name = fields.CharField(max_length=80, null=False)
     """User-facing name"""
-    _schedule = fields.BinaryField(null=False)
-    """Settings for race scheduling"""
+    stage_time_sec = fields.IntField()
+    """The amount of time for staging in seconds"""
+    random_stage_delay = fields.IntField()
+    """Maximum amount of random stage delay in milliseconds"""
+    unlimited_time = fields.BooleanField()
+    """True if race clock counts up, False if race clock counts down"""
+    race_time_sec = fields.IntField()
+    """Race clock duration in seconds, unused if unlimited_time is True"""
+    overtime_sec = fields.IntField()
+    """Overtime duration in seconds, -1 for unlimited, unused if unlimited_time is True"""
+
+    _decoded: RaceSchedule | None = None
+    """Cached schedule built from the columns"""
 
     class Meta:
         """Tortoise ORM metadata"""
@@ -52,19 +62,35 @@ class RaceFormat(_PulsarityBase):
         """
         Class initialization
 
-        :param schedule: _description_
+        :param name: User-facing name
+        :param schedule: Settings for race scheduling
         """
 
         super().__init__()
         self.name = name
-        self._schedule = pickle.dumps(schedule)
+        self.schedule = schedule
 
     @property
     def schedule(self) -> RaceSchedule:
-        """The race schedule for the race format"""
-        return pickle.loads(self._schedule)
+        """The race schedule for the race format. The schedule is built once
+        and reused until replaced through the setter."""
+        if self._decoded is None:
+            self._decoded = RaceSchedule(
+                stage_time_sec=self.stage_time_sec,
+                random_stage_delay=self.random_stage_delay,
+                unlimited_time=self.unlimited_time,
+                race_time_sec=self.race_time_sec,
+                overtime_sec=self.overtime_sec,
+            )
+
+        return self._decoded
 
     @schedule.setter
     def schedule(self, schedule: RaceSchedule) -> None:
         """Race schedule setter"""
-        self._schedule = pickle.dumps(schedule)
+        self.stage_time_sec = schedule.stage_time_sec
+        self.random_stage_delay = schedule.random_stage_delay
+        self.unlimited_time = schedule.unlimited_time
+        self.race_time_sec = schedule.race_time_sec
+        self.overtime_sec = schedule.overtime_sec
+        self._decoded = schedule
@@ -0,0 +1,150 @@
+"""
+Performance tuning of SQLite databases
+"""
+
+import copy
+import asyncio
+import logging
+import contextlib
+from collections.abc import Callable
+from typing import Any
+
+from tortoise import connections
+from tortoise.backends.sqlite.client import SqliteClient
+
+logger = logging.getLogger(__name__)
+
+SQLITE_ENGINE = "tortoise.backends.sqlite"
+
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16384,
+        "temp_store": "MEMORY",
+        "mmap_size": 64 * 1024 * 1024,
+    },
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        "wal_autocheckpoint": 0,
+    },
+}
+"""Pragmas applied to SQLite connections for each profile.
+
+`durable` syncs every commit to storage. `balanced` only syncs on
+checkpoints, a commit may be lost on power loss but the database is never
+corrupted, and keeps more pages in memory. `performance` additionally
+leaves checkpointing to :class:`WalCheckpointer` so a checkpoint never
+stalls a write during a race."""
+
+
+def apply_sqlite_profile(config: dict[str, Any], profile: str) -> dict[str, Any]:
+    """
+    Add the pragmas of a profile to the SQLite connections of a database
+    configuration. Pragmas already present in the credentials of a
+    connection are kept.
+
+    :param config: The database connections by name
+    :param profile: The name of the profile
+    :raises ValueError: The profile does not exist
+    :return: The updated copy of the configuration
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}")
+
+    config = copy.deepcopy(config)
+    for connection in config.values():
+        if isinstance(connection, dict) and connection.get("engine") == SQLITE_ENGINE:
+            credentials = connection.setdefault("credentials", {})
+            for pragma, value in SQLITE_PROFILES[profile].items():
+                credentials.setdefault(pragma, value)
+
+    return config
+
+
+class WalCheckpointer:
+    """
+    Checkpoints the write-ahead logs of the SQLite connections
+    periodically. Checkpoints are postponed while the system is busy, such
+    as while a race is underway, and run as soon as it is idle again.
+    """
+
+    interval: float = 60.0
+    """Seconds between checkpoints"""
+    retry_interval: float = 1.0
+    """Seconds between checks whether the system is still busy"""
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    async def checkpoint(mode: str = "PASSIVE") -> dict[str, tuple[int, int, int]]:
+        """
+        Checkpoint the write-ahead log of every SQLite connection
+
+        :param mode: The checkpoint mode, defaults to "PASSIVE"
+        :return: Whether the checkpoint was blocked, the number of pages
+        in the log and the number of pages checkpointed for each connection
+        """
+        results = {}
+        for client in connections.all():
+            if isinstance(client, SqliteClient):
+                _, rows = await client.execute_query(f"PRAGMA wal_checkpoint({mode})")
+                results[client.connection_name] = tuple(rows[0])
+
+        return results
+
+    async def _run(self, busy: Callable[[], bool]) -> None:
+        """
+        Checkpoint periodically when not busy
+
+        :param busy: Returns True while checkpoints should be postponed
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+
+            while busy():
+                await asyncio.sleep(self.retry_interval)
+
+            try:
+                results = await self.checkpoint()
+            except Exception:  # pylint: disable=W0718
+                logger.exception("Database checkpoint failed")
+            else:
+                logger.debug("Database checkpoint: %s", results)
+
+    def start(self, busy: Callable[[], bool] = lambda: False) -> None:
+        """
+        Start checkpointing in the background
+
+        :param busy: Returns True while checkpoints should be postponed,
+        defaults to never busy
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(busy))
+
+    async def stop(self) -> None:
+        """
+        Stop checkpointing
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+
+wal_checkpointer = WalCheckpointer()
@@ -22,6 +22,7 @@ from ..utils.config import configs
 
 from .base import _PulsarityBase
 from .role import Role
+from .writebehind import write_behind
 
 
 logger = logging.Logger(__name__)
@@ -228,6 +229,13 @@ class User(_PulsarityBase):
         """
         await self.filter(id=self.id).update(last_login=datetime.now())
 
+    def defer_login_time_update(self) -> None:
+        """
+        Queue an update of a user's `last_login` time to be written with
+        other deferred updates.
+        """
+        write_behind.update(User, self.id, last_login=datetime.now())
+
     async def update_password_required(self, status: bool) -> None:
         """
         Change the status of the `reset_required` attribute for a user
@@ -0,0 +1,130 @@
+"""
+Deferred writing of non-critical updates
+"""
+
+import asyncio
+import logging
+import contextlib
+from collections import defaultdict
+from typing import Any
+
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    Collects updates that may be written later, such as login times, and
+    writes them from a single task. Repeated updates to the same row are
+    merged into one, and every pending update of a database is written in
+    a single transaction once the interval passes or the number of pending
+    rows reaches the threshold.
+
+    Updates are held in memory until flushed, so only updates that can be
+    lost on a crash should be queued.
+    """
+
+    interval: float = 2.0
+    """Maximum seconds an update stays pending while running"""
+    threshold: int = 256
+    """Number of pending rows flushed without waiting for the interval"""
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self._pending: dict[tuple[type[Model], Any], dict[str, Any]] = {}
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def update(self, model: type[Model], pk: Any, **values: Any) -> None:
+        """
+        Queue an update of a row. Values of earlier pending updates to the
+        same row are replaced.
+
+        :param model: The model of the row
+        :param pk: The primary key of the row
+        :param values: The new values by field name
+        """
+        self._pending.setdefault((model, pk), {}).update(values)
+
+        if len(self._pending) >= self.threshold:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """
+        Write every pending update, one transaction per database. Updates
+        of a database failing to write are queued again without replacing
+        newer values.
+
+        :return: The number of rows written
+        """
+        # pylint: disable=W0212
+
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+
+            batches: dict[str | None, list[tuple[type[Model], Any, dict]]]
+            batches = defaultdict(list)
+            for (model, pk), values in pending.items():
+                batches[model._meta.default_connection].append((model, pk, values))
+
+            written = 0
+            for connection, batch in batches.items():
+                try:
+                    async with in_transaction(connection):
+                        for model, pk, values in batch:
+                            await model.filter(pk=pk).update(**values)
+
+                except Exception:  # pylint: disable=W0718
+                    logger.exception("Failed to write %d deferred updates", len(batch))
+                    for model, pk, values in batch:
+                        newer = self._pending.get((model, pk), {})
+                        self._pending[(model, pk)] = {**values, **newer}
+
+                else:
+                    written += len(batch)
+
+            return written
+
+    async def _run(self) -> None:
+        """
+        Flush pending updates on each interval or when reaching the
+        threshold
+        """
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+
+            self._wake.clear()
+            if self._pending:
+                await self.flush()
+
+    def start(self) -> None:
+        """
+        Start flushing in the background
+        """
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop flushing in the background and write every pending update
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        await self.flush()
+
+
+write_behind = WriteBehindQueue()
@@ -3,4 +3,10 @@ System events
 """
 
 from .broker import EventBroker
-from .enums import _ApplicationEvt, SpecialEvt, EventSetupEvt, RaceSequenceEvt
+from .enums import (
+    _ApplicationEvt,
+    SpecialEvt,
+    EventSetupEvt,
+    RaceSequenceEvt,
+    RaceResultsEvt,
+)
@@ -3,6 +3,7 @@ System event distribution to clients
 """
 
 from asyncio import PriorityQueue
+from itertools import count
 from collections.abc import AsyncGenerator, Callable
 from dataclasses import astuple
 from uuid import UUID, uuid4
@@ -29,12 +30,14 @@ class EventBroker:
         """
         self._connections: set[PriorityQueue] = set()
         self._callbacks: dict[str, set[Callable]] = {}
+        self._sequence = count()
 
     def publish(
         self, event: _ApplicationEvt, data: dict, *, uuid: UUID | None = None
     ) -> None:
         """
-        Push the event data to all subscribed clients
+        Push the event data to all subscribed clients. Events of the
+        same priority are received in the order they are published.
 
         :param event: Event type
         :param data: Event data
@@ -42,9 +45,11 @@ class EventBroker:
         """
         uuid_ = uuid4() if uuid is None else uuid
 
-        payload = (*astuple(event), uuid_, data)
+        priority, *event_data = astuple(event)
+        payload = (*event_data, uuid_, data)
+        item = (priority, next(self._sequence), payload)
         for connection in self._connections:
-            connection.put_nowait(payload)
+            connection.put_nowait(item)
 
     def trigger(
         self, event: _ApplicationEvt, data: dict, *, uuid: UUID | None = None
@@ -99,6 +104,7 @@ class EventBroker:
         self._connections.add(connection)
         try:
             while True:
-                yield await connection.get()
+                priority, _, payload = await connection.get()
+                yield (priority, *payload)
         finally:
             self._connections.remove(connection)
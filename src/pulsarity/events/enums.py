@@ -72,6 +72,9 @@ class EventSetupEvt(_ApplicationEvt):
     PILOT_ADD = _EvtPriority.MEDUIUM, SystemDefaultPerms.READ_PILOTS, auto()
     PILOT_ALTER = _EvtPriority.MEDUIUM, SystemDefaultPerms.READ_PILOTS, auto()
     PILOT_DELETE = _EvtPriority.MEDUIUM, SystemDefaultPerms.READ_PILOTS, auto()
+    PILOT_IMPORT = _EvtPriority.MEDUIUM, SystemDefaultPerms.READ_PILOTS, auto()
+    HEATS_GENERATE = _EvtPriority.MEDUIUM, SystemDefaultPerms.READ_HEATS, auto()
+    EVENT_SWITCH = _EvtPriority.HIGH, SystemDefaultPerms.EVENT_WEBSOCKET, auto()
 
 
 class RaceSequenceEvt(_ApplicationEvt):
@@ -81,6 +84,20 @@ class RaceSequenceEvt(_ApplicationEvt):
 
     RACE_SCHEDULE = _EvtPriority.HIGHEST, SystemDefaultPerms.RACE_EVENTS, auto()
     RACE_STAGE = _EvtPriority.HIGHEST, SystemDefaultPerms.RACE_EVENTS, auto()
+    RACE_START_REVEAL = _EvtPriority.HIGHEST, SystemDefaultPerms.RACE_EVENTS, auto()
     RACE_START = _EvtPriority.HIGHEST, SystemDefaultPerms.RACE_EVENTS, auto()
     RACE_FINISH = _EvtPriority.HIGHEST, SystemDefaultPerms.RACE_EVENTS, auto()
     RACE_STOP = _EvtPriority.HIGHEST, SystemDefaultPerms.RACE_EVENTS, auto()
+    LAP_RECORD = _EvtPriority.HIGH, SystemDefaultPerms.RACE_EVENTS, auto()
+    LEADERBOARD_UPDATE = _EvtPriority.MEDUIUM, SystemDefaultPerms.RACE_EVENTS, auto()
+
+
+class RaceResultsEvt(_ApplicationEvt):
+    """
+    Events associated with recorded race results
+    """
+
+    LAP_ADD = _EvtPriority.MEDUIUM, SystemDefaultPerms.MARSHAL_RACES, auto()
+    LAP_ALTER = _EvtPriority.MEDUIUM, SystemDefaultPerms.MARSHAL_RACES, auto()
+    LAP_DELETE = _EvtPriority.MEDUIUM, SystemDefaultPerms.MARSHAL_RACES, auto()
+    RESULTS_UPDATE = _EvtPriority.LOW, SystemDefaultPerms.RACE_EVENTS, auto()
@@ -17,6 +17,7 @@ from quart_auth import current_user as _current_user
 
 from .events import EventBroker
 from .race.manager import RaceManager
+from .hardware import TimerInterface
 from .database.user import User
 from .database.permission import UserPermission
 
@@ -36,6 +37,7 @@ class PulsarityApp(Quart):
 
         self.event_broker: EventBroker = EventBroker()
         self.race_manager: RaceManager = RaceManager()
+        self.timer_interface: TimerInterface = TimerInterface()
 
     def schedule_background_task(
         self, time: float, func: Callable, *args: Any, **kwargs: Any
@@ -0,0 +1,24 @@
+"""
+Timer hardware interfaces
+"""
+
+from .node import TimerNode, RssiBlock
+from .simulated import SimulatedNode
+from .buffer import SharedRssiBuffer, SampleSpan
+from .detection import CrossingDetector, DetectorSettings
+from .calibration import CalibrationTrace, ThresholdProposal, calibrate
+from .interface import TimerInterface
+
+__all__ = [
+    "TimerNode",
+    "RssiBlock",
+    "SimulatedNode",
+    "SharedRssiBuffer",
+    "SampleSpan",
+    "CrossingDetector",
+    "DetectorSettings",
+    "CalibrationTrace",
+    "ThresholdProposal",
+    "calibrate",
+    "TimerInterface",
+]
@@ -0,0 +1,216 @@
+"""
+Shared memory buffers for RSSI samples
+"""
+
+import sys
+from contextlib import contextmanager
+from collections.abc import Iterator
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+_HEADER_SIZE = 8
+_SAMPLE_TYPE = np.float32
+
+_segments: dict[str, SharedMemory] = {}
+"""Shared memory segments created by the current process"""
+
+
+class SampleSpan(NamedTuple):
+    """
+    Descriptor for a contiguous run of samples in a shared buffer
+    """
+
+    name: str
+    """Name of the shared memory segment"""
+    capacity: int
+    """Number of samples the buffer holds"""
+    position: int
+    """Total number of samples written to the buffer before the span"""
+    length: int
+    """Number of samples in the span"""
+
+
+@contextmanager
+def _attach(name: str) -> Iterator[SharedMemory]:
+    """
+    Open a shared memory segment by name for the duration of the context.
+    Segments created by the current process are used as is. Others are
+    owned by another process, are not registered for cleanup, and are
+    closed on exit so released buffers do not stay mapped in the workers
+    of the executor pool.
+
+    :param name: The name of the segment
+    :yield: The shared memory segment
+    """
+    # pylint: disable=E1123,W0212
+
+    segment = _segments.get(name)
+    if segment is not None:
+        yield segment
+        return
+
+    if sys.version_info >= (3, 13):
+        segment = SharedMemory(name, track=False)
+    else:
+        segment = SharedMemory(name)
+        resource_tracker.unregister(
+            segment._name, "shared_memory"  # type: ignore[attr-defined]
+        )
+
+    try:
+        yield segment
+    finally:
+        segment.close()
+
+
+def _views(segment: SharedMemory) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+    """
+    Map the write cursor and samples of a buffer
+
+    :param segment: The shared memory of the buffer
+    :return: The cursor and sample views
+    """
+    buffer = segment.buf
+    cursor = np.ndarray((1,), dtype=np.int64, buffer=buffer)
+    samples = np.ndarray(
+        ((segment.size - _HEADER_SIZE) // np.dtype(_SAMPLE_TYPE).itemsize,),
+        dtype=_SAMPLE_TYPE,
+        buffer=buffer,
+        offset=_HEADER_SIZE,
+    )
+    return cursor, samples
+
+
+def _intact(segment: SharedMemory, span: SampleSpan) -> bool:
+    """
+    Check that the samples of a span have not been overwritten
+
+    :param segment: The shared memory of the buffer
+    :param span: The span to check
+    :return: Whether the span is still intact
+    """
+    cursor, _ = _views(segment)
+    return int(cursor[0]) <= span.position + span.capacity
+
+
+def span_valid(span: SampleSpan) -> bool:
+    """
+    Check that the samples of a span have not been overwritten
+
+    :param span: The span to check
+    :return: Whether the span is still intact
+    """
+    with _attach(span.name) as segment:
+        return _intact(segment, span)
+
+
+def _copy_span(
+    segment: SharedMemory, span: SampleSpan, dtype: type[np.floating]
+) -> NDArray[np.floating]:
+    """
+    Copy the samples of a span out of the shared memory of its buffer
+
+    :param segment: The shared memory of the buffer
+    :param span: The span to copy
+    :param dtype: The type to copy the samples as
+    :return: The samples of the span
+    """
+    _, samples = _views(segment)
+    offset = span.position % span.capacity
+    return samples[offset : offset + span.length].astype(dtype)
+
+
+def read_span(
+    span: SampleSpan, dtype: type[np.floating] = _SAMPLE_TYPE
+) -> NDArray[np.floating]:
+    """
+    Read the samples of a span. Usable from any process, including the
+    workers of the executor pool.
+
+    The samples are copied out of the shared buffer so it does not stay
+    mapped once read. The copy is checked against the write cursor, so
+    samples overwritten while being read are never returned.
+
+    :param span: The span to read
+    :param dtype: The type to copy the samples as, defaults to float32
+    :raises ValueError: When the span has been overwritten
+    :return: The samples of the span
+    """
+    with _attach(span.name) as segment:
+        if not _intact(segment, span):
+            raise ValueError("Samples have been overwritten")
+
+        samples = _copy_span(segment, span, dtype)
+
+        if not _intact(segment, span):
+            raise ValueError("Samples have been overwritten")
+
+    return samples
+
+
+class SharedRssiBuffer:
+    """
+    Ring buffer of RSSI samples in shared memory. The capture side writes
+    blocks of samples and passes the returned spans to worker processes in
+    place of the samples themselves.
+
+    Each block is stored contiguously. A block that does not fit in the
+    space left before the end of the buffer is written at the start.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Class initialization
+
+        :param capacity: Number of samples to hold
+        """
+        size = _HEADER_SIZE + capacity * np.dtype(_SAMPLE_TYPE).itemsize
+        self._segment = SharedMemory(create=True, size=size)
+        _segments[self._segment.name] = self._segment
+
+        self._cursor, self._samples = _views(self._segment)
+        self._cursor[0] = 0
+        self.capacity = capacity
+        """Number of samples the buffer holds"""
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory segment"""
+        return self._segment.name
+
+    def write(self, samples: NDArray[np.floating]) -> SampleSpan:
+        """
+        Copy a block of samples into the buffer
+
+        :param samples: The samples to write
+        :raises ValueError: When the block is larger than the buffer
+        :return: The descriptor of the written samples
+        """
+        length = len(samples)
+        if length > self.capacity:
+            raise ValueError("Block is larger than the buffer")
+
+        position = int(self._cursor[0])
+        offset = position % self.capacity
+        if offset + length > self.capacity:
+            position += self.capacity - offset
+            offset = 0
+
+        self._samples[offset : offset + length] = samples
+        self._cursor[0] = position + length
+
+        return SampleSpan(self.name, self.capacity, position, length)
+
+    def close(self) -> None:
+        """
+        Release the shared memory. Spans of the buffer can no longer be
+        read afterwards.
+        """
+        del self._cursor, self._samples
+        _segments.pop(self._segment.name, None)
+        self._segment.close()
+        self._segment.unlink()
@@ -0,0 +1,271 @@
+"""
+Crossing threshold calibration from recorded RSSI
+"""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .detection import DetectorSettings
+from ..race.data import PILOT_ID_NONE
+from ..utils.executor import executor
+
+
+class CalibrationTrace(NamedTuple):
+    """
+    A recorded RSSI trace with its known number of gate crossings
+    """
+
+    node_index: int
+    """Index of the node the trace was recorded from"""
+    pilot_id: int
+    """The pilot assigned to the node during the recording"""
+    samples: NDArray[np.floating]
+    """The raw RSSI samples"""
+    crossings: int
+    """Number of gate crossings made during the recording, including the
+    crossing at the start of the race when it is counted"""
+
+
+class ThresholdProposal(NamedTuple):
+    """
+    Proposed crossing thresholds for a node or pilot
+    """
+
+    settings: DetectorSettings
+    """Detector settings using the proposed thresholds"""
+    noise_floor: float
+    """Estimated RSSI without a pilot near the gate"""
+    noise: float
+    """Estimated standard deviation of the smoothed RSSI noise"""
+    error: int
+    """Total difference between the detected and known crossings"""
+    margin: float
+    """Distance in RSSI from the proposal to the nearest thresholds with a
+    larger error"""
+
+
+class CalibrationResult(NamedTuple):
+    """
+    Threshold proposals of a calibration
+    """
+
+    nodes: dict[int, ThresholdProposal | None]
+    """Proposals for each node index, None if the traces of the node have
+    no usable signal"""
+    pilots: dict[int, ThresholdProposal | None]
+    """Proposals for each pilot id, None if the traces of the pilot have no
+    usable signal"""
+
+
+def _smooth(samples: NDArray[np.floating], window: int) -> NDArray[np.float64]:
+    """
+    Apply the moving average used by the crossing detector
+
+    :param samples: The raw samples
+    :param window: Number of samples to average
+    :return: The smoothed samples
+    """
+    values = np.asarray(samples, dtype=np.float64)
+    if window <= 1 or len(values) < window:
+        return values
+
+    return np.convolve(values, np.full(window, 1 / window), mode="valid")
+
+
+def _turning_points(values: NDArray[np.float64]) -> NDArray[np.float64]:
+    """
+    Reduce a signal to its alternating local extremes. Crossings detected
+    with hysteresis only depend on these points.
+
+    :param values: The signal
+    :return: The first value, the local extremes and the last value
+    """
+    values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+    if len(values) < 3:
+        return values
+
+    slopes = np.sign(np.diff(values))
+    turns = np.flatnonzero(slopes[1:] != slopes[:-1]) + 1
+    return values[np.concatenate(([0], turns, [len(values) - 1]))]
+
+
+def _count_crossings(
+    points: NDArray[np.float64],
+    enter_candidates: NDArray[np.float64],
+    exit_candidates: NDArray[np.float64],
+) -> NDArray[np.int64]:
+    """
+    Count the completed crossings of a signal for every pair of candidate
+    thresholds.
+
+    For a given exit threshold, the signal splits into segments separated
+    by the values below it. A segment is a completed crossing for every
+    enter threshold its maximum reaches, provided the signal drops below
+    the exit threshold after it.
+
+    :param points: The turning points of the signal
+    :param enter_candidates: The candidate enter thresholds in ascending order
+    :param exit_candidates: The candidate exit thresholds
+    :return: The number of crossings indexed by enter and exit candidate
+    """
+    counts = np.zeros((len(enter_candidates), len(exit_candidates)), dtype=np.int64)
+
+    for index, level in enumerate(exit_candidates):
+        below = points < level
+        if not below.any():
+            continue
+
+        # Only segments followed by a value below the threshold are complete
+        end = np.flatnonzero(below)[-1]
+        starts = np.flatnonzero(~below & np.concatenate(([True], below[:-1])))
+        starts = starts[starts < end]
+        if starts.size == 0:
+            continue
+
+        values = np.where(below[:end], -np.inf, points[:end])
+        maxima = np.maximum.reduceat(values, starts)
+        maxima.sort()
+        counts[:, index] = len(maxima) - np.searchsorted(maxima, enter_candidates)
+
+    return counts
+
+
+def _depth(feasible: NDArray[np.bool_]) -> NDArray[np.int64]:
+    """
+    Calculate the number of grid steps from each feasible cell to the
+    nearest infeasible one
+
+    :param feasible: The grid of feasible cells
+    :return: The depth of each cell
+    """
+    depth = np.zeros(feasible.shape, dtype=np.int64)
+    current = feasible.copy()
+
+    while current.any():
+        depth += current
+        eroded = current.copy()
+        eroded[1:, :] &= current[:-1, :]
+        eroded[:-1, :] &= current[1:, :]
+        eroded[:, 1:] &= current[:, :-1]
+        eroded[:, :-1] &= current[:, 1:]
+        eroded[[0, -1], :] = False
+        eroded[:, [0, -1]] = False
+        current = eroded
+
+    return depth
+
+
+def calibrate_traces(
+    traces: Sequence[CalibrationTrace], smoothing: int = 8, grid_size: int = 64
+) -> ThresholdProposal | None:
+    """
+    Search for the thresholds detecting the known number of crossings in
+    all of the provided traces. Intended to be run in the executor pool.
+
+    Candidate thresholds are spaced evenly between the noise floor and
+    the highest smoothed RSSI. Of the pairs with the lowest error, the one
+    furthest from any pair with a higher error is proposed.
+
+    :param traces: The traces recorded for a node or pilot
+    :param smoothing: Number of samples in the moving average window,
+    defaults to 8
+    :param grid_size: Number of candidates for each threshold, defaults to 64
+    :return: The proposed thresholds, None if the traces are too short or
+    their signal is too flat to place an enter threshold above an exit
+    threshold
+    """
+    # pylint: disable=R0914
+
+    traces = [trace for trace in traces if len(trace.samples) >= smoothing]
+    if not traces:
+        return None
+
+    smoothed = [_smooth(trace.samples, smoothing) for trace in traces]
+    combined = np.concatenate(smoothed)
+
+    # Passes only raise the signal, so the spread of the noise is taken
+    # from the values below the median
+    noise_floor = float(np.median(combined))
+    noise = float(1.4826 * np.median(noise_floor - combined[combined <= noise_floor]))
+    ceiling = float(combined.max())
+
+    exit_candidates = np.linspace(noise_floor + 2 * noise, ceiling, grid_size)
+    enter_candidates = np.linspace(noise_floor + 3 * noise, ceiling, grid_size)
+    enter, exit_ = np.meshgrid(enter_candidates, exit_candidates, indexing="ij")
+
+    errors = np.zeros(enter.shape, dtype=np.int64)
+    for trace, values in zip(traces, smoothed):
+        counts = _count_crossings(
+            _turning_points(values), enter_candidates, exit_candidates
+        )
+        errors += np.abs(counts - trace.crossings)
+
+    valid = enter > exit_
+    if not valid.any():
+        return None
+
+    errors[~valid] = np.iinfo(np.int64).max
+    best = int(errors.min())
+
+    depth = _depth((errors == best) & valid)
+    choice = np.unravel_index(
+        np.lexsort(((enter - exit_).ravel(), depth.ravel()))[-1], depth.shape
+    )
+
+    spacing = min(
+        float(enter_candidates[1] - enter_candidates[0]),
+        float(exit_candidates[1] - exit_candidates[0]),
+    )
+
+    return ThresholdProposal(
+        DetectorSettings(float(enter[choice]), float(exit_[choice]), smoothing),
+        noise_floor,
+        noise,
+        best,
+        int(depth[choice]) * spacing,
+    )
+
+
+async def calibrate(
+    traces: Sequence[CalibrationTrace], smoothing: int = 8, grid_size: int = 64
+) -> CalibrationResult:
+    """
+    Propose crossing thresholds for each node and pilot of a recorded
+    session. The search for each node and pilot runs in the executor pool.
+    Nodes and pilots without a usable signal, such as a node without a
+    receiver, have no proposal.
+
+    :param traces: The recorded traces
+    :param smoothing: Number of samples in the moving average window,
+    defaults to 8
+    :param grid_size: Number of candidates for each threshold, defaults to 64
+    :return: The proposals for the nodes and pilots
+    """
+    nodes: dict[int, list[CalibrationTrace]] = defaultdict(list)
+    pilots: dict[int, list[CalibrationTrace]] = defaultdict(list)
+
+    for trace in traces:
+        nodes[trace.node_index].append(trace)
+        if trace.pilot_id != PILOT_ID_NONE:
+            pilots[trace.pilot_id].append(trace)
+
+    loop = asyncio.get_running_loop()
+    pool = await executor.get_executor()
+    groups = [*nodes.values(), *pilots.values()]
+
+    proposals = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, calibrate_traces, group, smoothing, grid_size)
+            for group in groups
+        )
+    )
+
+    return CalibrationResult(
+        dict(zip(nodes, proposals[: len(nodes)])),
+        dict(zip(pilots, proposals[len(nodes) :])),
+    )
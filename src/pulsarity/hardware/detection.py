@@ -0,0 +1,463 @@
+"""
+Gate crossing detection from RSSI samples
+"""
+
+import asyncio
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .node import TimerNode, RssiBlock
+from .buffer import SharedRssiBuffer, SampleSpan, read_span
+from ..race.laps import CrossingRecord
+from ..utils.executor import executor
+
+_EMPTY = np.empty(0, dtype=np.float64)
+
+_Segment = Sequence[float] | NDArray[np.float64]
+
+
+@dataclass(frozen=True, slots=True)
+class DetectorSettings:
+    """
+    Tuning of the crossing detection
+    """
+
+    enter_at: float
+    """Smoothed RSSI value at which a crossing begins"""
+    exit_at: float
+    """Smoothed RSSI value below which a crossing ends"""
+    smoothing: int = 1
+    """Number of samples in the moving average window"""
+
+    def __post_init__(self) -> None:
+        """
+        Validate the thresholds
+
+        :raises ValueError: The enter threshold is not above the exit threshold
+        """
+        if self.enter_at <= self.exit_at:
+            raise ValueError("The enter threshold must be above the exit threshold")
+
+
+class DetectorState(NamedTuple):
+    """
+    Detection state carried from one block to the next
+    """
+
+    history: NDArray[np.float64] = _EMPTY
+    """The raw samples at the end of the previous block used for smoothing"""
+    crossing: bool = False
+    """Whether the signal is currently above the enter threshold"""
+    pending: NDArray[np.float64] = _EMPTY
+    """The last smoothed samples of an unfinished crossing, at most the
+    highest sample and the one before it"""
+    pending_start: float = 0.0
+    """Time of the first pending sample"""
+    peak: tuple[float, float, float] | None = None
+    """The highest sample of an unfinished crossing no longer pending,
+    with the time and value of the interpolated peak around it"""
+
+
+_SCALAR_BLOCK_SIZE = 128
+"""The largest block processed one sample at a time, as the overhead of
+the array operations outweighs the per-sample loop for small blocks"""
+
+
+def _interpolate_peak(segment: _Segment, index: int) -> tuple[float, float]:
+    """
+    Interpolate the peak of a crossing with a parabola through the highest
+    sample and its neighbours
+
+    :param segment: The smoothed samples of the crossing
+    :param index: The index of the highest sample
+    :return: The fractional sample index of the peak and its value
+    """
+    peak = float(segment[index])
+
+    if 0 < index < len(segment) - 1:
+        before, after = float(segment[index - 1]), float(segment[index + 1])
+        curvature = before - 2 * peak + after
+        if curvature < 0:
+            offset = 0.5 * (before - after) / curvature
+            return index + offset, peak - 0.25 * (before - after) * offset
+
+    return float(index), peak
+
+
+def _find_peak(segment: NDArray[np.float64]) -> tuple[float, float]:
+    """
+    Locate the peak of a crossing with parabolic interpolation between
+    the highest sample and its neighbours
+
+    :param segment: The smoothed samples of the crossing
+    :return: The fractional sample index of the peak and its value
+    """
+    return _interpolate_peak(segment, int(np.argmax(segment)))
+
+
+def _finish_crossing(
+    segment: _Segment,
+    index: int,
+    start_time: float,
+    sample_rate: float,
+    peak: tuple[float, float, float] | None,
+) -> tuple[float, float]:
+    """
+    Locate the peak of a completed crossing
+
+    :param segment: The pending and remaining smoothed samples of the crossing
+    :param index: The index of the first highest sample of the segment
+    :param start_time: Time of the first sample of the segment
+    :param sample_rate: Number of samples per second
+    :param peak: The peak found in the samples no longer pending
+    :return: The time and value of the peak
+    """
+    if peak is not None and peak[0] >= segment[index]:
+        return peak[1], peak[2]
+
+    offset, value = _interpolate_peak(segment, index)
+    return start_time + offset / sample_rate, value
+
+
+def _carry_crossing(
+    segment: _Segment,
+    index: int,
+    start_time: float,
+    sample_rate: float,
+    peak: tuple[float, float, float] | None,
+) -> DetectorState:
+    """
+    Reduce the samples of a crossing continuing into the next block to
+    the ones its peak may still depend on, so a signal staying above the
+    exit threshold does not grow the state
+
+    :param segment: The pending and new smoothed samples of the crossing
+    :param index: The index of the first highest sample of the segment
+    :param start_time: Time of the first sample of the segment
+    :param sample_rate: Number of samples per second
+    :param peak: The peak found in the samples no longer pending
+    :return: The state without the smoothing history
+    """
+    highest = float(segment[index])
+
+    if peak is None or highest > peak[0]:
+        if index == len(segment) - 1:
+            # The sample after the highest one is not known yet
+            keep = max(index - 1, 0)
+            return DetectorState(
+                crossing=True,
+                pending=np.array(segment[keep:], dtype=np.float64),
+                pending_start=start_time + keep / sample_rate,
+            )
+
+        peak = (
+            highest,
+            *_finish_crossing(segment, index, start_time, sample_rate, None),
+        )
+
+    # The last sample is the neighbour of the first sample of the next block
+    keep = len(segment) - 1
+    return DetectorState(
+        crossing=True,
+        pending=np.array(segment[keep:], dtype=np.float64),
+        pending_start=start_time + keep / sample_rate,
+        peak=peak,
+    )
+
+
+def _detect_scalar(
+    raw: NDArray[np.float64],
+    start_time: float,
+    sample_rate: float,
+    settings: DetectorSettings,
+    state: DetectorState,
+) -> tuple[list[tuple[float, float]], DetectorState]:
+    """
+    Detect crossings one sample at a time. See :func:`detect_block`.
+    """
+    # pylint: disable=R0914
+
+    window = max(settings.smoothing, 1)
+    history = state.history.tolist()
+    if len(history) < window - 1:
+        history = [float(raw[0])] * (window - 1 - len(history)) + history
+
+    values = history + raw.tolist()
+    total = sum(history)
+    first_time = start_time - (window - 1) / 2 / sample_rate
+
+    results: list[tuple[float, float]] = []
+    crossing = state.crossing
+    segment = state.pending.tolist()
+    segment_start = state.pending_start
+    peak = state.peak
+
+    for index, sample in enumerate(values[window - 1 :]):
+        total += sample
+        value = total / window
+        total -= values[index]
+
+        if crossing:
+            if value < settings.exit_at:
+                highest = segment.index(max(segment))
+                results.append(
+                    _finish_crossing(segment, highest, segment_start, sample_rate, peak)
+                )
+                crossing = False
+            else:
+                segment.append(value)
+        elif value >= settings.enter_at:
+            crossing = True
+            segment = [value]
+            segment_start = first_time + index / sample_rate
+            peak = None
+
+    next_history = (
+        np.array(values[len(values) - (window - 1) :]) if window > 1 else _EMPTY
+    )
+    if not crossing:
+        return results, DetectorState(next_history)
+
+    carried = _carry_crossing(
+        segment, segment.index(max(segment)), segment_start, sample_rate, peak
+    )
+    return results, carried._replace(history=next_history)
+
+
+def _detect_vectorized(
+    raw: NDArray[np.float64],
+    start_time: float,
+    sample_rate: float,
+    settings: DetectorSettings,
+    state: DetectorState,
+) -> tuple[list[tuple[float, float]], DetectorState]:
+    """
+    Detect crossings with array operations over the whole block. See
+    :func:`detect_block`.
+    """
+    # pylint: disable=R0914
+
+    window = max(settings.smoothing, 1)
+    history = state.history
+    if history.size < window - 1:
+        padding = np.full(window - 1 - history.size, raw[0])
+        history = np.concatenate((padding, history))
+
+    extended = np.concatenate((history, raw))
+    sums = np.cumsum(extended)
+    smoothed = sums[window - 1 :].copy()
+    smoothed[1:] -= sums[: len(raw) - 1]
+    smoothed /= window
+
+    next_history = extended[len(extended) - (window - 1) :] if window > 1 else _EMPTY
+    if not state.crossing and smoothed.max() < settings.enter_at:
+        return [], DetectorState(next_history)
+
+    first_time = start_time - (window - 1) / 2 / sample_rate
+    entries = np.flatnonzero(smoothed >= settings.enter_at)
+    exits = np.flatnonzero(smoothed < settings.exit_at)
+
+    results: list[tuple[float, float]] = []
+    crossing = state.crossing
+    pending = state.pending
+    pending_start = state.pending_start
+    peak = state.peak
+    position = 0
+
+    while True:
+        if not crossing:
+            next_entry = np.searchsorted(entries, position)
+            if next_entry == len(entries):
+                break
+
+            position = int(entries[next_entry])
+            crossing = True
+            pending = _EMPTY
+            pending_start = first_time + position / sample_rate
+            peak = None
+            continue
+
+        next_exit = np.searchsorted(exits, position)
+        if next_exit == len(exits):
+            pending = np.concatenate((pending, smoothed[position:]))
+            break
+
+        end = int(exits[next_exit])
+        segment = np.concatenate((pending, smoothed[position:end]))
+        results.append(
+            _finish_crossing(
+                segment, int(np.argmax(segment)), pending_start, sample_rate, peak
+            )
+        )
+
+        crossing = False
+        position = end
+
+    if not crossing:
+        return results, DetectorState(next_history)
+
+    carried = _carry_crossing(
+        pending, int(np.argmax(pending)), pending_start, sample_rate, peak
+    )
+    return results, carried._replace(history=next_history)
+
+
+def detect_block(
+    samples: NDArray[np.floating],
+    start_time: float,
+    sample_rate: float,
+    settings: DetectorSettings,
+    state: DetectorState,
+) -> tuple[list[tuple[float, float]], DetectorState]:
+    """
+    Detect the crossings completed within a block of samples. The block
+    must directly follow the one the state was produced from.
+
+    Smoothing uses a trailing moving average. The times of the smoothed
+    samples are shifted to the center of their windows to compensate for
+    the lag of the filter. Blocks that cannot reach the enter threshold
+    are skipped without smoothing. Small blocks are processed one sample
+    at a time and larger blocks with array operations.
+
+    :param samples: The raw RSSI samples
+    :param start_time: Time of the first sample
+    :param sample_rate: Number of samples per second
+    :param settings: Detection tuning
+    :param state: The state after the previous block
+    :return: The time and peak RSSI of each completed crossing, and the
+    state to use for the next block
+    """
+    raw = np.asarray(samples, dtype=np.float64)
+    if raw.size == 0:
+        return [], state
+
+    keep = max(settings.smoothing, 1) - 1
+    if (
+        not state.crossing
+        and raw.size >= keep
+        and raw.max() < settings.enter_at
+        and state.history.max(initial=-np.inf) < settings.enter_at
+    ):
+        # A moving average never exceeds the samples it is taken over
+        return [], DetectorState(np.array(raw[raw.size - keep :]) if keep else _EMPTY)
+
+    if raw.size <= _SCALAR_BLOCK_SIZE:
+        return _detect_scalar(raw, start_time, sample_rate, settings, state)
+
+    return _detect_vectorized(raw, start_time, sample_rate, settings, state)
+
+
+def detect_span(
+    span: SampleSpan,
+    start_time: float,
+    sample_rate: float,
+    settings: DetectorSettings,
+    state: DetectorState,
+) -> tuple[list[tuple[float, float]], DetectorState]:
+    """
+    Detect the crossings completed within a block of samples held in a
+    shared buffer. Intended to be run in the executor pool.
+
+    :param span: The location of the samples in the shared buffer
+    :param start_time: Time of the first sample
+    :param sample_rate: Number of samples per second
+    :param settings: Detection tuning
+    :param state: The state after the previous block
+    :raises ValueError: When the samples were overwritten before being read
+    :return: The time and peak RSSI of each completed crossing, and the
+    state to use for the next block
+    """
+    samples = read_span(span, np.float64)
+    return detect_block(samples, start_time, sample_rate, settings, state)
+
+
+class CrossingDetector:
+    """
+    Detects gate crossings in the RSSI stream of a single node.
+
+    Small blocks are processed inline as the cost of sending them to the
+    executor pool outweighs the computation. Larger blocks are copied into
+    a shared memory buffer so only their location is sent to the pool.
+    Blocks must be processed in order and one at a time.
+    """
+
+    inline_block_size: int = 1024
+    """The largest block to process without the executor pool"""
+    buffer_blocks: int = 4
+    """Number of the largest seen blocks the shared buffer is sized for"""
+
+    def __init__(self, node: TimerNode, settings: DetectorSettings) -> None:
+        """
+        Class initialization
+
+        :param node: The node the samples are read from
+        :param settings: Detection tuning
+        """
+        self.node = node
+        self.settings = settings
+        self._state = DetectorState()
+        self._buffer: SharedRssiBuffer | None = None
+
+    def reset(self) -> None:
+        """
+        Discard the state carried from the previous blocks
+        """
+        self._state = DetectorState()
+
+    def close(self) -> None:
+        """
+        Release the shared buffer used for large blocks
+        """
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def _write_shared(self, samples: NDArray[np.floating]) -> SampleSpan:
+        """
+        Copy samples into the shared buffer, replacing the buffer when the
+        block does not fit
+
+        :param samples: The samples to copy
+        :return: The location of the samples
+        """
+        if self._buffer is None or len(samples) > self._buffer.capacity:
+            self.close()
+            self._buffer = SharedRssiBuffer(len(samples) * self.buffer_blocks)
+
+        return self._buffer.write(samples)
+
+    async def process(self, block: RssiBlock) -> list[CrossingRecord]:
+        """
+        Detect the crossings completed within a block of samples
+
+        :param block: The next block of samples from the node
+        :return: The detected crossings
+        """
+        samples = np.frombuffer(block.samples, dtype=block.samples.typecode)
+
+        if len(samples) <= self.inline_block_size:
+            results, self._state = detect_block(
+                samples, block.start_time, block.sample_rate, self.settings, self._state
+            )
+        else:
+            span = self._write_shared(samples)
+            loop = asyncio.get_running_loop()
+            pool = await executor.get_executor()
+            results, self._state = await loop.run_in_executor(
+                pool,
+                detect_span,
+                span,
+                block.start_time,
+                block.sample_rate,
+                self.settings,
+                self._state,
+            )
+
+        return [
+            CrossingRecord(self.node.index, self.node.pilot_id, time, peak)
+            for time, peak in results
+        ]
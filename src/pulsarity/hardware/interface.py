@@ -0,0 +1,137 @@
+"""
+Timer interface management
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+from collections.abc import Callable
+
+from .node import TimerNode, RssiBlock
+from .detection import CrossingDetector
+from ..race.data import PILOT_ID_NONE
+
+if TYPE_CHECKING:
+    from ..extensions import current_app
+else:
+    from quart import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class TimerInterface:
+    """
+    Reads the streams of all connected timer nodes. Crossings are passed
+    to the race manager's lap recorder and RSSI blocks are distributed to
+    the registered listeners.
+    """
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self._nodes: list[TimerNode] = []
+        self._tasks: set[asyncio.Task] = set()
+        self._rssi_listeners: set[Callable[[RssiBlock], None]] = set()
+        self._detectors: dict[int, CrossingDetector] = {}
+
+    @property
+    def nodes(self) -> tuple[TimerNode, ...]:
+        """The nodes managed by the interface"""
+        return tuple(self._nodes)
+
+    def add_node(
+        self, node: TimerNode, detector: CrossingDetector | None = None
+    ) -> None:
+        """
+        Add a node to the interface
+
+        :param node: The node to add
+        :param detector: Detector to find crossings in the RSSI samples of
+        the node, defaults to None for nodes reporting their own crossings
+        """
+        self._nodes.append(node)
+
+        if detector is not None:
+            self._detectors[node.index] = detector
+
+    def assign_pilots(self, pilots: dict[int, int]) -> None:
+        """
+        Assign pilots to the nodes. Nodes without a pilot are unassigned.
+
+        :param pilots: The pilot id by node index
+        """
+        for node in self._nodes:
+            node.pilot_id = pilots.get(node.index, PILOT_ID_NONE)
+
+    def add_rssi_listener(self, listener: Callable[[RssiBlock], None]) -> None:
+        """
+        Register a listener to receive the RSSI blocks of all nodes
+
+        :param listener: The listener to register
+        """
+        self._rssi_listeners.add(listener)
+
+    def remove_rssi_listener(self, listener: Callable[[RssiBlock], None]) -> None:
+        """
+        Unregister a RSSI listener
+
+        :param listener: The listener to remove
+        """
+        self._rssi_listeners.discard(listener)
+
+    async def start(self) -> None:
+        """
+        Connect to all nodes and begin reading their streams. Should be
+        called with an app context so crossings can be recorded.
+        """
+        for node in self._nodes:
+            await node.connect()
+
+            for reader in (self._read_crossings, self._read_rssi):
+                task = asyncio.create_task(reader(node))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        logger.info("Timer interface started with %d nodes", len(self._nodes))
+
+    async def stop(self) -> None:
+        """
+        Stop reading the node streams and disconnect from all nodes
+        """
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for node in self._nodes:
+            await node.disconnect()
+
+        for detector in self._detectors.values():
+            detector.close()
+
+    async def _read_crossings(self, node: TimerNode) -> None:
+        """
+        Pass the crossings reported by a node to the lap recorder
+
+        :param node: The node to read
+        """
+        async for crossing in node.crossings():
+            current_app.race_manager.lap_recorder.record(crossing)
+
+    async def _read_rssi(self, node: TimerNode) -> None:
+        """
+        Distribute the RSSI blocks of a node to the listeners and its
+        crossing detector
+
+        :param node: The node to read
+        """
+        detector = self._detectors.get(node.index)
+
+        async for block in node.rssi_samples():
+            for listener in self._rssi_listeners:
+                listener(block)
+
+            if detector is not None:
+                for crossing in await detector.process(block):
+                    current_app.race_manager.lap_recorder.record(crossing)
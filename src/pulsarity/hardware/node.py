@@ -0,0 +1,81 @@
+"""
+Timer node abstraction
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from typing import NamedTuple
+from collections.abc import AsyncIterator
+
+from ..race.laps import CrossingRecord
+from ..race.data import PILOT_ID_NONE
+
+
+class RssiBlock(NamedTuple):
+    """
+    A block of consecutive RSSI samples from a node
+    """
+
+    node_index: int
+    """Index of the node the samples were read from"""
+    start_time: float
+    """Event loop time of the first sample"""
+    sample_rate: float
+    """Number of samples per second"""
+    samples: array
+    """The RSSI samples"""
+
+    def sample_time(self, index: int) -> float:
+        """
+        Calculate the event loop time of a sample in the block
+
+        :param index: The index of the sample
+        :return: The time of the sample
+        """
+        return self.start_time + index / self.sample_rate
+
+
+class TimerNode(ABC):
+    """
+    Interface for a single timing node. Nodes stream the RSSI samples they
+    read and the gate crossings they detect.
+    """
+
+    def __init__(self, index: int) -> None:
+        """
+        Class initialization
+
+        :param index: The index of the node in the timer
+        """
+        self.index = index
+        """The index of the node in the timer"""
+        self.pilot_id: int = PILOT_ID_NONE
+        """The pilot currently assigned to the node"""
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """
+        Open the connection to the node
+        """
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        """
+        Close the connection to the node
+        """
+
+    @abstractmethod
+    def rssi_samples(self) -> AsyncIterator[RssiBlock]:
+        """
+        Stream the RSSI samples read by the node
+
+        :yield: Blocks of consecutive samples
+        """
+
+    @abstractmethod
+    def crossings(self) -> AsyncIterator[CrossingRecord]:
+        """
+        Stream the gate crossings detected by the node
+
+        :yield: Crossing reports
+        """
@@ -0,0 +1,188 @@
+"""
+Simulated timer nodes
+"""
+
+import math
+import asyncio
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import AsyncIterator
+
+from .node import TimerNode, RssiBlock
+from ..race.laps import CrossingRecord
+
+
+class SimulatedNode(TimerNode):
+    """
+    A timer node generating the RSSI trace of a single pilot flying laps.
+
+    Each gate pass is modeled as a gaussian rise of the RSSI above the
+    noise floor, centered on the time of the crossing. The node reports
+    the crossing once the RSSI has fallen back off the peak, similar to
+    the behavior of node firmware. Crossings are generated as they are
+    read, and the ones before the window of the latest read are dropped
+    beyond the number retained.
+    """
+
+    # pylint: disable=R0902,R0913,W0236
+
+    retained_passes: int = 64
+    """Number of gate crossings kept once they are before the read window"""
+
+    def __init__(
+        self,
+        index: int,
+        *,
+        sample_rate: float = 1000.0,
+        block_size: int = 50,
+        lap_time: float = 20.0,
+        lap_variation: float = 2.0,
+        noise_floor: float = 40.0,
+        peak_rssi: float = 160.0,
+        noise: float = 3.0,
+        pass_width: float = 0.25,
+        seed: int | None = None,
+    ) -> None:
+        """
+        Class initialization
+
+        :param index: The index of the node in the timer
+        :param sample_rate: Number of RSSI samples per second, defaults to 1000.0
+        :param block_size: Number of samples per streamed block, defaults to 50
+        :param lap_time: Mean lap time in seconds, defaults to 20.0
+        :param lap_variation: Standard deviation of the lap time, defaults to 2.0
+        :param noise_floor: RSSI value without a pilot near the gate, defaults to 40.0
+        :param peak_rssi: RSSI value when the pilot crosses the gate, defaults to 160.0
+        :param noise: Standard deviation of the RSSI noise, defaults to 3.0
+        :param pass_width: Standard deviation in seconds of the RSSI
+        rise around a crossing, defaults to 0.25
+        :param seed: Seed for the random generators, defaults to None
+        """
+        super().__init__(index)
+
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.lap_time = lap_time
+        self.lap_variation = lap_variation
+        self.noise_floor = noise_floor
+        self.peak_rssi = peak_rssi
+        self.noise = noise
+        self.pass_width = pass_width
+
+        self._lap_random = random.Random(seed)
+        self._noise_random = random.Random(None if seed is None else seed + 1)
+        self._passes: list[float] = []
+        self._dropped = 0
+        self._connected = False
+
+    @property
+    def report_delay(self) -> float:
+        """Seconds after a crossing that it is reported"""
+        return 2 * self.pass_width
+
+    @property
+    def passes(self) -> list[float]:
+        """The event loop times of the retained gate crossings"""
+        return self._passes
+
+    async def connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        first_pass = loop.time() + self._lap_random.uniform(0.5, 1.0) * self.lap_time
+
+        self._passes = [first_pass]
+        self._dropped = 0
+        self._connected = True
+
+    async def disconnect(self) -> None:
+        self._connected = False
+
+    def _extend_passes(self, until: float) -> None:
+        """
+        Generate gate crossings up to the provided time
+
+        :param until: The event loop time to generate crossings until
+        """
+        minimum = self.lap_time / 4
+
+        while self._passes[-1] < until:
+            lap = self._lap_random.gauss(self.lap_time, self.lap_variation)
+            self._passes.append(self._passes[-1] + max(lap, minimum))
+
+    def _trim_passes(self, before: float) -> None:
+        """
+        Drop the gate crossings before the provided time, keeping the
+        retained number of crossings
+
+        :param before: The event loop time to drop crossings before
+        """
+        stale = min(
+            bisect_left(self._passes, before),
+            len(self._passes) - max(self.retained_passes, 1),
+        )
+        if stale > 0:
+            del self._passes[:stale]
+            self._dropped += stale
+
+    def signal_at(self, time: float) -> float:
+        """
+        Calculate the RSSI at a point in time without noise
+
+        :param time: The event loop time
+        :return: The RSSI value
+        """
+        window = 4 * self.pass_width
+        self._extend_passes(time + window)
+        self._trim_passes(time - window)
+
+        start = bisect_left(self._passes, time - window)
+        end = bisect_right(self._passes, time + window)
+
+        value = self.noise_floor
+        amplitude = self.peak_rssi - self.noise_floor
+        scale = -0.5 / (self.pass_width * self.pass_width)
+
+        for pass_time in self._passes[start:end]:
+            offset = time - pass_time
+            value += amplitude * math.exp(scale * offset * offset)
+
+        return value
+
+    async def rssi_samples(self) -> AsyncIterator[RssiBlock]:
+        loop = asyncio.get_running_loop()
+        period = self.block_size / self.sample_rate
+        block_start = loop.time()
+
+        while self._connected:
+            block_end = block_start + period
+            await asyncio.sleep(max(block_end - loop.time(), 0))
+
+            samples = array(
+                "f",
+                (
+                    self.signal_at(block_start + i / self.sample_rate)
+                    + self._noise_random.gauss(0, self.noise)
+                    for i in range(self.block_size)
+                ),
+            )
+
+            yield RssiBlock(self.index, block_start, self.sample_rate, samples)
+            block_start = block_end
+
+    async def crossings(self) -> AsyncIterator[CrossingRecord]:
+        loop = asyncio.get_running_loop()
+        index = 0
+
+        while self._connected:
+            self._extend_passes(loop.time() + self.lap_time)
+            index = max(index, self._dropped)
+            pass_time = self._passes[index - self._dropped]
+
+            await asyncio.sleep(max(pass_time + self.report_delay - loop.time(), 0))
+
+            if not self._connected:
+                break
+
+            peak = self.signal_at(pass_time) + self._noise_random.gauss(0, self.noise)
+            yield CrossingRecord(self.index, self.pilot_id, pass_time, peak)
+            index += 1
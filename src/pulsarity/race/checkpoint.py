@@ -0,0 +1,172 @@
+"""
+Race state checkpointing
+"""
+
+import os
+import mmap
+import struct
+import logging
+import zlib
+from uuid import UUID
+from typing import IO
+from dataclasses import dataclass
+
+from .enums import RaceStatus
+from ..database.raceformat import RaceSchedule
+
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT_VERSION = 3
+
+_RECORD = struct.Struct("<HB?iiiidd16si")
+"""Version, status, unlimited time, stage time, random delay,
+race time, overtime, stage epoch millis, start epoch millis, race uuid,
+heat id"""
+
+_NO_UUID = bytes(16)
+
+_CRC = struct.Struct("<I")
+
+_CHECKPOINT_SIZE = _RECORD.size + _CRC.size
+
+
+@dataclass(frozen=True)
+class CheckpointState:
+    """
+    The state of the race manager at the time of a transition
+    """
+
+    status: RaceStatus
+    """The status of the race manager"""
+    schedule: RaceSchedule
+    """The schedule of the active race"""
+    stage_epoch_ms: float
+    """The time staging begins, in milliseconds since epoch"""
+    start_epoch_ms: float
+    """The time racing begins, in milliseconds since epoch"""
+    race_uuid: UUID | None = None
+    """The identifier of the recorded race, None if recording has not begun"""
+    heat_id: int | None = None
+    """The heat being raced, None if no heat is selected"""
+
+
+class RaceCheckpoint:
+    """
+    A small memory-mapped file storing the last race transition.
+
+    Writes only pack the state into the mapped pages and leave flushing
+    to the operating system. This keeps the write cost to a few
+    microseconds while still surviving a crash or restart of the
+    server process.
+    """
+
+    def __init__(self, filename: str) -> None:
+        """
+        Class initialization
+
+        :param filename: The file to store the checkpoint in
+        """
+        self._filename = filename
+        self._file: IO[bytes] | None = None
+        self._map: mmap.mmap | None = None
+
+    def open(self) -> None:
+        """
+        Open the checkpoint file, creating it if it does not exist
+        """
+        if self._map is not None:
+            return
+
+        mode = "r+b" if os.path.isfile(self._filename) else "w+b"
+
+        # pylint: disable=R1732
+        file = open(self._filename, mode)
+
+        if os.fstat(file.fileno()).st_size < _CHECKPOINT_SIZE:
+            file.truncate(_CHECKPOINT_SIZE)
+
+        self._file = file
+        self._map = mmap.mmap(file.fileno(), _CHECKPOINT_SIZE)
+
+    def close(self) -> None:
+        """
+        Flush and close the checkpoint file
+        """
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def write(self, state: CheckpointState) -> None:
+        """
+        Write the state to the checkpoint
+
+        :param state: The state to store
+        """
+        if self._map is None:
+            return
+
+        schedule = state.schedule
+        _RECORD.pack_into(
+            self._map,
+            0,
+            _CHECKPOINT_VERSION,
+            state.status,
+            schedule.unlimited_time,
+            schedule.stage_time_sec,
+            schedule.random_stage_delay,
+            schedule.race_time_sec,
+            schedule.overtime_sec,
+            state.stage_epoch_ms,
+            state.start_epoch_ms,
+            _NO_UUID if state.race_uuid is None else state.race_uuid.bytes,
+            0 if state.heat_id is None else state.heat_id,
+        )
+        crc = zlib.crc32(self._map[: _RECORD.size])
+        _CRC.pack_into(self._map, _RECORD.size, crc)
+
+    def read(self) -> CheckpointState | None:
+        """
+        Read the stored state from the checkpoint
+
+        :return: The stored state, or None if the checkpoint is empty
+        or invalid
+        """
+        if self._map is None:
+            return None
+
+        record = self._map[: _RECORD.size]
+        (crc,) = _CRC.unpack_from(self._map, _RECORD.size)
+
+        if crc != zlib.crc32(record):
+            logger.debug("Race checkpoint is empty or corrupted")
+            return None
+
+        values = _RECORD.unpack(record)
+
+        if values[0] != _CHECKPOINT_VERSION:
+            logger.warning("Unsupported race checkpoint version: %s", values[0])
+            return None
+
+        schedule = RaceSchedule(
+            stage_time_sec=values[3],
+            random_stage_delay=values[4],
+            unlimited_time=values[2],
+            race_time_sec=values[5],
+            overtime_sec=values[6],
+        )
+
+        race_uuid = None if values[9] == _NO_UUID else UUID(bytes=values[9])
+
+        return CheckpointState(
+            RaceStatus(values[1]),
+            schedule,
+            values[7],
+            values[8],
+            race_uuid,
+            values[10] or None,
+        )
@@ -0,0 +1,217 @@
+"""
+Compact storage of race data
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any
+from uuid import UUID
+
+from ..database.race import SavedRace, Lap
+
+PILOT_ID_NONE = 0
+"""Sentinel pilot id for crossings on nodes without an assigned pilot"""
+
+_COLUMNS = ("node_index", "pilot_id", "lap_number", "timestamp", "peak_rssi")
+
+
+class RaceData:
+    """
+    The crossings of a single race stored in parallel arrays.
+
+    Each crossing takes 24 bytes across the columns instead of a model
+    instance or dict per crossing.
+    """
+
+    # pylint: disable=R0902
+
+    __slots__ = (
+        "uuid",
+        "node_index",
+        "pilot_id",
+        "lap_number",
+        "timestamp",
+        "peak_rssi",
+        "_lap_counts",
+    )
+
+    def __init__(self, uuid: UUID) -> None:
+        """
+        Class initialization
+
+        :param uuid: The identifier of the race
+        """
+        self.uuid = uuid
+        self.node_index = array("i")
+        """Index of the timer node reporting each crossing"""
+        self.pilot_id = array("i")
+        """Pilot of each crossing, `PILOT_ID_NONE` if unassigned"""
+        self.lap_number = array("i")
+        """Number of previous crossings by the pilot on the node, 0 for the
+        holeshot"""
+        self.timestamp = array("d")
+        """Time of each crossing in seconds since the start of the race"""
+        self.peak_rssi = array("f")
+        """Peak RSSI value of each crossing"""
+        self._lap_counts: dict[tuple[int, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used by the stored crossings"""
+        return sum(
+            column.itemsize * len(column)
+            for column in (getattr(self, name) for name in _COLUMNS)
+        )
+
+    def append(
+        self, node_index: int, pilot_id: int, timestamp: float, peak_rssi: float
+    ) -> int:
+        """
+        Add a crossing
+
+        :param node_index: Index of the timer node reporting the crossing
+        :param pilot_id: Pilot of the crossing, `PILOT_ID_NONE` if unassigned
+        :param timestamp: Time of the crossing in seconds since the start of
+        the race
+        :param peak_rssi: Peak RSSI value of the crossing
+        :return: The lap number of the crossing
+        """
+        # Unassigned nodes all share the same pilot id
+        key = (node_index, pilot_id)
+        lap_number = self._lap_counts.get(key, 0)
+        self._lap_counts[key] = lap_number + 1
+
+        self.node_index.append(node_index)
+        self.pilot_id.append(pilot_id)
+        self.lap_number.append(lap_number)
+        self.timestamp.append(timestamp)
+        self.peak_rssi.append(peak_rssi)
+
+        return lap_number
+
+    def extend(self, rows: Iterable[tuple[int, int, float, float]]) -> None:
+        """
+        Add crossings in bulk
+
+        :param rows: The node index, pilot id, timestamp and peak RSSI of
+        each crossing
+        """
+        for node_index, pilot_id, timestamp, peak_rssi in rows:
+            self.append(node_index, pilot_id, timestamp, peak_rssi)
+
+    def crossing(self, index: int) -> dict[str, Any]:
+        """
+        Get a single crossing
+
+        :param index: The index of the crossing
+        :return: The crossing data
+        """
+        return {
+            "index": index,
+            "node_index": self.node_index[index],
+            "pilot_id": self.pilot_id[index],
+            "lap_number": self.lap_number[index],
+            "timestamp": self.timestamp[index],
+            "peak_rssi": self.peak_rssi[index],
+        }
+
+    def rows(
+        self, start: int = 0, end: int | None = None
+    ) -> Iterator[tuple[int, int, float, float]]:
+        """
+        Iterate over crossings without creating an object per crossing
+
+        :param start: Index of the first crossing, defaults to 0
+        :param end: Index after the last crossing, defaults to the end
+        :return: The node index, pilot id, timestamp and peak RSSI of each
+        crossing
+        """
+        return zip(
+            self.node_index[start:end],
+            self.pilot_id[start:end],
+            self.timestamp[start:end],
+            self.peak_rssi[start:end],
+        )
+
+    def to_laps(
+        self, race: SavedRace, start: int = 0, end: int | None = None
+    ) -> list[Lap]:
+        """
+        Convert crossings to database rows
+
+        :param race: The database entry of the race
+        :param start: Index of the first crossing, defaults to 0
+        :param end: Index after the last crossing, defaults to the end
+        :return: The unsaved database rows
+        """
+        return [
+            Lap(
+                race=race,
+                node_index=node_index,
+                pilot_id=pilot_id or None,
+                timestamp=timestamp,
+                peak_rssi=peak_rssi,
+            )
+            for node_index, pilot_id, timestamp, peak_rssi in self.rows(start, end)
+        ]
+
+    @classmethod
+    async def from_db(cls, race: SavedRace) -> "RaceData":
+        """
+        Load the crossings of a saved race in a single query
+
+        :param race: The database entry of the race
+        :return: The race data
+        """
+        rows = (
+            await Lap.filter(race=race)
+            .order_by("timestamp", "id")
+            .values_list("node_index", "pilot_id", "timestamp", "peak_rssi")
+        )
+
+        data = cls(race.uuid)
+        data.extend(
+            (node_index, pilot_id or PILOT_ID_NONE, timestamp, peak_rssi)
+            for node_index, pilot_id, timestamp, peak_rssi in rows
+        )
+        return data
+
+    def to_json(self) -> dict[str, Any]:
+        """
+        Convert the race data to a column oriented JSON compatible object
+
+        :return: The JSON compatible object
+        """
+        data: dict[str, Any] = {"uuid": str(self.uuid)}
+        for name in _COLUMNS:
+            data[name] = getattr(self, name).tolist()
+
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "RaceData":
+        """
+        Create race data from a column oriented JSON compatible object
+
+        :param data: The JSON compatible object
+        :raises ValueError: The columns are not of equal length
+        :return: The race data
+        """
+        columns = [data[name] for name in _COLUMNS]
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Race data columns are not of equal length")
+
+        race = cls(UUID(data["uuid"]))
+        for name, column in zip(_COLUMNS, columns):
+            getattr(race, name).extend(column)
+
+        for key, lap_number in zip(
+            zip(race.node_index, race.pilot_id), race.lap_number
+        ):
+            if lap_number >= race._lap_counts.get(key, 0):
+                race._lap_counts[key] = lap_number + 1
+
+        return race
@@ -22,3 +22,28 @@ class RaceStatus(IntEnum):
     """The duration of the race has been exceeded; Racing is still underway"""
     STOPPED = auto()
     """System no longer listening for lap crossings; Race results must be saved or discarded"""
+
+
+class RankingMethod(IntEnum):
+    """
+    Criteria for ranking pilots on a leaderboard
+    """
+
+    MOST_LAPS = auto()
+    """Most laps completed, ties broken by the earliest last crossing"""
+    FASTEST_LAP = auto()
+    """Fastest single lap"""
+    FASTEST_CONSECUTIVE = auto()
+    """Fastest total time of consecutive laps"""
+
+
+class SeedingMethod(IntEnum):
+    """
+    Method of distributing ranked pilots into heats
+    """
+
+    LADDER = auto()
+    """Consecutive ranks race together, the top ranked pilots in the first heat"""
+    BALANCED = auto()
+    """Ranks are dealt across the heats in a snake order to balance their
+    strength"""
@@ -0,0 +1,317 @@
+"""
+Frequency set optimization for the 5.8 GHz band
+"""
+
+import asyncio
+import logging
+from collections.abc import Sequence
+from itertools import permutations
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from ..database.pilot import Pilot
+from ..utils.executor import executor
+
+logger = logging.getLogger(__name__)
+
+BANDS: dict[str, tuple[int, ...]] = {
+    "A": (5865, 5845, 5825, 5805, 5785, 5765, 5745, 5725),
+    "B": (5733, 5752, 5771, 5790, 5809, 5828, 5847, 5866),
+    "E": (5705, 5685, 5665, 5645, 5885, 5905, 5925, 5945),
+    "F": (5740, 5760, 5780, 5800, 5820, 5840, 5860, 5880),
+    "R": (5658, 5695, 5732, 5769, 5806, 5843, 5880, 5917),
+}
+"""Channel frequencies in MHz of the common 5.8 GHz video bands"""
+
+MAX_FREQUENCIES = 8
+"""Maximum number of frequencies in a set. Assigning pilots to a set tries
+every permutation, so the cost grows with the factorial of the size."""
+
+
+class FrequencySettings(NamedTuple):
+    """
+    Settings for scoring frequency sets
+    """
+
+    bands: tuple[str, ...] = ("R", "F", "E", "A", "B")
+    """The bands to choose frequencies from"""
+    min_spacing: int = 30
+    """Minimum spacing between any two frequencies of a set in MHz"""
+    imd_width: float = 35.0
+    """Distance in MHz from a frequency of the set within which third order
+    intermodulation products interfere with it"""
+    spacing_weight: float = 1.0
+    """Weight of the smallest spacing of a set relative to the minimum,
+    counted up to twice the minimum"""
+    preference_weight: float = 2.0
+    """Weight of pilots being able to use a recently used frequency"""
+    history_decay: float = 0.5
+    """Preference for each recently used frequency relative to the more
+    recently used one"""
+    chunk_size: int = 16384
+    """Number of candidate sets scored at once"""
+    max_candidates: int = 2_000_000
+    """Maximum number of candidate sets to score"""
+
+
+class FrequencyPlan(NamedTuple):
+    """
+    A scored frequency set
+    """
+
+    frequencies: tuple[int, ...]
+    """The frequencies of the set in ascending order"""
+    assignment: tuple[int, ...]
+    """The frequency assigned to each pilot"""
+    score: float
+    """Overall score of the set, higher is better"""
+    imd: float
+    """Intermodulation penalty of the set, 0 if no products interfere"""
+    spacing: int
+    """Smallest spacing between two frequencies of the set in MHz"""
+
+
+def band_frequencies(bands: Sequence[str]) -> npt.NDArray[np.int32]:
+    """
+    Get the distinct channel frequencies of bands
+
+    :param bands: The band names
+    :return: The frequencies in ascending order
+    """
+    return np.unique(np.array([f for band in bands for f in BANDS[band]], np.int32))
+
+
+def candidate_sets(
+    frequencies: npt.NDArray[np.int32], count: int, min_spacing: int, limit: int
+) -> npt.NDArray[np.intp]:
+    """
+    Enumerate every set of frequencies with the minimum spacing. Sets are
+    extended one frequency at a time for all sets at once.
+
+    :param frequencies: The available frequencies in ascending order
+    :param count: The number of frequencies in a set
+    :param min_spacing: Minimum spacing between frequencies in MHz
+    :param limit: The maximum number of sets
+    :raises ValueError: More sets than the limit exist
+    :return: Indices into the frequencies for each set, ascending per row
+    """
+    size = len(frequencies)
+    if count <= 0 or count > size:
+        return np.empty((0, max(count, 0)), np.intp)
+
+    # Index of the first frequency far enough above each frequency
+    after = np.searchsorted(frequencies, frequencies + min_spacing)
+    sets = np.arange(size, dtype=np.intp)[:, None]
+
+    for _ in range(count - 1):
+        first = after[sets[:, -1]]
+        lengths = size - first
+        total = int(lengths.sum())
+        if total > limit:
+            raise ValueError(
+                f"More than {limit} candidate sets, increase the minimum spacing"
+            )
+
+        rows = np.repeat(np.arange(len(sets)), lengths)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        sets = np.column_stack((sets[rows], first[rows] + offsets))
+
+    return sets
+
+
+def preference_weights(
+    histories: Sequence[Sequence[int]],
+    frequencies: npt.NDArray[np.int32],
+    decay: float,
+) -> npt.NDArray[np.float64]:
+    """
+    Weight the available frequencies for each pilot by how recently the pilot
+    used them
+
+    :param histories: Frequencies used by each pilot, most recent first
+    :param frequencies: The available frequencies in ascending order
+    :param decay: Weight of each frequency relative to the more recent one
+    :return: The weight of each frequency for each pilot
+    """
+    weights = np.zeros((len(histories), len(frequencies)))
+    for pilot, history in enumerate(histories):
+        weight = 1.0
+        for frequency in history:
+            index = np.searchsorted(frequencies, frequency)
+            if index < len(frequencies) and frequencies[index] == frequency:
+                weights[pilot, index] = max(weights[pilot, index], weight)
+            weight *= decay
+
+    return weights
+
+
+def score_sets(
+    sets: npt.NDArray[np.intp],
+    frequencies: npt.NDArray[np.int32],
+    weights: npt.NDArray[np.float64],
+    settings: FrequencySettings,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.int32]]:
+    """
+    Score candidate frequency sets.
+
+    The intermodulation penalty sums the squared overlap of every third
+    order product 2 * f1 - f2 with the nearest frequency of the set. The
+    preference of a set sums the weight of the best frequency of the set for
+    each pilot.
+
+    :param sets: Indices into the frequencies for each set, ascending per row
+    :param frequencies: The available frequencies in ascending order
+    :param weights: The weight of each frequency for each pilot
+    :param settings: The scoring settings
+    :return: The score, intermodulation penalty and smallest spacing of
+    each set
+    """
+    values = frequencies[sets].astype(np.float64)
+    count = values.shape[1]
+
+    spacing = np.diff(frequencies[sets], axis=1).min(
+        axis=1, initial=np.iinfo(np.int32).max
+    )
+    if count < 2:
+        spacing[:] = 0
+
+    first, second = np.nonzero(~np.eye(count, dtype=bool))
+    products = 2 * values[:, first] - values[:, second]
+    distance = np.abs(products[:, :, None] - values[:, None, :]).min(axis=2)
+    overlap = np.clip(settings.imd_width - distance, 0.0, None) / settings.imd_width
+    imd = np.square(overlap).sum(axis=1)
+
+    score = -imd
+    if count >= 2:
+        relative = np.minimum(spacing / settings.min_spacing, 2.0)
+        score += settings.spacing_weight * relative
+    if len(weights):
+        score += settings.preference_weight * weights[:, sets].max(axis=2).sum(axis=0)
+
+    return score, imd, spacing.astype(np.int32)
+
+
+def _assign(weights: npt.NDArray[np.float64], count: int) -> tuple[int, ...]:
+    """
+    Assign pilots to distinct frequencies of a set maximizing their total
+    preference
+
+    :param weights: The weight of each frequency of the set for each pilot
+    :param count: The number of frequencies in the set
+    :return: Index of the frequency of the set assigned to each pilot
+    """
+    pilots = len(weights)
+    if pilots == 0:
+        return ()
+
+    orders = np.array(list(permutations(range(count), pilots)), np.intp)
+    totals = weights[np.arange(pilots), orders].sum(axis=1)
+    return tuple(int(i) for i in orders[int(np.argmax(totals))])
+
+
+def optimize_frequencies(
+    count: int,
+    histories: Sequence[Sequence[int]] = (),
+    settings: FrequencySettings = FrequencySettings(),
+    results: int = 1,
+) -> list[FrequencyPlan]:
+    """
+    Find the best sets of frequencies for a heat
+
+    :param count: The number of frequencies in a set
+    :param histories: Frequencies recently used by each pilot of the heat,
+    most recent first, defaults to no pilots
+    :param settings: The scoring settings, defaults to FrequencySettings()
+    :param results: The number of sets to return, defaults to 1
+    :raises ValueError: There are more pilots than frequencies, more
+    frequencies than the maximum or the minimum spacing is not positive
+    :return: The best sets, best first
+    """
+    # pylint: disable=R0914
+
+    if len(histories) > count:
+        raise ValueError("More pilots than frequencies in the set")
+    if count > MAX_FREQUENCIES:
+        raise ValueError(f"More than {MAX_FREQUENCIES} frequencies in the set")
+    if settings.min_spacing < 1:
+        raise ValueError("The minimum spacing must be at least 1 MHz")
+
+    frequencies = band_frequencies(settings.bands)
+    sets = candidate_sets(
+        frequencies, count, settings.min_spacing, settings.max_candidates
+    )
+    weights = preference_weights(histories, frequencies, settings.history_decay)
+
+    scores, imds, spacings = [], [], []
+    for start in range(0, len(sets), settings.chunk_size):
+        chunk = sets[start : start + settings.chunk_size]
+        score, imd, spacing = score_sets(chunk, frequencies, weights, settings)
+        scores.append(score)
+        imds.append(imd)
+        spacings.append(spacing)
+
+    if not scores:
+        return []
+
+    score_all = np.concatenate(scores)
+    imd_all = np.concatenate(imds)
+    spacing_all = np.concatenate(spacings)
+
+    results = min(results, len(score_all))
+    best = np.argpartition(-score_all, results - 1)[:results]
+    best = best[np.argsort(-score_all[best], kind="stable")]
+
+    plans = []
+    for index in best:
+        chosen = sets[index]
+        assignment = _assign(weights[:, chosen], count)
+        plans.append(
+            FrequencyPlan(
+                tuple(int(f) for f in frequencies[chosen]),
+                tuple(int(frequencies[chosen[i]]) for i in assignment),
+                float(score_all[index]),
+                float(imd_all[index]),
+                int(spacing_all[index]),
+            )
+        )
+
+    return plans
+
+
+async def plan_frequencies(
+    pilot_ids: Sequence[int],
+    count: int | None = None,
+    settings: FrequencySettings = FrequencySettings(),
+) -> FrequencyPlan | None:
+    """
+    Find the best set of frequencies for the pilots of a heat in the executor
+    pool, preferring the frequencies each pilot has recently used
+
+    :param pilot_ids: The pilots of the heat
+    :param count: The number of frequencies in the set, defaults to one per
+    pilot
+    :param settings: The scoring settings, defaults to FrequencySettings()
+    :return: The best set, None if no set satisfies the settings
+    """
+    pilots = {pilot.id: pilot for pilot in await Pilot.filter(id__in=list(pilot_ids))}
+    histories = [
+        pilots[id_].frequency_history if id_ in pilots else [] for id_ in pilot_ids
+    ]
+
+    loop = asyncio.get_running_loop()
+    pool = await executor.get_executor()
+    plans = await loop.run_in_executor(
+        pool,
+        optimize_frequencies,
+        len(pilot_ids) if count is None else count,
+        histories,
+        settings,
+    )
+
+    if not plans:
+        logger.warning("No frequency set satisfies the settings")
+        return None
+
+    return plans[0]
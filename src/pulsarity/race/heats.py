@@ -0,0 +1,459 @@
+"""
+Heat generation and seeding
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, NamedTuple
+
+from tortoise.transactions import in_transaction
+
+from .enums import SeedingMethod
+from ..events import EventSetupEvt
+from ..database.heat import Heat, HeatSlot
+from ..database.pilot import Pilot
+from ..utils.executor import executor
+
+if TYPE_CHECKING:
+    from ..extensions import current_app
+else:
+    from quart import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class HeatSettings(NamedTuple):
+    """
+    Settings for seeding heats
+    """
+
+    frequencies: tuple[int, ...]
+    """Frequency of each timer node in MHz. The number of frequencies is the
+    maximum number of pilots in a heat."""
+    method: SeedingMethod = SeedingMethod.LADDER
+    """Method of distributing the ranked pilots into heats"""
+    tolerance: int = 2
+    """Number of ranking positions two pilots may be apart to be swapped
+    between heats to resolve frequency conflicts"""
+
+
+class HeatPlan(NamedTuple):
+    """
+    A generated heat
+    """
+
+    pilots: tuple[int, ...]
+    """Pilot assigned to each timer node, 0 for an empty node"""
+    seeds: tuple[int, ...]
+    """Ranking position of the pilot assigned to each timer node starting
+    at 1, 0 for an empty node"""
+
+
+def _heat_sizes(count: int, size: int) -> list[int]:
+    """
+    Split pilots into the fewest heats, with heat sizes differing by at
+    most one pilot
+
+    :param count: The number of pilots
+    :param size: The maximum number of pilots in a heat
+    :return: The number of pilots in each heat
+    """
+    heats = -(-count // size)
+    base, extra = divmod(count, heats)
+    return [base + 1 if i < extra else base for i in range(heats)]
+
+
+def _initial_heats(count: int, size: int, method: SeedingMethod) -> list[int]:
+    """
+    Distribute ranks into heats without any constraints
+
+    :param count: The number of pilots
+    :param size: The maximum number of pilots in a heat
+    :param method: The seeding method
+    :return: The heat of each rank
+    """
+    sizes = _heat_sizes(count, size)
+
+    if method == SeedingMethod.LADDER:
+        heat_of = []
+        for heat, heat_size in enumerate(sizes):
+            heat_of.extend([heat] * heat_size)
+        return heat_of
+
+    heats = len(sizes)
+    filled = [0] * heats
+    heat_of = []
+    tier = 0
+    while len(heat_of) < count:
+        order = range(heats) if tier % 2 == 0 else range(heats - 1, -1, -1)
+        for heat in order:
+            if filled[heat] < sizes[heat] and len(heat_of) < count:
+                heat_of.append(heat)
+                filled[heat] += 1
+        tier += 1
+
+    return heat_of
+
+
+def _conflicts(count: int) -> int:
+    """
+    Number of pilots unable to use a frequency preferred by count pilots in
+    the same heat
+    """
+    return count - 1 if count > 1 else 0
+
+
+def _swap_gain(
+    counts: list[Counter], heat_a: int, pref_a: int, heat_b: int, pref_b: int
+) -> int:
+    """
+    Reduction of frequency conflicts from swapping two pilots between heats
+
+    :param counts: The number of pilots preferring each frequency per heat
+    :param heat_a: The heat of the first pilot
+    :param pref_a: The preferred frequency of the first pilot, 0 for none
+    :param heat_b: The heat of the second pilot
+    :param pref_b: The preferred frequency of the second pilot, 0 for none
+    :return: The number of conflicts resolved, negative if more are created
+    """
+    if pref_a == pref_b:
+        return 0
+
+    gain = 0
+    for heat, leaving, joining in ((heat_a, pref_a, pref_b), (heat_b, pref_b, pref_a)):
+        count = counts[heat]
+        if leaving:
+            gain += _conflicts(count[leaving]) - _conflicts(count[leaving] - 1)
+        if joining:
+            gain += _conflicts(count[joining]) - _conflicts(count[joining] + 1)
+
+    return gain
+
+
+def _assign_nodes(
+    ranks: list[int],
+    ranking: Sequence[int],
+    preferences: Sequence[int],
+    frequencies: tuple[int, ...],
+) -> HeatPlan:
+    """
+    Assign the pilots of a heat to timer nodes, giving higher ranked pilots
+    their preferred frequency first
+
+    :param ranks: The ranks of the pilots in the heat in order
+    :param ranking: Pilot ids in ranking order
+    :param preferences: Preferred frequency of each rank, 0 for none
+    :param frequencies: Frequency of each timer node
+    :raises ValueError: A frequency is used by more than one timer node
+    :return: The generated heat
+    """
+    nodes = {frequency: node for node, frequency in enumerate(frequencies)}
+    if len(nodes) != len(frequencies):
+        raise ValueError("Each timer node needs a distinct frequency")
+
+    pilots = [0] * len(frequencies)
+    seeds = [0] * len(frequencies)
+    unplaced = []
+
+    for rank in ranks:
+        node = nodes.get(preferences[rank])
+        if node is not None and not seeds[node]:
+            pilots[node] = ranking[rank]
+            seeds[node] = rank + 1
+        else:
+            unplaced.append(rank)
+
+    free = (node for node, seed in enumerate(seeds) if not seed)
+    for rank, node in zip(unplaced, free):
+        pilots[node] = ranking[rank]
+        seeds[node] = rank + 1
+
+    return HeatPlan(tuple(pilots), tuple(seeds))
+
+
+def _resolve_conflicts(
+    heat_of: list[int], prefs: list[int], settings: HeatSettings
+) -> None:
+    """
+    Swap pilots between heats while the swaps reduce the number of pilots
+    unable to use their preferred frequency. Each pilot sharing a preferred
+    frequency within their heat is swapped with the nearest ranked pilot
+    giving the largest reduction.
+
+    :param heat_of: The heat of each rank, updated in place
+    :param prefs: Preferred frequency of each rank, 0 for none
+    :param settings: The seeding settings
+    """
+    # pylint: disable=R0914
+
+    count = len(heat_of)
+    heats = max(heat_of) + 1
+    balanced = settings.method == SeedingMethod.BALANCED
+
+    counts: list[Counter[int]] = [Counter() for _ in range(heats)]
+    for rank in range(count):
+        if prefs[rank]:
+            counts[heat_of[rank]][prefs[rank]] += 1
+
+    improved = True
+    while improved:
+        improved = False
+
+        for rank_a in range(count):
+            heat_a, pref_a = heat_of[rank_a], prefs[rank_a]
+            if not pref_a or counts[heat_a][pref_a] < 2:
+                continue
+
+            low = max(0, rank_a - settings.tolerance)
+            candidates = set(range(low, min(count, rank_a + settings.tolerance + 1)))
+            if balanced:
+                start = rank_a // heats * heats
+                candidates.update(range(start, min(count, start + heats)))
+
+            best, best_gain = -1, 0
+            for _, rank_b in sorted((abs(r - rank_a), r) for r in candidates):
+                heat_b = heat_of[rank_b]
+                if heat_b != heat_a:
+                    gain = _swap_gain(counts, heat_a, pref_a, heat_b, prefs[rank_b])
+                    if gain > best_gain:
+                        best, best_gain = rank_b, gain
+
+            if best < 0:
+                continue
+
+            heat_b, pref_b = heat_of[best], prefs[best]
+            counts[heat_a][pref_a] -= 1
+            counts[heat_b][pref_a] += 1
+            if pref_b:
+                counts[heat_b][pref_b] -= 1
+                counts[heat_a][pref_b] += 1
+            heat_of[rank_a], heat_of[best] = heat_b, heat_a
+            improved = True
+
+
+def seed_heats(
+    ranking: Sequence[int], preferences: Sequence[int], settings: HeatSettings
+) -> list[HeatPlan]:
+    """
+    Seed ranked pilots into heats.
+
+    Pilots are first distributed by the seeding method. Pilots preferring a
+    frequency already preferred by another pilot in their heat are then
+    swapped with nearby ranked pilots of other heats while the swaps reduce
+    the number of pilots unable to use their preferred frequency.
+
+    :param ranking: Pilot ids in ranking order
+    :param preferences: Preferred frequency of each pilot in ranking order,
+    0 for none
+    :param settings: The seeding settings
+    :raises ValueError: A frequency is used by more than one timer node
+    :return: The generated heats in order
+    """
+    size = len(settings.frequencies)
+    if not ranking or size == 0:
+        return []
+
+    available = set(settings.frequencies)
+    prefs = [pref if pref in available else 0 for pref in preferences]
+
+    heat_of = _initial_heats(len(ranking), size, settings.method)
+    _resolve_conflicts(heat_of, prefs, settings)
+
+    members: list[list[int]] = [[] for _ in range(max(heat_of) + 1)]
+    for rank, heat in enumerate(heat_of):
+        members[heat].append(rank)
+
+    return [
+        _assign_nodes(ranks, ranking, prefs, settings.frequencies) for ranks in members
+    ]
+
+
+class HeatGenerator:
+    """
+    Generates heats in the executor pool. Generated heats are cached by a
+    hash of the ranking, the frequency preferences and the settings they
+    were seeded from.
+    """
+
+    cache_size: int = 16
+    """Number of generated sets of heats to keep"""
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self._cache: OrderedDict[str, asyncio.Future[list[HeatPlan]]] = OrderedDict()
+
+    @staticmethod
+    def _key(
+        ranking: tuple[int, ...], preferences: tuple[int, ...], settings: HeatSettings
+    ) -> str:
+        """
+        Hash the inputs of the seeding
+
+        :return: The cache key
+        """
+        data = repr((ranking, preferences, tuple(settings))).encode()
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    async def generate(
+        self,
+        ranking: Sequence[int],
+        preferences: Sequence[int],
+        settings: HeatSettings,
+    ) -> list[HeatPlan]:
+        """
+        Seed ranked pilots into heats. Concurrent requests for the same inputs
+        share a single computation.
+
+        :param ranking: Pilot ids in ranking order
+        :param preferences: Preferred frequency of each pilot in ranking order,
+        0 for none
+        :param settings: The seeding settings
+        :return: The generated heats in order
+        """
+        ranking_, preferences_ = tuple(ranking), tuple(preferences)
+        key = self._key(ranking_, preferences_, settings)
+
+        future = self._cache.get(key)
+        if future is not None:
+            self._cache.move_to_end(key)
+            return await future
+
+        loop = asyncio.get_running_loop()
+        pool = await executor.get_executor()
+        future = loop.run_in_executor(
+            pool, seed_heats, ranking_, preferences_, settings
+        )
+
+        self._cache[key] = future
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        try:
+            return await future
+        except Exception:
+            self._cache.pop(key, None)
+            raise
+
+    @staticmethod
+    async def _save_round(plans: list[HeatPlan], round_index: int) -> dict:
+        """
+        Save generated heats in a single transaction
+
+        :param plans: The generated heats
+        :param round_index: The round of the heats
+        :return: The saved heats of the round
+        """
+        # pylint: disable=W0212
+
+        heats = []
+        async with in_transaction(Heat._meta.default_connection) as connection:
+            for position, plan in enumerate(plans):
+                heat = await Heat.create(
+                    name=f"Round {round_index + 1} Heat {position + 1}",
+                    round_index=round_index,
+                    position=position,
+                    using_db=connection,
+                )
+                slots = [
+                    HeatSlot(
+                        heat=heat,
+                        node_index=node,
+                        pilot_id=pilot_id or None,
+                        seed=seed or None,
+                    )
+                    for node, (pilot_id, seed) in enumerate(
+                        zip(plan.pilots, plan.seeds)
+                    )
+                ]
+                await HeatSlot.bulk_create(slots, using_db=connection)
+                heats.append(heat)
+
+        return {
+            "round_index": round_index,
+            "heats": [
+                {
+                    "id": heat.id,
+                    "name": heat.name,
+                    "pilots": list(plan.pilots),
+                    "seeds": list(plan.seeds),
+                }
+                for heat, plan in zip(heats, plans)
+            ],
+        }
+
+    @staticmethod
+    async def _ranked_pilots(
+        ranking: Sequence[int] | None,
+    ) -> tuple[dict[int, Pilot], list[int]]:
+        """
+        Get the pilots to seed in ranking order
+
+        :param ranking: Pilot ids in ranking order, None to rank active
+        pilots by their event results
+        :raises ValueError: The ranking contains pilots that do not exist
+        :return: The pilots by id and the ranking without repeated pilots
+        """
+        rows = await Pilot.filter(active=True).order_by("id")
+        pilots = {pilot.id: pilot for pilot in rows}
+
+        if ranking is None:
+            results = current_app.race_manager.results
+            await results.load()
+            ranked = [row["pilot_id"] for row in results.totals()]
+            ranked = [id_ for id_ in ranked if id_ in pilots]
+            seen = set(ranked)
+            ranked.extend(id_ for id_ in pilots if id_ not in seen)
+            return pilots, ranked
+
+        ranked = list(dict.fromkeys(ranking))
+        missing = [id_ for id_ in ranked if id_ not in pilots]
+        if missing:
+            pilots.update(
+                (pilot.id, pilot) for pilot in await Pilot.filter(id__in=missing)
+            )
+
+        unknown = [id_ for id_ in missing if id_ not in pilots]
+        if unknown:
+            raise ValueError(f"Unknown pilots in ranking: {unknown}")
+
+        return pilots, ranked
+
+    async def create_round(
+        self,
+        settings: HeatSettings,
+        round_index: int,
+        ranking: Sequence[int] | None = None,
+    ) -> dict:
+        """
+        Generate and save the heats of a round.
+
+        Without a ranking, active pilots are ranked by their event results,
+        followed by pilots without results in the order they were added.
+
+        :param settings: The seeding settings
+        :param round_index: The round of the heats
+        :param ranking: Pilot ids in ranking order, repeated pilots only
+        count at their first position, defaults to None
+        :raises ValueError: The ranking contains pilots that do not exist
+        :return: The saved heats of the round
+        """
+        pilots, ranking = await self._ranked_pilots(ranking)
+
+        preferences = []
+        for pilot_id in ranking:
+            pilot = pilots.get(pilot_id)
+            history = [] if pilot is None else pilot.frequency_history
+            preferences.append(history[0] if history else 0)
+
+        plans = await self.generate(ranking, preferences, settings)
+
+        data = await self._save_round(plans, round_index)
+        current_app.event_broker.trigger(EventSetupEvt.HEATS_GENERATE, data)
+
+        logger.info("Generated %d heats for round %d", len(plans), round_index + 1)
+        return data
@@ -0,0 +1,245 @@
+"""
+Lap crossing ingestion
+"""
+
+import asyncio
+import logging
+import contextlib
+from uuid import UUID, uuid4
+from typing import NamedTuple, TYPE_CHECKING
+
+from tortoise.transactions import in_transaction
+
+from .data import RaceData
+from ..events import RaceSequenceEvt
+from ..database.race import SavedRace, Lap
+from ..utils.time import monotonic_to_epoch_millis
+
+if TYPE_CHECKING:
+    from ..extensions import current_app
+else:
+    from quart import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class CrossingRecord(NamedTuple):
+    """
+    A gate crossing reported by a timer source
+    """
+
+    node_index: int
+    """Index of the timer node reporting the crossing"""
+    pilot_id: int
+    """Pilot assigned to the node, `PILOT_ID_NONE` if unassigned"""
+    timestamp: float
+    """Event loop time of the crossing"""
+    peak_rssi: float
+    """Peak RSSI value of the crossing"""
+
+
+class _RaceLaps(RaceData):
+    """
+    The crossings of a race being recorded
+    """
+
+    # pylint: disable=R0903
+
+    __slots__ = ("start_time", "persisted", "accepting", "flush_event", "written")
+
+    def __init__(self, uuid: UUID, start_time: float) -> None:
+        """
+        Class initialization
+
+        :param uuid: The identifier of the race
+        :param start_time: The event loop time the race started
+        """
+        super().__init__(uuid)
+        self.start_time = start_time
+        self.persisted = 0
+        self.accepting = True
+        self.flush_event = asyncio.Event()
+        self.written = asyncio.Event()
+
+
+class LapRecorder:
+    """
+    Accepts crossings while a race is underway. Crossings are held in
+    compact per-race arrays, published to clients, and written to the
+    event database in batched transactions by a background writer.
+    """
+
+    flush_interval: float = 0.5
+    """Maximum number of seconds between writes to the database"""
+    batch_size: int = 250
+    """Number of pending crossings that triggers an early write"""
+    final_retries: int = 5
+    """Number of times the final write is retried after a failure"""
+
+    _laps: _RaceLaps | None = None
+
+    @property
+    def accepting(self) -> bool:
+        """Whether crossings are currently being accepted"""
+        return self._laps is not None and self._laps.accepting
+
+    @property
+    def race_uuid(self) -> UUID | None:
+        """The identifier of the race currently or last recorded"""
+        return None if self._laps is None else self._laps.uuid
+
+    def __len__(self) -> int:
+        return 0 if self._laps is None else len(self._laps)
+
+    def begin(
+        self,
+        start_time: float,
+        race_uuid: UUID | None = None,
+        saved: RaceData | None = None,
+    ) -> UUID:
+        """
+        Begin accepting crossings for a race
+
+        :param start_time: The event loop time the race started
+        :param race_uuid: The identifier of a previously started race to
+        continue recording, defaults to None
+        :param saved: The crossings of the race already in the database,
+        defaults to None
+        :return: The identifier of the race
+        """
+        if self._laps is not None:
+            self.end()
+
+        laps = _RaceLaps(uuid4() if race_uuid is None else race_uuid, start_time)
+        if saved is not None:
+            laps.extend(saved.rows())
+            laps.persisted = len(laps)
+        self._laps = laps
+
+        current_app.add_background_task(
+            self._persist, laps, monotonic_to_epoch_millis(start_time)
+        )
+
+        return laps.uuid
+
+    def end(self) -> None:
+        """
+        Stop accepting crossings. Any pending crossings are written to
+        the database in the background.
+        """
+        if self._laps is not None and self._laps.accepting:
+            self._laps.accepting = False
+            self._laps.flush_event.set()
+
+    async def wait_written(self) -> None:
+        """
+        Wait for the background writer of the last race to finish, including
+        the final write after recording has ended
+        """
+        if self._laps is not None:
+            await self._laps.written.wait()
+
+    def record(self, crossing: CrossingRecord) -> bool:
+        """
+        Record a crossing for the current race
+
+        :param crossing: The crossing to record
+        :return: Whether the crossing was accepted
+        """
+        laps = self._laps
+        if laps is None or not laps.accepting:
+            return False
+
+        index = len(laps)
+        timestamp = crossing.timestamp - laps.start_time
+        laps.append(
+            crossing.node_index, crossing.pilot_id, timestamp, crossing.peak_rssi
+        )
+
+        if index + 1 - laps.persisted >= self.batch_size:
+            laps.flush_event.set()
+
+        data = laps.crossing(index)
+        current_app.event_broker.trigger(RaceSequenceEvt.LAP_RECORD, data)
+
+        return True
+
+    async def _persist(self, laps: _RaceLaps, start_epoch_ms: float) -> None:
+        """
+        Write the crossings of a race to the database until recording
+        has ended or the server is shutting down
+
+        :param laps: The crossings of the race
+        :param start_epoch_ms: The start of the race in milliseconds since epoch
+        """
+        try:
+            await self._write_race(laps, start_epoch_ms)
+        finally:
+            laps.written.set()
+
+    async def _write_race(self, laps: _RaceLaps, start_epoch_ms: float) -> None:
+        """
+        Write the crossings of a race until recording has ended, then
+        refresh the results of the race
+
+        :param laps: The crossings of the race
+        :param start_epoch_ms: The start of the race in milliseconds since epoch
+        """
+        race, _ = await SavedRace.get_or_create(
+            uuid=laps.uuid, defaults={"start_time": start_epoch_ms}
+        )
+
+        shutdown = current_app.shutdown_event
+
+        while laps.accepting and not shutdown.is_set():
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(laps.flush_event.wait(), self.flush_interval)
+
+            laps.flush_event.clear()
+            await self._flush(laps, race)
+
+        for _ in range(self.final_retries):
+            if await self._flush(laps, race) or shutdown.is_set():
+                break
+            await asyncio.sleep(self.flush_interval)
+        else:
+            logger.error(
+                "Lost %d crossings of race %s", len(laps) - laps.persisted, laps.uuid
+            )
+
+        if not shutdown.is_set():
+            results = current_app.race_manager.results
+            results.invalidate_race(race.id)
+            await results.update()
+
+    async def _flush(self, laps: _RaceLaps, race: SavedRace) -> bool:
+        """
+        Write all pending crossings in a single transaction. Model
+        instances are built one batch at a time to avoid blocking the
+        event loop. Crossings failing to write stay pending for the next
+        write.
+
+        :param laps: The crossings of the race
+        :param race: The database entry of the race
+        :return: Whether all pending crossings are written
+        """
+        # pylint: disable=W0212
+
+        end = len(laps)
+        if laps.persisted >= end:
+            return True
+
+        try:
+            async with in_transaction(Lap._meta.default_connection) as connection:
+                for batch_start in range(laps.persisted, end, self.batch_size):
+                    batch_end = min(batch_start + self.batch_size, end)
+                    batch = laps.to_laps(race, batch_start, batch_end)
+                    await Lap.bulk_create(batch, using_db=connection)
+
+        except Exception:  # pylint: disable=W0718
+            logger.exception("Failed to persist %d crossings", end - laps.persisted)
+            return False
+
+        logger.debug("Persisted %d crossings", end - laps.persisted)
+        laps.persisted = end
+        return True
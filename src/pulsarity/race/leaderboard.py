@@ -0,0 +1,459 @@
+"""
+Live race standings
+"""
+
+import math
+from collections import deque
+from collections.abc import Iterable
+from typing import NamedTuple, TYPE_CHECKING
+
+from sortedcontainers import SortedList  # type: ignore[import-untyped]
+
+from .enums import RankingMethod
+from .data import PILOT_ID_NONE
+from ..events import RaceSequenceEvt
+
+if TYPE_CHECKING:
+    from ..extensions import current_app
+else:
+    from quart import current_app
+
+
+class PilotStanding:
+    """
+    Race statistics of a single pilot, updated one crossing at a time
+    """
+
+    __slots__ = (
+        "pilot_id",
+        "laps",
+        "total_time",
+        "fastest_lap",
+        "consecutive",
+        "last_crossing",
+        "_window",
+    )
+
+    def __init__(self, pilot_id: int, consecutive_count: int) -> None:
+        """
+        Class initialization
+
+        :param pilot_id: The id of the pilot
+        :param consecutive_count: Number of laps in the consecutive lap window
+        """
+        self.pilot_id = pilot_id
+        self.laps = 0
+        self.total_time = 0.0
+        self.fastest_lap: float | None = None
+        self.consecutive: float | None = None
+        self.last_crossing: float | None = None
+        self._window: deque[float] = deque(maxlen=consecutive_count)
+
+    def add_crossing(self, timestamp: float, holeshot: bool) -> None:
+        """
+        Update the statistics with the next crossing of the pilot
+
+        :param timestamp: Seconds since the start of the race
+        :param holeshot: Whether the first crossing only starts the first lap
+        """
+        last = self.last_crossing
+        self.last_crossing = timestamp
+        self.total_time = timestamp
+
+        if last is None:
+            if holeshot:
+                return
+            last = 0.0
+
+        lap = timestamp - last
+        self.laps += 1
+
+        if self.fastest_lap is None or lap < self.fastest_lap:
+            self.fastest_lap = lap
+
+        window = self._window
+        window.append(lap)
+        if len(window) == window.maxlen:
+            total = sum(window)
+            if self.consecutive is None or total < self.consecutive:
+                self.consecutive = total
+
+    def to_dict(self) -> dict:
+        """
+        Generate the client representation of the standing
+
+        :return: The statistics of the pilot
+        """
+        return {
+            "pilot_id": self.pilot_id,
+            "laps": self.laps,
+            "total_time": self.total_time,
+            "fastest_lap": self.fastest_lap,
+            "consecutive": self.consecutive,
+        }
+
+
+def rank_key(ranking: RankingMethod, stats: "PilotStanding | PilotTotals") -> tuple:
+    """
+    Generate the sort key of the statistics of a pilot
+
+    :param ranking: The criteria to rank by
+    :param stats: The statistics of the pilot
+    :return: The sort key, ending with the pilot id
+    """
+    fastest = math.inf if stats.fastest_lap is None else stats.fastest_lap
+
+    if ranking == RankingMethod.FASTEST_LAP:
+        return (fastest, stats.total_time, stats.pilot_id)
+
+    if ranking == RankingMethod.FASTEST_CONSECUTIVE:
+        consecutive = math.inf if stats.consecutive is None else stats.consecutive
+        return (consecutive, fastest, stats.pilot_id)
+
+    return (-stats.laps, stats.total_time, stats.pilot_id)
+
+
+class PilotTotals:
+    """
+    Statistics of a single pilot combined over multiple races
+    """
+
+    __slots__ = (
+        "pilot_id",
+        "races",
+        "laps",
+        "total_time",
+        "fastest_lap",
+        "consecutive",
+    )
+
+    def __init__(self, pilot_id: int) -> None:
+        """
+        Class initialization
+
+        :param pilot_id: The id of the pilot
+        """
+        self.pilot_id = pilot_id
+        self.races = 0
+        self.laps = 0
+        self.total_time = 0.0
+        self.fastest_lap: float | None = None
+        self.consecutive: float | None = None
+
+    def add_standing(self, standing: PilotStanding) -> None:
+        """
+        Combine the statistics of the pilot from a race
+
+        :param standing: The standing of the pilot in the race
+        """
+        self.races += 1
+        self.laps += standing.laps
+        self.total_time += standing.total_time
+
+        if standing.fastest_lap is not None and (
+            self.fastest_lap is None or standing.fastest_lap < self.fastest_lap
+        ):
+            self.fastest_lap = standing.fastest_lap
+
+        if standing.consecutive is not None and (
+            self.consecutive is None or standing.consecutive < self.consecutive
+        ):
+            self.consecutive = standing.consecutive
+
+    def to_dict(self) -> dict:
+        """
+        Generate the client representation of the totals
+
+        :return: The combined statistics of the pilot
+        """
+        return {
+            "pilot_id": self.pilot_id,
+            "races": self.races,
+            "laps": self.laps,
+            "total_time": self.total_time,
+            "fastest_lap": self.fastest_lap,
+            "consecutive": self.consecutive,
+        }
+
+
+class LeaderboardDelta(NamedTuple):
+    """
+    The change of the leaderboard caused by the update of a single pilot
+    """
+
+    version: int
+    """The version of the leaderboard after the change"""
+    standing: PilotStanding
+    """The updated standing of the pilot"""
+    changes: dict
+    """The statistics of the pilot that changed"""
+    position: int | None
+    """The position of the pilot after the change, None if no longer ranked"""
+    previous: int | None
+    """The position of the pilot before the change, None if newly ranked"""
+    moved: list[tuple[int, int]]
+    """The pilot id and new position of the other pilots that moved"""
+
+    def to_dict(self) -> dict:
+        """
+        Generate the diff sent to clients. Only the statistics that changed
+        are included for the updated pilot, and only the new position for
+        the other pilots that moved. A pilot removed from the standings has
+        a position of None.
+
+        A client can apply the diff when it holds the previous version of
+        the leaderboard. Otherwise the snapshot should be fetched again.
+
+        :return: The encoded diff
+        """
+        row = {"pilot_id": self.standing.pilot_id, **self.changes}
+        if self.position != self.previous:
+            row["position"] = self.position
+
+        return {"version": self.version, "rows": [row], "moves": self.moved}
+
+
+class Leaderboard:
+    """
+    Standings of the race in progress. Each crossing updates the statistics
+    of a single pilot and moves them within an ordered ranking, so the
+    cost of an update does not grow with the number of recorded laps.
+
+    Every change increments the version of the leaderboard. Clients apply
+    the published diffs to a snapshot of a known version, and fetch a new
+    snapshot when a version is missed.
+
+    Positions start from 1.
+    """
+
+    def __init__(
+        self,
+        *,
+        ranking: RankingMethod = RankingMethod.MOST_LAPS,
+        consecutive_count: int = 3,
+        holeshot: bool = True,
+    ) -> None:
+        """
+        Class initialization
+
+        :param ranking: The criteria to rank pilots by, defaults to
+        RankingMethod.MOST_LAPS
+        :param consecutive_count: Number of consecutive laps to time,
+        defaults to 3
+        :param holeshot: Whether the first crossing of a pilot only starts
+        their first lap, defaults to True
+        """
+        self.ranking = ranking
+        self.consecutive_count = consecutive_count
+        self.holeshot = holeshot
+        self._standings: dict[int, PilotStanding] = {}
+        self._order: SortedList = SortedList()
+        self._snapshot: dict | None = None
+        self.version = 0
+        """Version of the leaderboard, incremented on every change"""
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def standings(self) -> list[PilotStanding]:
+        """The standings of all pilots ordered by position"""
+        return [self._standings[key[-1]] for key in self._order]
+
+    def reset(
+        self,
+        *,
+        ranking: RankingMethod | None = None,
+        consecutive_count: int | None = None,
+        holeshot: bool | None = None,
+    ) -> None:
+        """
+        Clear the standings for a new race, optionally changing the
+        leaderboard settings
+
+        :param ranking: The criteria to rank pilots by, defaults to None
+        :param consecutive_count: Number of consecutive laps to time,
+        defaults to None
+        :param holeshot: Whether the first crossing of a pilot only starts
+        their first lap, defaults to None
+        """
+        if ranking is not None:
+            self.ranking = ranking
+        if consecutive_count is not None:
+            self.consecutive_count = consecutive_count
+        if holeshot is not None:
+            self.holeshot = holeshot
+
+        self._standings.clear()
+        self._order.clear()
+        self.version += 1
+
+    def _key(self, standing: PilotStanding) -> tuple:
+        """
+        Generate the sort key of a standing
+
+        :param standing: The standing of the pilot
+        :return: The sort key, ending with the pilot id
+        """
+        return rank_key(self.ranking, standing)
+
+    def standing(self, pilot_id: int) -> PilotStanding | None:
+        """
+        Get the standing of a pilot
+
+        :param pilot_id: The id of the pilot
+        :return: The standing, None if the pilot is not ranked
+        """
+        return self._standings.get(pilot_id)
+
+    def position(self, pilot_id: int) -> int | None:
+        """
+        Get the current position of a pilot
+
+        :param pilot_id: The id of the pilot
+        :return: The position, None if the pilot is not ranked
+        """
+        standing = self._standings.get(pilot_id)
+        if standing is None:
+            return None
+
+        return self._order.index(self._key(standing)) + 1
+
+    def add_crossing(self, pilot_id: int, timestamp: float) -> LeaderboardDelta:
+        """
+        Apply a crossing to the standings. Crossings of a pilot must be
+        added in order.
+
+        :param pilot_id: The id of the pilot
+        :param timestamp: Seconds since the start of the race
+        :return: The resulting change of the leaderboard
+        """
+        return self._update(pilot_id, (timestamp,), False)
+
+    def replace_crossings(
+        self, pilot_id: int, timestamps: Iterable[float]
+    ) -> LeaderboardDelta:
+        """
+        Rebuild the statistics of a pilot from all of their crossings, such
+        as after their recorded laps have been edited. A pilot without any
+        crossings is removed from the standings.
+
+        :param pilot_id: The id of the pilot
+        :param timestamps: Every crossing of the pilot in order
+        :return: The resulting change of the leaderboard
+        """
+        return self._update(pilot_id, timestamps, True)
+
+    def _update(
+        self, pilot_id: int, timestamps: Iterable[float], rebuild: bool
+    ) -> LeaderboardDelta:
+        """
+        Apply crossings to the standing of a pilot and move them to their
+        new position
+
+        :param pilot_id: The id of the pilot
+        :param timestamps: The crossings to apply in order
+        :param rebuild: Whether to discard the previous statistics of the pilot
+        :return: The resulting change of the leaderboard
+        """
+        # pylint: disable=R0914
+
+        order = self._order
+        standing = self._standings.get(pilot_id)
+        previous: int | None = None
+        before: dict = {}
+
+        if standing is not None:
+            key = self._key(standing)
+            previous = order.index(key)
+            order.remove(key)
+            before = standing.to_dict()
+
+        if standing is None or rebuild:
+            standing = PilotStanding(pilot_id, self.consecutive_count)
+            self._standings[pilot_id] = standing
+
+        for timestamp in timestamps:
+            standing.add_crossing(timestamp, self.holeshot)
+
+        self.version += 1
+
+        if standing.last_crossing is None:
+            del self._standings[pilot_id]
+            end = len(order) if previous is None else previous
+            moved = [(item[-1], i) for i, item in enumerate(order.islice(end), end + 1)]
+            return LeaderboardDelta(
+                self.version,
+                standing,
+                {},
+                None,
+                None if previous is None else previous + 1,
+                moved,
+            )
+
+        after = standing.to_dict()
+        changes = {
+            field: value
+            for field, value in after.items()
+            if field != "pilot_id" and before.get(field, ...) != value
+        }
+
+        key = self._key(standing)
+        order.add(key)
+        index = order.index(key)
+
+        if previous is None:
+            start, stop = index + 1, len(order)
+        elif index < previous:
+            start, stop = index + 1, previous + 1
+        else:
+            start, stop = previous, index
+
+        moved = [
+            (item[-1], i) for i, item in enumerate(order.islice(start, stop), start + 1)
+        ]
+        return LeaderboardDelta(
+            self.version,
+            standing,
+            changes,
+            index + 1,
+            None if previous is None else previous + 1,
+            moved,
+        )
+
+    def snapshot(self) -> dict:
+        """
+        Generate the full standings for clients to apply later diffs to.
+        The snapshot is reused until the leaderboard changes.
+
+        :return: The version, ranking method and standings of the leaderboard
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot["version"] != self.version:
+            snapshot = {
+                "version": self.version,
+                "ranking": self.ranking.name,
+                "standings": [
+                    {**standing.to_dict(), "position": position}
+                    for position, standing in enumerate(self.standings, 1)
+                ],
+            }
+            self._snapshot = snapshot
+
+        return snapshot
+
+    async def record_lap(self, *, pilot_id: int, timestamp: float, **_kwargs) -> None:
+        """
+        Event callback applying a recorded crossing and publishing the
+        diff to clients. Crossings without an assigned pilot are ignored.
+
+        :param pilot_id: The id of the pilot
+        :param timestamp: Seconds since the start of the race
+        """
+        if pilot_id == PILOT_ID_NONE:
+            return
+
+        delta = self.add_crossing(pilot_id, timestamp)
+        current_app.event_broker.trigger(
+            RaceSequenceEvt.LEADERBOARD_UPDATE, delta.to_dict()
+        )
@@ -4,13 +4,26 @@ Race management
 
 import logging
 import asyncio
-from typing import TYPE_CHECKING
+from dataclasses import replace
+from typing import TYPE_CHECKING, Literal
 from random import random
 from collections.abc import Generator
 
 from .enums import RaceStatus
-from ..events import RaceSequenceEvt
+from .checkpoint import RaceCheckpoint, CheckpointState
+from .timeline import RaceTimeline
+from .data import RaceData, PILOT_ID_NONE
+from .laps import LapRecorder
+from .leaderboard import Leaderboard
+from .results import EventResults
+from .heats import HeatGenerator
+from .roster import PilotRoster
+from ..events import RaceSequenceEvt, EventSetupEvt
+from ..database.eventfiles import event_databases
+from ..database.heat import Heat, HeatSlot
+from ..database.race import SavedRace
 from ..database.raceformat import RaceSchedule
+from ..utils.time import epoch_millis_to_monotonic, monotonic_to_epoch_millis
 
 if TYPE_CHECKING:
     from ..extensions import current_app
@@ -25,21 +38,285 @@ class RaceManager:
     Manager for conducting races
     """
 
-    _program_handle: asyncio.TimerHandle | None = None
+    # pylint: disable=R0902
+
+    _checkpoint: RaceCheckpoint | None = None
+    _schedule: RaceSchedule | None = None
+    timeline: RaceTimeline | None = None
+    """The timeline of the current race"""
     status: RaceStatus = RaceStatus.READY
+    heat_id: int | None = None
+    """The heat to race, None if the nodes are raced without pilots"""
+    start_reveal_lead: float = 0.25
+    """Seconds before a randomly delayed start that the start time is revealed
+    to clients. Long enough to cover network latency to displays, but short
+    enough to not allow the start to be anticipated."""
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self._program_handles: dict[str, asyncio.TimerHandle] = {}
+        self._node_pilots: dict[int, int] = {}
+        self.lap_recorder = LapRecorder()
+        """Recorder for crossings while racing is underway"""
+        self.leaderboard = Leaderboard()
+        """Standings of the race in progress"""
+        self.results = EventResults()
+        """Results of the saved races"""
+        self.heat_generator = HeatGenerator()
+        """Generator for seeding heats"""
+        self.roster = PilotRoster()
+        """Pilots of the event"""
 
     def _staging_checks(self, assigned_start: float) -> Generator[bool, None, None]:
         yield self.status == RaceStatus.READY
-        yield self._program_handle is None
+        yield not self._program_handles
 
         loop = asyncio.get_running_loop()
         yield loop.time() < assigned_start
 
+    def _write_checkpoint(self) -> None:
+        """
+        Store the current state of the manager in the attached checkpoint
+        """
+        if self._checkpoint is None or self._schedule is None or self.timeline is None:
+            return
+
+        state = CheckpointState(
+            self.status,
+            self._schedule,
+            monotonic_to_epoch_millis(self.timeline.stage),
+            monotonic_to_epoch_millis(self.timeline.start),
+            self.lap_recorder.race_uuid,
+            self.heat_id,
+        )
+        self._checkpoint.write(state)
+
+    def _start_reveal_time(
+        self, schedule: RaceSchedule, timeline: RaceTimeline
+    ) -> float | None:
+        """
+        Determine when the start time of the race can be revealed to clients
+
+        :param schedule: The format's race schedule
+        :param timeline: The timeline of the race
+        :return: The event loop time to reveal the start at, or None if it
+        can be revealed immediately
+        """
+        if schedule.random_stage_delay <= 0:
+            return None
+
+        reveal = timeline.start - self.start_reveal_lead
+        if reveal <= asyncio.get_running_loop().time():
+            return None
+
+        return reveal
+
+    def _arm_timeline(self, timeline: RaceTimeline, reveal: float | None) -> None:
+        """
+        Arm every remaining transition of the timeline against its
+        fixed deadline
+
+        :param timeline: The timeline to arm
+        :param reveal: The time to reveal the start time at, None if
+        it has already been revealed
+        """
+        now = asyncio.get_running_loop().time()
+
+        transitions = (
+            (RaceSequenceEvt.RACE_START_REVEAL, reveal, self._reveal_start),
+            (RaceSequenceEvt.RACE_STAGE, timeline.stage, self._stage),
+            (RaceSequenceEvt.RACE_START, timeline.start, self._start),
+            (RaceSequenceEvt.RACE_FINISH, timeline.finish, self._finish),
+            (RaceSequenceEvt.RACE_STOP, timeline.stop, self._stop),
+        )
+
+        for event, time, func in transitions:
+            if time is None or time <= now:
+                continue
+
+            if event == RaceSequenceEvt.RACE_STOP and time == timeline.finish:
+                continue
+
+            self._program_handles[event.id] = current_app.schedule_background_task(
+                time, func
+            )
+
+    def _cancel_timeline(self) -> None:
+        """
+        Cancel all armed transitions
+        """
+        for handle in self._program_handles.values():
+            handle.cancel()
+
+        self._program_handles.clear()
+
+    async def restore_checkpoint(self, checkpoint: RaceCheckpoint) -> None:
+        """
+        Attach a checkpoint to the manager and restore the race that was
+        in progress when it was last written. The remaining transitions
+        are re-armed relative to the stored epoch times, and the crossings
+        already saved for the race are replayed before recording resumes.
+
+        A race that was ready or stopped has no transitions to re-arm and
+        is not restored. A race that ended while the server was down is
+        stopped. A race whose heat no longer exists is resumed without
+        pilots.
+
+        :param checkpoint: The opened checkpoint
+        """
+        self._checkpoint = checkpoint
+
+        state = checkpoint.read()
+        if state is None or state.status in (RaceStatus.READY, RaceStatus.STOPPED):
+            return
+
+        self._schedule = state.schedule
+        self.timeline = RaceTimeline.from_schedule(
+            state.schedule,
+            epoch_millis_to_monotonic(state.stage_epoch_ms),
+            epoch_millis_to_monotonic(state.start_epoch_ms),
+        )
+
+        self.status = self.timeline.status_at(asyncio.get_running_loop().time())
+        try:
+            await self._load_heat(state.heat_id)
+        except LookupError:
+            logger.warning(
+                "Heat %d of the restored race no longer exists, racing without "
+                "pilots",
+                state.heat_id,
+            )
+            await self._load_heat(None)
+
+        recording = state.status in (RaceStatus.RACING, RaceStatus.OVERTIME)
+        race = None
+        if recording and state.race_uuid is not None:
+            race = await SavedRace.get_or_none(uuid=state.race_uuid)
+
+        if self.status in (RaceStatus.RACING, RaceStatus.OVERTIME):
+            saved = None if race is None else await RaceData.from_db(race)
+            self.leaderboard.reset()
+            current_app.timer_interface.assign_pilots(self._node_pilots)
+            self.lap_recorder.begin(
+                self.timeline.start, state.race_uuid if recording else None, saved
+            )
+            if saved is not None:
+                self._replay(saved)
+
+        elif self.status == RaceStatus.STOPPED and recording:
+            data = self._transition_data("stop")
+            current_app.event_broker.trigger(RaceSequenceEvt.RACE_STOP, data)
+
+            if race is not None:
+                self.results.invalidate_race(race.id)
+                await self.results.update()
+
+        self._arm_timeline(
+            self.timeline, self._start_reveal_time(state.schedule, self.timeline)
+        )
+
+        self._write_checkpoint()
+        logger.info("Race restored from checkpoint as %s", self.status.name)
+
+    def _replay(self, saved: RaceData) -> None:
+        """
+        Apply the saved crossings of a restored race to the leaderboard
+
+        :param saved: The saved crossings of the race
+        """
+        timestamps: dict[int, list[float]] = {}
+        for pilot_id, timestamp in zip(saved.pilot_id, saved.timestamp):
+            if pilot_id != PILOT_ID_NONE:
+                timestamps.setdefault(pilot_id, []).append(timestamp)
+
+        for pilot_id, crossings in timestamps.items():
+            self.leaderboard.replace_crossings(pilot_id, crossings)
+
+    async def _load_heat(self, heat_id: int | None) -> None:
+        """
+        Load the pilots seeded into the slots of a heat
+
+        :param heat_id: The id of the heat, None to race without pilots
+        :raises LookupError: The heat does not exist
+        """
+        if heat_id is None:
+            self.heat_id = None
+            self._node_pilots = {}
+            return
+
+        if not await Heat.exists(id=heat_id):
+            raise LookupError(f"Heat {heat_id} does not exist")
+
+        slots = await HeatSlot.filter(
+            heat_id=heat_id, pilot_id__isnull=False
+        ).values_list("node_index", "pilot_id")
+
+        self.heat_id = heat_id
+        self._node_pilots = dict(slots)  # type: ignore[arg-type]
+
+    async def select_heat(self, heat_id: int | None) -> None:
+        """
+        Select the heat for the next race. The pilots of its slots are
+        assigned to the timer nodes when the race starts.
+
+        :param heat_id: The id of the heat, None to race without pilots
+        :raises ValueError: A race is underway
+        :raises LookupError: The heat does not exist
+        """
+        if self.status not in (RaceStatus.READY, RaceStatus.STOPPED):
+            raise ValueError("Heats cannot be selected during a race")
+
+        await self._load_heat(heat_id)
+        self._write_checkpoint()
+
+    def close_checkpoint(self) -> None:
+        """
+        Detach and close the checkpoint. The last written state is kept
+        so the race can be restored on the next startup.
+        """
+        if self._checkpoint is not None:
+            self._checkpoint.close()
+            self._checkpoint = None
+
+    async def switch_event(self, name: str, create: bool = False) -> None:
+        """
+        Make another event active. The crossings of the last race are
+        written to the previous event first. The cached pilots and results
+        of the previous event are discarded.
+
+        :param name: The name of the event
+        :param create: Create the event if it does not exist, defaults to
+        False
+        :raises ValueError: A race is underway or the name is invalid
+        :raises FileNotFoundError: The event does not exist and is not created
+        """
+        if (
+            self.status not in (RaceStatus.READY, RaceStatus.STOPPED)
+            or self.lap_recorder.accepting
+        ):
+            raise ValueError("Events cannot be switched during a race")
+
+        await self.lap_recorder.wait_written()
+        await event_databases.switch(name, create)
+        await self._load_heat(None)
+        self.roster.clear()
+        self.results.clear()
+
+        data = {"name": name}
+        current_app.event_broker.trigger(EventSetupEvt.EVENT_SWITCH, data)
+
     def schedule_race(
         self, schedule: RaceSchedule, *, assigned_start: float, **_kwargs
     ) -> None:
         """
-        Schedule the sequence of events for the race
+        Schedule the sequence of events for the race. The full timeline
+        of the race is computed and armed at once.
+
+        The timeline is broadcast to clients immediately. When the start
+        is randomly delayed, the start time is withheld until shortly
+        before the start occurs.
 
         :param format_: The race format to use
         :param assigned_start: The event loop start time of the race.
@@ -54,100 +331,133 @@ class RaceManager:
         start_time = assigned_start + start_delay
 
         if all(self._staging_checks(assigned_start)):
-            self._program_handle = current_app.schedule_background_task(
-                assigned_start, self._stage, start_time, schedule
-            )
+            timeline = RaceTimeline.from_schedule(schedule, assigned_start, start_time)
+            reveal = self._start_reveal_time(schedule, timeline)
+            self._arm_timeline(timeline, reveal)
+
+            self._schedule = schedule
+            self.timeline = timeline
             self.status = RaceStatus.SCHEDULED
+            self._write_checkpoint()
+
+            data = timeline.to_epoch_millis(reveal_start=reveal is None)
+            current_app.event_broker.trigger(RaceSequenceEvt.RACE_SCHEDULE, data)
 
         else:
             logger.warning("All conditions are not met to program race")
 
     def stop_race(self) -> None:
         """
-        Stop the race
+        Stop the race. The timeline of a running race is ended at the
+        current time.
         """
 
-        if self._program_handle is not None:
-            self._program_handle.cancel()
-            self._program_handle = None
+        self._cancel_timeline()
 
         if self.status in (RaceStatus.SCHEDULED, RaceStatus.STAGING):
             self.status = RaceStatus.READY
 
         elif self.status == RaceStatus.RACING:
-            data: dict = {}
+            if self.timeline is not None:
+                now = asyncio.get_running_loop().time()
+                self.timeline = replace(self.timeline, finish=now, stop=now)
+
+            data = self._transition_data("finish")
             current_app.event_broker.trigger(RaceSequenceEvt.RACE_FINISH, data)
+            data = self._transition_data("stop")
             current_app.event_broker.trigger(RaceSequenceEvt.RACE_STOP, data)
             self.status = RaceStatus.STOPPED
+            self.lap_recorder.end()
 
         elif self.status == RaceStatus.OVERTIME:
-            data = {}
+            if self.timeline is not None:
+                now = asyncio.get_running_loop().time()
+                self.timeline = replace(self.timeline, stop=now)
+
+            data = self._transition_data("stop")
             current_app.event_broker.trigger(RaceSequenceEvt.RACE_STOP, data)
             self.status = RaceStatus.STOPPED
+            self.lap_recorder.end()
 
-    async def _stage(self, start_time: float, schedule: RaceSchedule) -> None:
+        self._write_checkpoint()
+
+    def _transition_data(
+        self, phase: Literal["stage", "start", "finish", "stop"]
+    ) -> dict:
         """
-        Put the system into staging mode and schedules the start
-        state.
+        Generate the event data for a transition
 
-        :param start_time: The time to start to schedule race start
-        :param schedule: The format's race schedule
+        :param phase: The timeline phase of the transition
+        :return: The event data
         """
-        data: dict = {}
-        current_app.event_broker.trigger(RaceSequenceEvt.RACE_STAGE, data)
-        self.status = RaceStatus.STAGING
+        time = None if self.timeline is None else getattr(self.timeline, phase)
 
-        self._program_handle = current_app.schedule_background_task(
-            start_time, self._start, schedule
-        )
+        if time is None:
+            return {}
 
-    async def _start(self, schedule: RaceSchedule) -> None:
+        return {"time": monotonic_to_epoch_millis(time)}
+
+    async def _reveal_start(self) -> None:
+        """
+        Reveal the start time of the race to clients
         """
-        Put the system into race mode. Schedules the next
-        state if applicable.
+        self._program_handles.pop(RaceSequenceEvt.RACE_START_REVEAL.id, None)
 
-        :param schedule: The format's race schedule
+        if self.timeline is not None:
+            data = self.timeline.to_epoch_millis()
+            current_app.event_broker.trigger(RaceSequenceEvt.RACE_START_REVEAL, data)
+
+    async def _stage(self) -> None:
+        """
+        Put the system into staging mode
+        """
+        self._program_handles.pop(RaceSequenceEvt.RACE_STAGE.id, None)
+
+        data = self._transition_data("stage")
+        current_app.event_broker.trigger(RaceSequenceEvt.RACE_STAGE, data)
+        self.status = RaceStatus.STAGING
+        self._write_checkpoint()
+
+    async def _start(self) -> None:
+        """
+        Put the system into race mode
         """
-        data: dict = {}
+        self._program_handles.pop(RaceSequenceEvt.RACE_START.id, None)
+
+        data = self._transition_data("start")
         current_app.event_broker.trigger(RaceSequenceEvt.RACE_START, data)
         self.status = RaceStatus.RACING
 
-        if not schedule.unlimited_time:
-            self._program_handle = current_app.delay_background_task(
-                schedule.race_time_sec, self._finish, schedule
-            )
+        if self.timeline is not None:
+            self.leaderboard.reset()
+            current_app.timer_interface.assign_pilots(self._node_pilots)
+            self.lap_recorder.begin(self.timeline.start)
 
-        else:
-            self._program_handle = None
+        self._write_checkpoint()
 
-    async def _finish(self, schedule: RaceSchedule) -> None:
+    async def _finish(self) -> None:
         """
-        Put the system into overtime mode. Schedules or runs the next
-        state if applicable.
-
-        :param schedule: The format's race schedule
+        Put the system into overtime mode. Runs the stop state
+        immediately if the race has no overtime.
         """
-        data: dict = {}
+        self._program_handles.pop(RaceSequenceEvt.RACE_FINISH.id, None)
+
+        data = self._transition_data("finish")
         current_app.event_broker.trigger(RaceSequenceEvt.RACE_FINISH, data)
         self.status = RaceStatus.OVERTIME
+        self._write_checkpoint()
 
-        if schedule.overtime_sec > 0:
-            self._program_handle = current_app.delay_background_task(
-                schedule.overtime_sec, self._stop
-            )
-
-        elif schedule.overtime_sec == 0:
+        if self.timeline is not None and self.timeline.stop == self.timeline.finish:
             await self._stop()
 
-        else:
-            self._program_handle = None
-
     async def _stop(self) -> None:
         """
         Put the system into race stop mode
         """
-        data: dict = {}
+        self._program_handles.pop(RaceSequenceEvt.RACE_STOP.id, None)
+
+        data = self._transition_data("stop")
         current_app.event_broker.trigger(RaceSequenceEvt.RACE_STOP, data)
         self.status = RaceStatus.STOPPED
-
-        self._program_handle = None
+        self.lap_recorder.end()
+        self._write_checkpoint()
@@ -0,0 +1,169 @@
+"""
+Editing the laps of saved races
+"""
+
+import logging
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from ..events import RaceResultsEvt
+from ..database.race import SavedRace, Lap
+
+if TYPE_CHECKING:
+    from ..extensions import current_app
+else:
+    from quart import current_app
+
+logger = logging.getLogger(__name__)
+
+
+def _lap_data(lap: Lap, race_uuid: UUID) -> dict:
+    """
+    Convert a lap to the data published to clients
+
+    :param lap: The lap
+    :param race_uuid: The identifier of the race of the lap
+    :return: The lap data
+    """
+    return {
+        "id": lap.id,
+        "race_uuid": str(race_uuid),
+        "node_index": lap.node_index,
+        "pilot_id": lap.pilot_id,
+        "timestamp": lap.timestamp,
+        "peak_rssi": lap.peak_rssi,
+    }
+
+
+def _check_editable(race: SavedRace) -> None:
+    """
+    Check that the race is not currently being recorded
+
+    :param race: The race to edit
+    :raises ValueError: The race is being recorded
+    """
+    recorder = current_app.race_manager.lap_recorder
+    if recorder.accepting and recorder.race_uuid == race.uuid:
+        raise ValueError("Laps can not be edited while the race is recorded")
+
+
+async def add_lap(
+    race_uuid: UUID,
+    pilot_id: int,
+    timestamp: float,
+    *,
+    node_index: int = 0,
+    peak_rssi: float = 0.0,
+) -> dict | None:
+    """
+    Add a lap missed by the timer to a saved race
+
+    :param race_uuid: The identifier of the race
+    :param pilot_id: The pilot completing the lap
+    :param timestamp: Time of the crossing in seconds since the start
+    of the race
+    :param node_index: Index of the timer node, defaults to 0
+    :param peak_rssi: Peak RSSI value of the crossing, defaults to 0.0
+    :raises ValueError: The race is being recorded
+    :return: The added lap, None if the race does not exist
+    """
+    race = await SavedRace.get_or_none(uuid=race_uuid)
+    if race is None:
+        return None
+
+    _check_editable(race)
+
+    results = current_app.race_manager.results
+    await results.load()
+
+    lap = await Lap.create(
+        race=race,
+        node_index=node_index,
+        pilot_id=pilot_id,
+        timestamp=timestamp,
+        peak_rssi=peak_rssi,
+    )
+
+    results.invalidate(race.id, pilot_id)
+    await results.update()
+
+    data = _lap_data(lap, race.uuid)
+    current_app.event_broker.trigger(RaceResultsEvt.LAP_ADD, data)
+
+    logger.info("Lap %d added to race %s", lap.id, race.uuid)
+    return data
+
+
+async def alter_lap(
+    lap_id: int, *, timestamp: float | None = None, pilot_id: int | None = None
+) -> dict | None:
+    """
+    Alter the timing or the pilot of a lap of a saved race
+
+    :param lap_id: The id of the lap
+    :param timestamp: The new time of the crossing, defaults to None
+    :param pilot_id: The new pilot of the lap, defaults to None
+    :raises ValueError: The race is being recorded
+    :return: The altered lap, None if the lap does not exist
+    """
+    lap = await Lap.get_or_none(id=lap_id).prefetch_related("race")
+    if lap is None:
+        return None
+
+    race = lap.race
+    _check_editable(race)
+
+    results = current_app.race_manager.results
+    await results.load()
+
+    previous_pilot = lap.pilot_id
+
+    if timestamp is not None:
+        lap.timestamp = timestamp
+    if pilot_id is not None:
+        lap.pilot_id = pilot_id
+
+    await lap.save(update_fields=["timestamp", "pilot_id"])
+
+    if previous_pilot is not None:
+        results.invalidate(race.id, previous_pilot)
+    if lap.pilot_id is not None:
+        results.invalidate(race.id, lap.pilot_id)
+    await results.update()
+
+    data = _lap_data(lap, race.uuid)
+    current_app.event_broker.trigger(RaceResultsEvt.LAP_ALTER, data)
+
+    logger.info("Lap %d of race %s altered", lap.id, race.uuid)
+    return data
+
+
+async def delete_lap(lap_id: int) -> dict | None:
+    """
+    Delete a false lap from a saved race
+
+    :param lap_id: The id of the lap
+    :raises ValueError: The race is being recorded
+    :return: The deleted lap, None if the lap does not exist
+    """
+    lap = await Lap.get_or_none(id=lap_id).prefetch_related("race")
+    if lap is None:
+        return None
+
+    race = lap.race
+    _check_editable(race)
+
+    results = current_app.race_manager.results
+    await results.load()
+
+    data = _lap_data(lap, race.uuid)
+    await lap.delete()
+
+    if lap.pilot_id is not None:
+        results.invalidate(race.id, lap.pilot_id)
+    await results.update()
+
+    current_app.event_broker.trigger(RaceResultsEvt.LAP_DELETE, data)
+
+    logger.info("Lap %d deleted from race %s", lap_id, race.uuid)
+    return data
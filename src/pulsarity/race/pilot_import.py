@@ -0,0 +1,265 @@
+"""
+Bulk import of pilots
+"""
+
+import csv
+import json
+import codecs
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Mapping
+from dataclasses import dataclass, field, asdict
+from typing import TYPE_CHECKING, Any, cast
+
+from tortoise.transactions import in_transaction
+
+from ..events import EventSetupEvt
+from ..database.pilot import Pilot, PilotAttribute
+
+if TYPE_CHECKING:
+    from ..extensions import current_app
+else:
+    from quart import current_app
+
+logger = logging.getLogger(__name__)
+
+_PILOT_LIMITS = {"callsign": 80, "name": 120, "phonetic": 80}
+"""Imported pilot fields and their maximum lengths"""
+
+
+@dataclass
+class ImportSummary:
+    """
+    The outcome of a pilot import
+    """
+
+    created: int = 0
+    """Number of pilots created"""
+    skipped: int = 0
+    """Number of pilots skipped as duplicates of an existing or earlier callsign"""
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    """Number and error of the first rows failing validation, counted from 1"""
+    failed: int = 0
+    """Number of rows failing validation"""
+
+
+def parse_pilot(row: Mapping[str, Any]) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Validate an imported pilot. Attributes are either given as an object
+    under the "attributes" key, or as any other non empty column of a CSV row.
+
+    :param row: The imported row
+    :raises ValueError: The row is not a valid pilot
+    :return: The pilot fields and the attributes of the pilot
+    """
+    if not isinstance(row, Mapping):
+        raise ValueError("Pilot is not an object")
+
+    pilot: dict[str, str] = {}
+    for name, limit in _PILOT_LIMITS.items():
+        value = row.get(name) or ""
+        if not isinstance(value, str):
+            raise ValueError(f"{name} is not a string")
+
+        value = value.strip()
+        if len(value) > limit:
+            raise ValueError(f"{name} is longer than {limit} characters")
+        pilot[name] = value
+
+    if not pilot["callsign"]:
+        raise ValueError("callsign is required")
+
+    extra = row.get("attributes")
+    if extra is None:
+        extra = {
+            key: value
+            for key, value in row.items()
+            if key not in _PILOT_LIMITS and key is not None and value
+        }
+    elif not isinstance(extra, Mapping):
+        raise ValueError("attributes is not an object")
+
+    attributes: dict[str, str] = {}
+    for key, value in extra.items():
+        if not isinstance(key, str) or not 0 < len(key) <= 80:
+            raise ValueError("Invalid attribute name")
+        if not isinstance(value, (str, int, float, bool)):
+            raise ValueError(f"Attribute {key} is not a scalar")
+        attributes[key] = value if isinstance(value, str) else json.dumps(value)
+
+    return pilot, attributes
+
+
+async def csv_rows(
+    chunks: AsyncIterable[bytes], encoding: str = "utf-8-sig"
+) -> AsyncIterator[dict[str, str]]:
+    """
+    Parse CSV rows with a header line as the body is received
+
+    :param chunks: The chunks of the body
+    :param encoding: The encoding of the body, defaults to "utf-8-sig"
+    :yield: Each row by column name
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    header: list[str] | None = None
+    pending = ""
+    final = False
+    iterator = aiter(chunks)
+
+    while not final:
+        try:
+            pending += decoder.decode(await anext(iterator))
+        except StopAsyncIteration:
+            pending += decoder.decode(b"", final=True)
+            final = True
+
+        # Only split after a newline outside of quotes
+        end = len(pending) if final else pending.rfind("\n") + 1
+        while end > 0 and pending[:end].count('"') % 2:
+            end = pending.rfind("\n", 0, end - 1) + 1
+
+        complete, pending = pending[:end], pending[end:]
+        for record in csv.reader(complete.splitlines(keepends=True)):
+            if not record:
+                continue
+
+            if header is None:
+                header = [name.strip().lower() for name in record]
+            else:
+                yield dict(zip(header, record))
+
+
+async def ndjson_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """
+    Parse newline delimited JSON values as the body is received
+
+    :param chunks: The chunks of the body
+    :yield: Each value, or the error of a line that is not valid JSON
+    """
+
+    def _load(line: bytes) -> Any:
+        try:
+            return json.loads(line)
+        except ValueError as ex:
+            return ValueError(f"Invalid JSON: {ex}")
+
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _load(line)
+
+    if pending.strip():
+        yield _load(pending)
+
+
+async def iterate_rows(rows: Iterable[Any]) -> AsyncIterator[Any]:
+    """
+    Iterate over already parsed rows
+
+    :param rows: The rows
+    :yield: Each row
+    """
+    for row in rows:
+        yield row
+
+
+async def _insert_batch(batch: list[tuple[dict[str, str], dict[str, str]]]) -> None:
+    """
+    Insert a batch of validated pilots and their attributes in a single
+    transaction
+
+    :param batch: The pilot fields and attributes of each pilot
+    """
+    # pylint: disable=W0212
+
+    async with in_transaction(Pilot._meta.default_connection):
+        await Pilot.bulk_create([Pilot(**pilot) for pilot, _ in batch])
+
+        if not any(attributes for _, attributes in batch):
+            return
+
+        # Bulk inserts do not return ids, callsigns are unique within the import
+        callsigns = [pilot["callsign"] for pilot, _ in batch]
+        ids = dict(
+            await Pilot.filter(callsign__in=callsigns).values_list("callsign", "id")
+        )
+
+        await PilotAttribute.bulk_create(
+            [
+                PilotAttribute(pilot_id=ids[pilot["callsign"]], name=name, value=value)
+                for pilot, attributes in batch
+                for name, value in attributes.items()
+            ]
+        )
+
+
+async def import_pilots(
+    rows: AsyncIterable[Any], *, batch_size: int = 500, max_errors: int = 100
+) -> ImportSummary:
+    """
+    Validate and insert pilots as they are parsed. Pilots with a callsign
+    matching an existing pilot or an earlier row, ignoring case, are
+    skipped. Rows failing validation are reported and skipped.
+
+    A single event summarizing the import is triggered once all pilots
+    are inserted.
+
+    :param rows: The imported rows, errors of rows failing to parse are
+    reported like validation errors
+    :param batch_size: Number of pilots inserted per transaction, defaults
+    to 500
+    :param max_errors: Maximum number of errors reported, defaults to 100
+    :return: The outcome of the import
+    """
+    summary = ImportSummary()
+    callsigns = cast(list[str], await Pilot.all().values_list("callsign", flat=True))
+    seen = {callsign.casefold() for callsign in callsigns}
+    batch: list[tuple[dict[str, str], dict[str, str]]] = []
+
+    try:
+        index = 0
+        async for row in rows:
+            index += 1
+            try:
+                if isinstance(row, ValueError):
+                    raise row
+                pilot, attributes = parse_pilot(row)
+            except ValueError as ex:
+                summary.failed += 1
+                if len(summary.errors) < max_errors:
+                    summary.errors.append({"row": index, "error": str(ex)})
+                continue
+
+            key = pilot["callsign"].casefold()
+            if key in seen:
+                summary.skipped += 1
+                continue
+
+            seen.add(key)
+            batch.append((pilot, attributes))
+
+            if len(batch) >= batch_size:
+                await _insert_batch(batch)
+                summary.created += len(batch)
+                batch = []
+
+        if batch:
+            await _insert_batch(batch)
+            summary.created += len(batch)
+
+    finally:
+        # Committed batches are announced even if reading the rows failed
+        logger.info(
+            "Imported %d pilots, %d skipped, %d failed",
+            summary.created,
+            summary.skipped,
+            summary.failed,
+        )
+
+        data = asdict(summary)
+        del data["errors"]
+        current_app.event_broker.trigger(EventSetupEvt.PILOT_IMPORT, data)
+
+    return summary
@@ -0,0 +1,286 @@
+"""
+Results of saved races
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, cast
+
+from .enums import RankingMethod
+from .leaderboard import Leaderboard, PilotTotals, rank_key
+from ..events import RaceResultsEvt
+from ..database.race import Lap
+
+if TYPE_CHECKING:
+    from ..extensions import current_app
+else:
+    from quart import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class EventResults:
+    """
+    Results of the saved races of the event, computed at dependent levels:
+
+    1. The statistics of each pilot in a race, from their laps
+    2. The ranking of each race, from the statistics of its pilots
+    3. The event totals of each pilot, from their statistics in every race
+
+    Editing the laps of a pilot in a race invalidates only that pilot's
+    statistics. Refreshing recomputes the invalidated statistics, moves the
+    pilots within their race rankings and recomputes the totals of the
+    affected pilots. Everything else is reused from the cache.
+    """
+
+    # pylint: disable=R0902
+
+    def __init__(
+        self,
+        *,
+        ranking: RankingMethod = RankingMethod.MOST_LAPS,
+        consecutive_count: int = 3,
+        holeshot: bool = True,
+    ) -> None:
+        """
+        Class initialization
+
+        :param ranking: The criteria to rank pilots by, defaults to
+        RankingMethod.MOST_LAPS
+        :param consecutive_count: Number of consecutive laps to time,
+        defaults to 3
+        :param holeshot: Whether the first crossing of a pilot in a race only
+        starts their first lap, defaults to True
+        """
+        self.ranking = ranking
+        self.consecutive_count = consecutive_count
+        self.holeshot = holeshot
+
+        self._races: dict[int, Leaderboard] = {}
+        self._pilot_races: dict[int, set[int]] = defaultdict(set)
+        self._totals: dict[int, PilotTotals] = {}
+        self._ranking: list[int] = []
+        self._dirty: set[tuple[int, int]] = set()
+        self._stale_races: set[int] = set()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def _race(self, race_id: int) -> Leaderboard:
+        """
+        Get the cached ranking of a race, creating it if needed
+
+        :param race_id: The id of the race
+        :return: The ranking of the race
+        """
+        board = self._races.get(race_id)
+        if board is None:
+            board = Leaderboard(
+                ranking=self.ranking,
+                consecutive_count=self.consecutive_count,
+                holeshot=self.holeshot,
+            )
+            self._races[race_id] = board
+
+        return board
+
+    def _total(self, pilot_id: int) -> PilotTotals:
+        """
+        Recompute the event totals of a pilot from their cached race
+        statistics
+
+        :param pilot_id: The id of the pilot
+        :return: The event totals
+        """
+        totals = PilotTotals(pilot_id)
+        for race_id in self._pilot_races[pilot_id]:
+            standing = self._races[race_id].standing(pilot_id)
+            if standing is not None:
+                totals.add_standing(standing)
+
+        return totals
+
+    def _rerank(self) -> dict[int, int]:
+        """
+        Sort the event totals
+
+        :return: The previous position of each ranked pilot
+        """
+        previous = {pilot_id: i + 1 for i, pilot_id in enumerate(self._ranking)}
+        self._ranking = sorted(
+            self._totals, key=lambda id_: rank_key(self.ranking, self._totals[id_])
+        )
+        return previous
+
+    async def load(self) -> None:
+        """
+        Compute the results of every saved race. Does nothing once the
+        results have been loaded.
+        """
+        async with self._lock:
+            if self._loaded:
+                return
+
+            rows = (
+                await Lap.filter(pilot_id__isnull=False)
+                .order_by("race_id", "timestamp")
+                .values_list("race_id", "pilot_id", "timestamp")
+            )
+
+            for race_id, pilot_id, timestamp in rows:
+                self._race(race_id).add_crossing(pilot_id, timestamp)
+                self._pilot_races[pilot_id].add(race_id)
+
+            for pilot_id in self._pilot_races:
+                self._totals[pilot_id] = self._total(pilot_id)
+
+            self._rerank()
+            self._loaded = True
+
+            logger.debug("Results loaded for %d races", len(self._races))
+
+    def clear(self) -> None:
+        """
+        Discard the results of every race, reloading them on next use
+        """
+        self._races.clear()
+        self._pilot_races.clear()
+        self._totals.clear()
+        self._ranking = []
+        self._dirty.clear()
+        self._stale_races.clear()
+        self._loaded = False
+
+    def invalidate(self, race_id: int, pilot_id: int) -> None:
+        """
+        Mark the statistics of a pilot in a race as out of date
+
+        :param race_id: The id of the race
+        :param pilot_id: The id of the pilot
+        """
+        self._dirty.add((race_id, pilot_id))
+
+    def invalidate_race(self, race_id: int) -> None:
+        """
+        Mark the statistics of every pilot in a race as out of date
+
+        :param race_id: The id of the race
+        """
+        self._stale_races.add(race_id)
+
+    async def refresh(self) -> dict | None:
+        """
+        Recompute the out of date results
+
+        :return: The changes to the results, None if there were none
+        """
+        await self.load()
+
+        async with self._lock:
+            # Races invalidated while the laps are read are kept for later
+            stale, self._stale_races = self._stale_races, set()
+            for race_id in stale:
+                pilots = cast(
+                    list[int],
+                    await Lap.filter(race_id=race_id, pilot_id__isnull=False)
+                    .distinct()
+                    .values_list("pilot_id", flat=True),
+                )
+                board = self._races.get(race_id)
+                if board is not None:
+                    pilots.extend(standing.pilot_id for standing in board.standings)
+
+                self._dirty.update((race_id, pilot_id) for pilot_id in pilots)
+
+            if not self._dirty:
+                return None
+
+            dirty = sorted(self._dirty)
+            self._dirty.clear()
+
+            races: dict[int, list[dict]] = defaultdict(list)
+            affected: set[int] = set()
+
+            for race_id, pilot_id in dirty:
+                timestamps = cast(
+                    list[float],
+                    await Lap.filter(race_id=race_id, pilot_id=pilot_id)
+                    .order_by("timestamp")
+                    .values_list("timestamp", flat=True),
+                )
+
+                delta = self._race(race_id).replace_crossings(pilot_id, timestamps)
+                races[race_id].append(delta.to_dict())
+
+                if delta.position is None:
+                    self._pilot_races[pilot_id].discard(race_id)
+                else:
+                    self._pilot_races[pilot_id].add(race_id)
+
+                affected.add(pilot_id)
+
+            for pilot_id in affected:
+                if self._pilot_races[pilot_id]:
+                    self._totals[pilot_id] = self._total(pilot_id)
+                else:
+                    self._totals.pop(pilot_id, None)
+
+            previous = self._rerank()
+            positions = {pilot_id: i + 1 for i, pilot_id in enumerate(self._ranking)}
+
+            totals = [
+                (
+                    {
+                        **self._totals[pilot_id].to_dict(),
+                        "position": positions[pilot_id],
+                    }
+                    if pilot_id in positions
+                    else {"pilot_id": pilot_id, "position": None}
+                )
+                for pilot_id in sorted(affected)
+            ]
+            moves = [
+                (pilot_id, position)
+                for pilot_id, position in positions.items()
+                if pilot_id not in affected and previous.get(pilot_id) != position
+            ]
+
+        return {
+            "races": [
+                {"race_id": race_id, "diffs": diffs} for race_id, diffs in races.items()
+            ],
+            "totals": totals,
+            "moves": moves,
+        }
+
+    async def update(self) -> None:
+        """
+        Recompute the out of date results and publish the changes to clients
+        """
+        changes = await self.refresh()
+        if changes is not None:
+            current_app.event_broker.trigger(RaceResultsEvt.RESULTS_UPDATE, changes)
+
+    def race_standings(self, race_id: int) -> list[dict]:
+        """
+        Get the cached standings of a race
+
+        :param race_id: The id of the race
+        :return: The standings ordered by position
+        """
+        board = self._races.get(race_id)
+        if board is None:
+            return []
+
+        return board.snapshot()["standings"]
+
+    def totals(self) -> list[dict]:
+        """
+        Get the cached event totals
+
+        :return: The totals of every pilot ordered by position
+        """
+        return [
+            {**self._totals[pilot_id].to_dict(), "position": position}
+            for position, pilot_id in enumerate(self._ranking, 1)
+        ]
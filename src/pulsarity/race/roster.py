@@ -0,0 +1,238 @@
+"""
+In-memory pilot roster
+"""
+
+import json
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from ..events import EventBroker, EventSetupEvt
+from ..database.pilot import Pilot, PilotAttribute
+
+logger = logging.getLogger(__name__)
+
+_PILOT_FIELDS = ("id", "callsign", "phonetic", "name", "used_frequencies", "active")
+_ATTRIBUTE_FIELDS = ("id", "name", "value", "pilot_id")
+
+
+def _entries(
+    pilots: list[dict[str, Any]], attributes: list[dict[str, Any]]
+) -> dict[int, dict[str, Any]]:
+    """
+    Combine queried pilot and attribute rows into pilot entries
+
+    :param pilots: The pilot rows
+    :param attributes: The attribute rows of the pilots
+    :return: The entries by pilot id
+    """
+    entries = {row["id"]: {**row, "attributes": []} for row in pilots}
+    for row in attributes:
+        if (entry := entries.get(row.pop("pilot_id"))) is not None:
+            entry["attributes"].append(row)
+
+    return entries
+
+
+async def pilot_page(after: int = 0, limit: int = 100) -> list[dict[str, Any]]:
+    """
+    Get pilots ordered by id from the database, continuing after a pilot
+    instead of skipping an offset, so each page is an index range scan
+    regardless of its position
+
+    :param after: The id of the last pilot of the previous page, defaults
+    to 0 for the first page
+    :param limit: The maximum number of pilots, defaults to 100
+    :return: The pilot entries
+    """
+    pilots = (
+        await Pilot.filter(id__gt=after)
+        .order_by("id")
+        .limit(limit)
+        .values(*_PILOT_FIELDS)
+    )
+    if not pilots:
+        return []
+
+    attributes = (
+        await PilotAttribute.filter(
+            pilot_id__gte=pilots[0]["id"], pilot_id__lte=pilots[-1]["id"]
+        )
+        .order_by("id")
+        .values(*_ATTRIBUTE_FIELDS)
+    )
+
+    return list(_entries(pilots, attributes).values())
+
+
+async def pilot_batches(
+    after: int = 0, batch_size: int = 500
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Iterate over the pilots of the database in batches, holding only a
+    single batch in memory
+
+    :param after: Start after the pilot with this id, defaults to 0
+    :param batch_size: The number of pilots per batch, defaults to 500
+    :yield: The pilot entries of each batch
+    """
+    while batch := await pilot_page(after, batch_size):
+        yield batch
+
+        if len(batch) < batch_size:
+            break
+
+        after = batch[-1]["id"]
+
+
+class PilotRoster:
+    """
+    The pilots of the event and their attributes kept in memory.
+
+    The roster is loaded from the database on first use and kept up to date
+    by the pilot events of the event broker, so reading pilots never queries
+    the database. Every change increments the version, invalidating the
+    encoded full roster.
+    """
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self.version = 0
+        """Incremented on every change to the roster"""
+        self._pilots: dict[int, dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._encoded: bytes | None = None
+        self._encoded_version = -1
+
+    async def _ensure_loaded(self) -> None:
+        """
+        Load the full roster from the database if not yet loaded
+        """
+        if self._loaded:
+            return
+
+        async with self._lock:
+            if self._loaded:
+                return
+
+            pilots = await Pilot.all().order_by("id").values(*_PILOT_FIELDS)
+            attributes = (
+                await PilotAttribute.all().order_by("id").values(*_ATTRIBUTE_FIELDS)
+            )
+
+            self._pilots = _entries(pilots, attributes)
+            self._loaded = True
+            self.version += 1
+
+            logger.debug("Loaded %d pilots into the roster", len(self._pilots))
+
+    def clear(self) -> None:
+        """
+        Discard the roster, reloading it from the database on next use
+        """
+        self._pilots = {}
+        self._loaded = False
+        self._encoded = None
+        self.version += 1
+
+    async def get(self, pilot_id: int) -> dict[str, Any] | None:
+        """
+        Get a pilot
+
+        :param pilot_id: The id of the pilot
+        :return: The pilot data, None if the pilot does not exist
+        """
+        await self._ensure_loaded()
+        return self._pilots.get(pilot_id)
+
+    async def all(self) -> list[dict[str, Any]]:
+        """
+        Get every pilot
+
+        :return: The pilot data ordered by id
+        """
+        await self._ensure_loaded()
+        return [self._pilots[id_] for id_ in sorted(self._pilots)]
+
+    async def encoded(self) -> bytes:
+        """
+        Get every pilot encoded as a JSON array. The encoding is reused until
+        the roster changes.
+
+        :return: The encoded pilots
+        """
+        await self._ensure_loaded()
+
+        if self._encoded is None or self._encoded_version != self.version:
+            self._encoded = json.dumps(await self.all()).encode()
+            self._encoded_version = self.version
+
+        return self._encoded
+
+    async def refresh_pilot(self, pilot_id: int) -> None:
+        """
+        Reload a single pilot from the database
+
+        :param pilot_id: The id of the pilot
+        """
+        async with self._lock:
+            if not self._loaded:
+                return
+
+            pilots = await Pilot.filter(id=pilot_id).values(*_PILOT_FIELDS)
+            attributes = (
+                await PilotAttribute.filter(pilot_id=pilot_id)
+                .order_by("id")
+                .values(*_ATTRIBUTE_FIELDS)
+            )
+
+            entries = _entries(pilots, attributes)
+            if pilot_id in entries:
+                self._pilots[pilot_id] = entries[pilot_id]
+            else:
+                self._pilots.pop(pilot_id, None)
+
+            self.version += 1
+
+    async def pilot_changed(self, id: int, **_: Any) -> None:
+        """
+        Callback for pilots being added or altered
+
+        :param id: The id of the pilot
+        """
+        # pylint: disable=W0622
+        await self.refresh_pilot(id)
+
+    async def pilot_deleted(self, id: int, **_: Any) -> None:
+        """
+        Callback for pilots being deleted
+
+        :param id: The id of the pilot
+        """
+        # pylint: disable=W0622
+        async with self._lock:
+            if self._pilots.pop(id, None) is not None:
+                self.version += 1
+
+    async def pilots_imported(self, **_: Any) -> None:
+        """
+        Callback for pilots being imported in bulk. The roster is reloaded
+        on next use instead of querying each imported pilot.
+        """
+        async with self._lock:
+            self.clear()
+
+    def register_callbacks(self, broker: EventBroker) -> None:
+        """
+        Keep the roster updated from the pilot events of a broker
+
+        :param broker: The event broker
+        """
+        broker.register_event_callback(EventSetupEvt.PILOT_ADD, self.pilot_changed)
+        broker.register_event_callback(EventSetupEvt.PILOT_ALTER, self.pilot_changed)
+        broker.register_event_callback(EventSetupEvt.PILOT_DELETE, self.pilot_deleted)
+        broker.register_event_callback(EventSetupEvt.PILOT_IMPORT, self.pilots_imported)
@@ -0,0 +1,95 @@
+"""
+Precomputed race timelines
+"""
+
+from typing import Self
+from dataclasses import dataclass
+
+from .enums import RaceStatus
+from ..database.raceformat import RaceSchedule
+from ..utils.time import monotonic_to_epoch_millis
+
+
+@dataclass(frozen=True, slots=True)
+class RaceTimeline:
+    """
+    The event loop times of every transition in a race. All of the
+    times are computed when the race is scheduled.
+    """
+
+    stage: float
+    """The time staging begins"""
+    start: float
+    """The time racing begins"""
+    finish: float | None
+    """The time the race clock expires, None if the race time is unlimited"""
+    stop: float | None
+    """The time overtime ends, None if the race or overtime is unlimited"""
+
+    @classmethod
+    def from_schedule(cls, schedule: RaceSchedule, stage: float, start: float) -> Self:
+        """
+        Generate the timeline for a race schedule
+
+        :param schedule: The format's race schedule
+        :param stage: The event loop time staging begins
+        :param start: The event loop time racing begins, including
+        any random delay
+        :return: The generated timeline
+        """
+        if schedule.unlimited_time:
+            return cls(stage, start, None, None)
+
+        finish = start + schedule.race_time_sec
+
+        if schedule.overtime_sec < 0:
+            return cls(stage, start, finish, None)
+
+        return cls(stage, start, finish, finish + schedule.overtime_sec)
+
+    def status_at(self, time: float) -> RaceStatus:
+        """
+        Determine the status a race following the timeline would be in
+        at the provided time
+
+        :param time: The event loop time
+        :return: The expected race status
+        """
+        if time < self.stage:
+            return RaceStatus.SCHEDULED
+
+        if time < self.start:
+            return RaceStatus.STAGING
+
+        if self.finish is None or time < self.finish:
+            return RaceStatus.RACING
+
+        if self.stop is None or time < self.stop:
+            return RaceStatus.OVERTIME
+
+        return RaceStatus.STOPPED
+
+    def to_epoch_millis(self, *, reveal_start: bool = True) -> dict[str, float | None]:
+        """
+        Convert the timeline to milliseconds since epoch for clients
+
+        :param reveal_start: Include the start time and the times
+        derived from it, defaults to True
+        :return: The converted timeline
+        """
+        if not reveal_start:
+            return {
+                "stage": monotonic_to_epoch_millis(self.stage),
+                "start": None,
+                "finish": None,
+                "stop": None,
+            }
+
+        return {
+            "stage": monotonic_to_epoch_millis(self.stage),
+            "start": monotonic_to_epoch_millis(self.start),
+            "finish": (
+                None if self.finish is None else monotonic_to_epoch_millis(self.finish)
+            ),
+            "stop": None if self.stop is None else monotonic_to_epoch_millis(self.stop),
+        }
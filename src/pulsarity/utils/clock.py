@@ -0,0 +1,289 @@
+"""
+Clock domain tracking
+"""
+
+import time
+import asyncio
+import logging
+import contextlib
+from typing import NamedTuple, TypeVar
+
+import numpy as np
+import numpy.typing as npt
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", float, npt.NDArray[np.float64])
+
+
+class ClockEstimate(NamedTuple):
+    """
+    The relation between a local and a remote clock at a reference time.
+    Estimates are immutable and can be passed to the executor pool.
+    """
+
+    reference: float
+    """Local time the estimate was made at"""
+    offset: float
+    """Remote time minus local time at the reference time"""
+    drift: float
+    """Rate the offset changes at in seconds per local second"""
+
+    def to_remote(self, local: T) -> T:
+        """
+        Convert local times to remote times
+
+        :param local: A local time or an array of local times
+        :return: The remote times
+        """
+        return local + self.offset + self.drift * (local - self.reference)
+
+    def to_local(self, remote: T) -> T:
+        """
+        Convert remote times to local times
+
+        :param remote: A remote time or an array of remote times
+        :return: The local times
+        """
+        return (remote - self.offset + self.drift * self.reference) / (1 + self.drift)
+
+
+class ClockFilter:
+    """
+    Tracks the offset and drift of a remote clock from pairs of local and
+    remote times with an alpha-beta filter.
+
+    Samples far from the prediction are rejected as delayed readings. A run
+    of rejected samples is treated as a step of the remote clock, and the
+    filter restarts from the latest sample.
+    """
+
+    # pylint: disable=R0902
+
+    alpha: float = 0.2
+    """Gain of the offset correction once the filter has settled"""
+    beta: float = 0.02
+    """Gain of the drift correction once the filter has settled"""
+    max_drift: float = 5e-4
+    """Largest drift accepted in seconds per second"""
+    outlier_limit: float = 0.05
+    """Smallest residual in seconds that can be rejected as an outlier"""
+    step_count: int = 3
+    """Number of consecutive rejected samples treated as a step"""
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self.samples = 0
+        """Number of samples accepted since the filter started"""
+        self.noise = 0.0
+        """Average size of the residuals of accepted samples in seconds"""
+        self._estimate = ClockEstimate(0.0, 0.0, 0.0)
+        self._rejected = 0
+
+    @property
+    def estimate(self) -> ClockEstimate:
+        """The current estimate of the remote clock"""
+        return self._estimate
+
+    def reset(self) -> None:
+        """
+        Discard all samples
+        """
+        self.samples = 0
+        self.noise = 0.0
+        self._estimate = ClockEstimate(0.0, 0.0, 0.0)
+        self._rejected = 0
+
+    def update(self, local: float, remote: float) -> ClockEstimate:
+        """
+        Add a pair of times read from both clocks at the same moment
+
+        :param local: The local time
+        :param remote: The remote time
+        :return: The updated estimate
+        """
+        measured = remote - local
+
+        if self.samples == 0:
+            self.samples = 1
+            self._estimate = ClockEstimate(local, measured, 0.0)
+            return self._estimate
+
+        reference, offset, drift = self._estimate
+        elapsed = local - reference
+        predicted = offset + drift * elapsed
+        residual = measured - predicted
+
+        if self.samples > 2 and abs(residual) > max(self.outlier_limit, 4 * self.noise):
+            self._rejected += 1
+            if self._rejected < self.step_count:
+                return self._estimate
+
+            logger.info("Clock stepped by %.3f seconds", residual)
+            self.reset()
+            return self.update(local, remote)
+
+        self._rejected = 0
+        self.samples += 1
+
+        # Converge quickly on the first samples before settling
+        alpha = max(self.alpha, 1 / self.samples)
+        beta = max(self.beta, 1 / self.samples**2)
+
+        offset = predicted + alpha * residual
+        if elapsed > 0:
+            drift += beta * residual / elapsed
+            drift = min(max(drift, -self.max_drift), self.max_drift)
+
+        self.noise += (abs(residual) - self.noise) / min(self.samples, 16)
+        self._estimate = ClockEstimate(local, offset, drift)
+        return self._estimate
+
+
+class ClockService:
+    """
+    Tracks the clocks of the system. The realtime clock is tracked against
+    the monotonic clock used by the event loop, following adjustments of
+    the system time during long events. Timer nodes with their own clocks
+    are tracked against the monotonic clock individually.
+    """
+
+    interval: float = 10.0
+    """Seconds between samples of the realtime clock"""
+    sample_reads: int = 3
+    """Number of reads per sample, the read with the shortest gap is used"""
+
+    def __init__(self) -> None:
+        """
+        Class initialization
+        """
+        self.realtime = ClockFilter()
+        """Realtime clock in seconds since epoch against the monotonic clock"""
+        self.nodes: dict[int, ClockFilter] = {}
+        """Clocks of timer nodes against the monotonic clock"""
+        self._task: asyncio.Task | None = None
+
+    def sample(self) -> ClockEstimate:
+        """
+        Read the monotonic and realtime clocks and update the estimate
+
+        :return: The updated estimate
+        """
+        gap, monotonic, realtime = float("inf"), 0.0, 0.0
+        for _ in range(max(self.sample_reads, 1)):
+            before = time.monotonic()
+            read = time.time()
+            after = time.monotonic()
+
+            if after - before < gap:
+                gap, monotonic, realtime = after - before, (before + after) / 2, read
+
+        return self.realtime.update(monotonic, realtime)
+
+    @property
+    def estimate(self) -> ClockEstimate:
+        """The current estimate of the realtime clock"""
+        if self.realtime.samples == 0:
+            return self.sample()
+
+        return self.realtime.estimate
+
+    async def _run(self) -> None:
+        """
+        Sample the realtime clock periodically
+        """
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Start sampling the realtime clock in the background
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop sampling the realtime clock
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def monotonic_to_epoch(self, seconds: T) -> T:
+        """
+        Convert monotonic times to seconds since epoch
+
+        :param seconds: A monotonic time or an array of monotonic times
+        :return: The converted times
+        """
+        return self.estimate.to_remote(seconds)
+
+    def epoch_to_monotonic(self, seconds: T) -> T:
+        """
+        Convert seconds since epoch to monotonic times
+
+        :param seconds: A time or an array of times since epoch
+        :return: The converted times
+        """
+        return self.estimate.to_local(seconds)
+
+    def update_node(
+        self, node_index: int, node_time: float, monotonic: float
+    ) -> ClockEstimate:
+        """
+        Add a pair of times read from the clock of a timer node and the
+        monotonic clock
+
+        :param node_index: The index of the node
+        :param node_time: The time read from the node
+        :param monotonic: The monotonic time of the read
+        :return: The updated estimate of the node clock
+        """
+        node_clock = self.nodes.get(node_index)
+        if node_clock is None:
+            node_clock = self.nodes[node_index] = ClockFilter()
+
+        return node_clock.update(monotonic, node_time)
+
+    def node_estimate(self, node_index: int) -> ClockEstimate:
+        """
+        Get the estimate of the clock of a timer node
+
+        :param node_index: The index of the node
+        :raises KeyError: The clock of the node has not been sampled
+        :return: The estimate of the node clock
+        """
+        node_clock = self.nodes[node_index]
+        if node_clock.samples == 0:
+            raise KeyError(node_index)
+
+        return node_clock.estimate
+
+    def node_to_monotonic(self, node_index: int, node_time: T) -> T:
+        """
+        Convert times of the clock of a timer node to monotonic times
+
+        :param node_index: The index of the node
+        :param node_time: A node time or an array of node times
+        :return: The converted times
+        """
+        return self.node_estimate(node_index).to_local(node_time)
+
+    def monotonic_to_node(self, node_index: int, monotonic: T) -> T:
+        """
+        Convert monotonic times to times of the clock of a timer node
+
+        :param node_index: The index of the node
+        :param monotonic: A monotonic time or an array of monotonic times
+        :return: The converted times
+        """
+        return self.node_estimate(node_index).to_remote(monotonic)
+
+
+clock = ClockService()
@@ -6,6 +6,7 @@ import logging
 import asyncio
 import datetime
 import copy
+from pathlib import Path
 from secrets import token_urlsafe
 from typing import Literal, Any
 
@@ -16,7 +17,9 @@ from .logging import generate_default_config
 
 _DEFAULT_CONFIG_FILE_NAME = "config.toml"
 
-_SECTIONS = Literal["SECRETS", "WEBSERVER", "GENERAL", "LOGGING", "DATABASE"]
+_SECTIONS = Literal[
+    "SECRETS", "WEBSERVER", "GENERAL", "LOGGING", "DATABASE", "HARDWARE"
+]
 
 _logger = logging.getLogger(__name__)
 
@@ -51,7 +54,15 @@ def get_configs_defaults() -> dict[_SECTIONS, dict]:
     }
 
     # other default configurations
-    general = {"LAST_MODIFIED_TIME": datetime.datetime.now()}
+    general = {
+        "LAST_MODIFIED_TIME": datetime.datetime.now(),
+        "RACE_CHECKPOINT_FILE": "race.checkpoint",
+        "DATABASE_PROFILE": "balanced",
+        "DATABASE_CHECKPOINT_INTERVAL": 60,
+        "EVENT_DIRECTORY": "events",
+        "ACTIVE_EVENT": "",
+        "SLOW_QUERY_THRESHOLD": 100,
+    }
 
     # logging settings
     logging_ = generate_default_config()
@@ -67,12 +78,19 @@ def get_configs_defaults() -> dict[_SECTIONS, dict]:
         },
     }
 
+    # timer hardware settings
+    hardware = {
+        "SIMULATED_NODES": 0,
+        "SIMULATED_SAMPLE_RATE": 1000,
+    }
+
     config: dict[_SECTIONS, dict[str, Any]] = {
         "SECRETS": secrets,
         "WEBSERVER": webserver,
         "GENERAL": general,
         "LOGGING": logging_,
         "DATABASE": database,
+        "HARDWARE": hardware,
     }
 
     return config
@@ -87,6 +105,22 @@ class ConfigManager:
 
     def __init__(self, filename: str) -> None:
         self._config_filename = filename
+        self._writes: set[asyncio.Task] = set()
+
+    @property
+    def directory(self) -> Path:
+        """The directory of the config file"""
+        return Path(self._config_filename).absolute().parent
+
+    def resolve_path(self, path: str) -> Path:
+        """
+        Resolve a file setting. Relative paths are relative to the directory
+        of the config file rather than the working directory.
+
+        :param path: The path from the config
+        :return: The absolute path
+        """
+        return self.directory / Path(path).expanduser()
 
     def _write_file_config(self, configs_: dict[_SECTIONS, dict]):
         """
@@ -204,7 +238,16 @@ class ConfigManager:
         except RuntimeError:
             self._write_file_config(self._configs)
         else:
-            loop.create_task(self._write_file_config_async(self._configs))
+            task = loop.create_task(self._write_file_config_async(self._configs))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def flush(self) -> None:
+        """
+        Wait for the changed settings to be written to the config file
+        """
+        if self._writes:
+            await asyncio.gather(*self._writes)
 
     def get_sharable_config(self) -> dict[_SECTIONS, dict]:
         """
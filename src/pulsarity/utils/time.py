@@ -4,7 +4,10 @@ Custom time utilities
 
 import time
 from datetime import datetime, timezone, timedelta
-from functools import lru_cache
+
+from .clock import clock, T
+
+_SERVER_START_MONOTONIC = time.monotonic()
 
 
 def get_current_epoch_time() -> timedelta:
@@ -27,17 +30,13 @@ def get_current_epoch_time_seconds() -> float:
     return get_current_epoch_time().total_seconds()
 
 
-@lru_cache(maxsize=1)
 def get_server_start_time() -> timedelta:
     """
     Gets the server start time relative to 1 January 1970
 
     :return: A timedelta object
     """
-    current_time = get_current_epoch_time()
-    running_time = timedelta(seconds=time.process_time())
-
-    return current_time - running_time
+    return timedelta(seconds=clock.monotonic_to_epoch(_SERVER_START_MONOTONIC))
 
 
 def get_server_start_time_seconds() -> float:
@@ -49,17 +48,13 @@ def get_server_start_time_seconds() -> float:
     return get_server_start_time().total_seconds()
 
 
-@lru_cache(maxsize=1)
 def get_server_start_time_monotonic() -> timedelta:
     """
     Gets the monotonic server start time
 
     :return: A timedelta object
     """
-    current_time = timedelta(seconds=time.monotonic())
-    running_time = timedelta(seconds=time.process_time())
-
-    return current_time - running_time
+    return timedelta(seconds=_SERVER_START_MONOTONIC)
 
 
 def get_server_start_time_monotonic_seconds() -> float:
@@ -71,7 +66,6 @@ def get_server_start_time_monotonic_seconds() -> float:
     return get_server_start_time_monotonic().total_seconds()
 
 
-@lru_cache(maxsize=1)
 def mtonic_to_epoch_millis_offset() -> float:
     """
     Get the current offest of the system time compared to
@@ -80,19 +74,28 @@ def mtonic_to_epoch_millis_offset() -> float:
 
     :return: The offset value
     """
-    offset_sec = get_server_start_time() - get_server_start_time_monotonic()
-    return offset_sec.total_seconds() * 1000
+    now = time.monotonic()
+    return (clock.monotonic_to_epoch(now) - now) * 1000
 
 
-def epoch_millis_to_monotonic(milliseconds: float) -> float:
+def epoch_millis_to_monotonic(milliseconds: T) -> T:
     """
     Convert number of milliseconds in epoch time to monotonic time.
 
-    :param milliseconds: Milliseconds in epoch time
+    :param milliseconds: Milliseconds in epoch time, or an array of them
     :return: The converted time in seconds
     """
-    corrected_mills = milliseconds - mtonic_to_epoch_millis_offset()
-    return corrected_mills / 1000
+    return clock.epoch_to_monotonic(milliseconds / 1000)
+
+
+def monotonic_to_epoch_millis(seconds: T) -> T:
+    """
+    Convert monotonic time in seconds to the number of milliseconds in epoch time.
+
+    :param seconds: Monotonic time in seconds, or an array of them
+    :return: The converted time in milliseconds
+    """
+    return clock.monotonic_to_epoch(seconds) * 1000
 
 
 def datetime_formatted_string(datetime_: datetime) -> str:
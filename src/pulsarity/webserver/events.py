@@ -4,6 +4,7 @@ Webserver event handling
 
 import logging
 import json
+from pathlib import Path
 from typing import Any
 
 from quart import ResponseReturnValue, redirect, url_for
@@ -12,10 +13,24 @@ from quart_auth import Unauthorized
 from tortoise import Tortoise, connections
 
 from ..extensions import PulsarityBlueprint, current_app
-from ..events import SpecialEvt
+from ..events import SpecialEvt, RaceSequenceEvt
 from ..database import setup_default_objects
+from ..database.migrations import (
+    migrate_race_formats,
+    migrate_pilot_attributes,
+    outdated_connections,
+    stamp_connections,
+)
+from ..database.tuning import apply_sqlite_profile, wal_checkpointer
+from ..database.writebehind import write_behind
+from ..database.eventfiles import event_databases
+from ..database.instrumentation import query_timer
+from ..race.enums import RaceStatus
+from ..race.checkpoint import RaceCheckpoint
+from ..hardware import SimulatedNode
 
 from ..utils.executor import executor
+from ..utils.clock import clock
 from ..utils.config import configs
 
 logger = logging.getLogger(__name__)
@@ -23,6 +38,14 @@ logger = logging.getLogger(__name__)
 events = PulsarityBlueprint("events", __name__)
 db_events = PulsarityBlueprint("db_events", __name__)
 
+_ACTIVE_RACE_STATUS = (
+    RaceStatus.SCHEDULED,
+    RaceStatus.STAGING,
+    RaceStatus.RACING,
+    RaceStatus.OVERTIME,
+)
+"""Statuses during which database checkpoints are postponed"""
+
 
 @events.before_app_serving
 async def server_startup() -> None:
@@ -31,6 +54,24 @@ async def server_startup() -> None:
     """
     logger.info("Starting Pulsarity...")
     executor.set_executor()
+    clock.start()
+
+    current_app.event_broker.register_event_callback(
+        RaceSequenceEvt.LAP_RECORD, current_app.race_manager.leaderboard.record_lap
+    )
+    current_app.race_manager.roster.register_callbacks(current_app.event_broker)
+
+    _simulated_nodes = configs.get_config("HARDWARE", "SIMULATED_NODES")
+    simulated_nodes = _simulated_nodes if isinstance(_simulated_nodes, int) else 0
+
+    _sample_rate = configs.get_config("HARDWARE", "SIMULATED_SAMPLE_RATE")
+    sample_rate = _sample_rate if isinstance(_sample_rate, (int, float)) else 1000
+
+    for index in range(simulated_nodes):
+        node = SimulatedNode(index, sample_rate=sample_rate)
+        current_app.timer_interface.add_node(node)
+
+    await current_app.timer_interface.start()
 
 
 @events.after_app_serving
@@ -39,6 +80,8 @@ async def server_shutdown() -> None:
     Log the application shutdown
     """
     logger.info("Stopping Pulsarity...")
+    await current_app.timer_interface.stop()
+    await clock.stop()
     await executor.shutdown_executor()
 
 
@@ -62,9 +105,23 @@ async def database_startup() -> None:
     """
     Initialize the database
     """
+    _profile = configs.get_config("GENERAL", "DATABASE_PROFILE")
+    profile = _profile if isinstance(_profile, str) else "balanced"
+
+    database = configs.get_section("DATABASE") or {}
+    try:
+        database = apply_sqlite_profile(database, profile)
+    except ValueError as ex:
+        logger.error("%s, using SQLite defaults", ex)
+
+    _threshold = configs.get_config("GENERAL", "SLOW_QUERY_THRESHOLD")
+    if isinstance(_threshold, (int, float)):
+        query_timer.slow_threshold_ms = _threshold
+    query_timer.install()
+
     await Tortoise.init(
         {
-            "connections": configs.get_section("DATABASE"),
+            "connections": database,
             "apps": {
                 "system": {
                     "models": ["pulsarity.database"],
@@ -78,8 +135,40 @@ async def database_startup() -> None:
         }
     )
 
-    await Tortoise.generate_schemas(True)
-    await setup_default_objects()
+    # Only databases created or stored by another version need upgrading
+    outdated = await outdated_connections()
+    if outdated:
+        logger.info("Upgrading %d databases", len(outdated))
+        await Tortoise.generate_schemas(True)
+        await migrate_race_formats()
+        await migrate_pilot_attributes()
+        await setup_default_objects()
+        await stamp_connections(outdated)
+
+    _event_directory = configs.get_config("GENERAL", "EVENT_DIRECTORY")
+    if isinstance(_event_directory, str):
+        event_databases.directory = Path(_event_directory)
+
+    # Checkpointed races refer to the event that was active before a restart
+    await event_databases.reopen()
+
+    _interval = configs.get_config("GENERAL", "DATABASE_CHECKPOINT_INTERVAL")
+    if isinstance(_interval, (int, float)) and _interval > 0:
+        wal_checkpointer.interval = _interval
+
+    race_manager = current_app.race_manager
+    wal_checkpointer.start(lambda: race_manager.status in _ACTIVE_RACE_STATUS)
+    write_behind.start()
+
+    # Restored races reload their saved laps, so the database must be ready
+    _checkpoint_file = configs.get_config("GENERAL", "RACE_CHECKPOINT_FILE")
+    checkpoint_file = (
+        _checkpoint_file if isinstance(_checkpoint_file, str) else "race.checkpoint"
+    )
+
+    checkpoint = RaceCheckpoint(str(configs.resolve_path(checkpoint_file)))
+    checkpoint.open()
+    await race_manager.restore_checkpoint(checkpoint)
 
     logger.debug("Database started, %s", json.dumps(tuple(Tortoise.apps)))
 
@@ -89,7 +178,12 @@ async def database_shutdown() -> None:
     """
     Shutdown the database
     """
+    current_app.race_manager.close_checkpoint()
+    await write_behind.stop()
+    await wal_checkpointer.stop()
     await connections.close_all()
+    query_timer.uninstall()
+    await configs.flush()
 
     logger.debug("Database shutdown")
 
@@ -2,20 +2,60 @@
 HTTP Rest API Routes
 """
 
-from uuid import UUID
+import json
 import logging
+from uuid import UUID
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import asdict
+from typing import Any
 
+from quart import Response, request
 from quart_auth import login_user, logout_user, login_required
-from quart_schema import validate_request, validate_response
-from pydantic import BaseModel
-from werkzeug.exceptions import NotFound
+from quart_schema import (
+    validate_request,
+    validate_response,
+    validate_querystring,
+    document_response,
+)
+from werkzeug.exceptions import BadRequest, NotFound, Conflict, UnsupportedMediaType
 
 from ..extensions import PulsarityBlueprint, AppUser, current_user, current_app
 from .auth import permission_required
 from ..database.user import User
-from ..database.pilot import Pilot
 from ..database.permission import SystemDefaultPerms
-from .validation import BaseResponse, LoginRequest, LoginResponse, ResetPasswordRequest
+from ..database.eventfiles import event_databases
+from ..database.instrumentation import BUCKETS_MS, query_timer
+from ..race import marshal
+from ..race.heats import HeatSettings
+from ..race.roster import pilot_page, pilot_batches
+from ..race.pilot_import import import_pilots, csv_rows, ndjson_rows, iterate_rows
+from ..race.frequencies import FrequencySettings, plan_frequencies
+from .validation import (
+    BaseResponse,
+    LoginRequest,
+    LoginResponse,
+    ResetPasswordRequest,
+    PilotResponse,
+    PilotListResponse,
+    PilotPageQuery,
+    PilotPageResponse,
+    PilotStreamQuery,
+    PilotImportResponse,
+    EventListResponse,
+    EventRequest,
+    ArchivedEventResponse,
+    QueryStatsResponse,
+    SlowQueryResponse,
+    QueryTimingResponse,
+    LeaderboardSnapshot,
+    LapAddRequest,
+    LapAlterRequest,
+    LapResponse,
+    HeatGenerateRequest,
+    HeatGenerateResponse,
+    FrequencyRequest,
+    FrequencyResponse,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,9 +96,9 @@ async def login(data: LoginRequest) -> LoginResponse:
 
         logger.info("%s has been logged into the server", auth_user.auth_id)
 
-        current_app.add_background_task(User.update_user_login_time)
+        user.defer_login_time_update()
 
-        current_app.add_background_task(User.check_for_rehash, data.password)
+        current_app.add_background_task(user.check_for_rehash, data.password)
 
         return LoginResponse(status=True, password_reset_required=user.reset_required)
 
@@ -110,38 +150,369 @@ api = PulsarityBlueprint(
     url_prefix="/api",
 )
 
-PilotModel = Pilot.generate_pydaantic_model()
-
 
 @api.get("/pilot/<int:pilot_id>")
 @permission_required(SystemDefaultPerms.READ_PILOTS)
-@validate_response(PilotModel)
-async def get_pilot(pilot_id: int) -> BaseModel:
+@validate_response(PilotResponse)
+async def get_pilot(pilot_id: int) -> PilotResponse:
     """
-    Get the pilot by id
+    Get the pilot by id from the roster
 
     :return: Pilot data.
     """
-    pilot = await Pilot.get_by_id(pilot_id)
+    pilot = await current_app.race_manager.roster.get(pilot_id)
 
     if pilot is None:
         raise NotFound()
 
-    return await PilotModel.from_tortoise_orm(pilot)
+    return PilotResponse(**pilot)
+
 
+@api.get("/pilot/all")
+@permission_required(SystemDefaultPerms.READ_PILOTS)
+@document_response(PilotListResponse)
+async def get_pilots() -> Response:
+    """
+    Get every pilot from the roster. The encoded roster is reused until
+    a pilot changes.
 
-PilotModelList = Pilot.generate_pydaantic_queryset()
+    :return: The encoded pilots
+    """
+    data = await current_app.race_manager.roster.encoded()
+    return Response(data, mimetype="application/json")
 
 
-@api.get("/pilot/all")
+@api.get("/pilot/page")
+@permission_required(SystemDefaultPerms.READ_PILOTS)
+@validate_querystring(PilotPageQuery)
+@validate_response(PilotPageResponse)
+async def get_pilot_page(query_args: PilotPageQuery) -> PilotPageResponse:
+    """
+    Get a page of pilots from the database, continuing after the last
+    pilot of the previous page
+
+    :return: The pilots of the page
+    """
+    # Fetch one extra pilot to know whether another page follows
+    pilots = await pilot_page(query_args.after, query_args.limit + 1)
+    next_after = None
+    if len(pilots) > query_args.limit:
+        del pilots[query_args.limit :]
+        next_after = pilots[-1]["id"]
+
+    return PilotPageResponse(
+        pilots=[PilotResponse(**pilot) for pilot in pilots], next_after=next_after
+    )
+
+
+@api.get("/pilot/stream")
 @permission_required(SystemDefaultPerms.READ_PILOTS)
-@validate_response(PilotModelList)
-async def get_pilots() -> BaseModel:
+@validate_querystring(PilotStreamQuery)
+async def stream_pilots(query_args: PilotStreamQuery) -> Response:
+    """
+    Stream every pilot from the database as newline delimited JSON. Pilots
+    are fetched in batches, so memory use does not grow with the number of
+    pilots and the first pilots are sent before the rest are fetched.
+
+    :return: The streamed pilots
+    """
+
+    async def _generate() -> AsyncIterator[bytes]:
+        async for batch in pilot_batches(query_args.after, query_args.batch_size):
+            yield b"".join(json.dumps(pilot).encode() + b"\n" for pilot in batch)
+
+    return Response(_generate(), mimetype="application/x-ndjson")
+
+
+@api.post("/pilot/import")
+@permission_required(SystemDefaultPerms.WRITE_PILOTS)
+@validate_response(PilotImportResponse)
+async def import_pilot_list() -> PilotImportResponse:
+    """
+    Import pilots in bulk from a CSV file with a header line, newline
+    delimited JSON objects or a JSON array of objects. CSV and newline
+    delimited JSON are validated and inserted as the body is received.
+
+    :return: The outcome of the import
+    """
+    rows: AsyncIterable[Any]
+    match request.mimetype:
+        case "text/csv":
+            rows = csv_rows(
+                request.body, request.mimetype_params.get("charset", "utf-8-sig")
+            )
+        case "application/x-ndjson":
+            rows = ndjson_rows(request.body)
+        case "application/json":
+            data = await request.get_json()
+            if not isinstance(data, list):
+                raise BadRequest("Expected an array of pilots")
+            rows = iterate_rows(data)
+        case _:
+            raise UnsupportedMediaType()
+
+    try:
+        summary = await import_pilots(rows)
+    except (LookupError, ValueError) as ex:
+        raise BadRequest(str(ex)) from ex
+
+    return PilotImportResponse(**asdict(summary))
+
+
+@api.get("/event")
+@permission_required(SystemDefaultPerms.SYSTEM_CONTROL)
+@validate_response(EventListResponse)
+async def get_events() -> EventListResponse:
+    """
+    List the events that can be switched to and the archived events
+
+    :return: The event names
+    """
+    return EventListResponse(
+        active=event_databases.active,
+        events=event_databases.list_events(),
+        archives=event_databases.list_archives(),
+    )
+
+
+@api.post("/event/switch")
+@permission_required(SystemDefaultPerms.SYSTEM_CONTROL)
+@validate_request(EventRequest)
+@validate_response(BaseResponse)
+async def switch_event(data: EventRequest) -> BaseResponse:
+    """
+    Make another event active, creating it if requested
+
+    :return: The status of the request
+    """
+    try:
+        await current_app.race_manager.switch_event(data.name, data.create)
+    except ValueError as ex:
+        raise Conflict(str(ex)) from ex
+    except FileNotFoundError as ex:
+        raise NotFound(str(ex)) from ex
+
+    return BaseResponse(status=True)
+
+
+@api.post("/event/archive")
+@permission_required(SystemDefaultPerms.SYSTEM_CONTROL)
+@validate_request(EventRequest)
+@validate_response(BaseResponse)
+async def archive_event(data: EventRequest) -> BaseResponse:
+    """
+    Move an event to the archive
+
+    :return: The status of the request
+    """
+    try:
+        await event_databases.archive(data.name)
+    except (ValueError, FileExistsError) as ex:
+        raise Conflict(str(ex)) from ex
+    except FileNotFoundError as ex:
+        raise NotFound(str(ex)) from ex
+
+    return BaseResponse(status=True)
+
+
+@api.get("/event/archive/<name>")
+@permission_required(SystemDefaultPerms.SYSTEM_CONTROL)
+@validate_response(ArchivedEventResponse)
+async def get_archived_event(name: str) -> ArchivedEventResponse:
+    """
+    Get the saved races of an archived event. The archive is opened
+    read-only.
+
+    :return: The races and their laps
+    """
+    try:
+        races = await event_databases.read_archive(name)
+    except ValueError as ex:
+        raise BadRequest(str(ex)) from ex
+    except FileNotFoundError as ex:
+        raise NotFound(str(ex)) from ex
+
+    return ArchivedEventResponse.model_validate({"name": name, "races": races})
+
+
+@api.get("/system/queries")
+@permission_required(SystemDefaultPerms.SYSTEM_CONTROL)
+@validate_response(QueryTimingResponse)
+async def get_query_timing() -> QueryTimingResponse:
+    """
+    Get the latency of the database queries by model and operation, most
+    time consuming first
+
+    :return: The query latency and the recent slow queries
+    """
+    bounds = [f"{bound:g}" for bound in BUCKETS_MS] + ["inf"]
+    queries = [
+        QueryStatsResponse(
+            model=model,
+            operation=operation,
+            count=stats.count,
+            total_ms=stats.total_ms,
+            mean_ms=stats.total_ms / stats.count,
+            max_ms=stats.max_ms,
+            buckets=dict(zip(bounds, stats.buckets)),
+        )
+        for (model, operation), stats in query_timer.stats.items()
+    ]
+    queries.sort(key=lambda stats: stats.total_ms, reverse=True)
+
+    return QueryTimingResponse(
+        slow_threshold_ms=query_timer.slow_threshold_ms,
+        queries=queries,
+        slow_queries=[
+            SlowQueryResponse(**asdict(query)) for query in query_timer.slow_queries
+        ],
+    )
+
+
+@api.delete("/system/queries")
+@permission_required(SystemDefaultPerms.SYSTEM_CONTROL)
+@validate_response(BaseResponse)
+async def reset_query_timing() -> BaseResponse:
+    """
+    Clear the recorded query latency
+
+    :return: The status of the request
+    """
+    query_timer.reset()
+    return BaseResponse(status=True)
+
+
+@api.get("/leaderboard")
+@permission_required(SystemDefaultPerms.RACE_EVENTS)
+@validate_response(LeaderboardSnapshot)
+async def get_leaderboard() -> LeaderboardSnapshot:
+    """
+    Get the full leaderboard of the current race. Clients resume applying
+    the published diffs from the version of the snapshot.
+
+    :return: The leaderboard snapshot
+    """
+    snapshot = current_app.race_manager.leaderboard.snapshot()
+    return LeaderboardSnapshot.model_validate(snapshot)
+
+
+@api.post("/lap")
+@permission_required(SystemDefaultPerms.MARSHAL_RACES)
+@validate_request(LapAddRequest)
+@validate_response(LapResponse)
+async def add_lap(data: LapAddRequest) -> LapResponse:
+    """
+    Add a lap missed by the timer to a saved race
+
+    :return: The added lap
+    """
+    try:
+        lap = await marshal.add_lap(
+            data.race_uuid,
+            data.pilot_id,
+            data.timestamp,
+            node_index=data.node_index,
+            peak_rssi=data.peak_rssi,
+        )
+    except ValueError as ex:
+        raise Conflict(str(ex)) from ex
+
+    if lap is None:
+        raise NotFound()
+
+    return LapResponse.model_validate(lap)
+
+
+@api.patch("/lap/<int:lap_id>")
+@permission_required(SystemDefaultPerms.MARSHAL_RACES)
+@validate_request(LapAlterRequest)
+@validate_response(LapResponse)
+async def alter_lap(lap_id: int, data: LapAlterRequest) -> LapResponse:
+    """
+    Alter the timing or the pilot of a lap of a saved race
+
+    :return: The altered lap
+    """
+    try:
+        lap = await marshal.alter_lap(
+            lap_id, timestamp=data.timestamp, pilot_id=data.pilot_id
+        )
+    except ValueError as ex:
+        raise Conflict(str(ex)) from ex
+
+    if lap is None:
+        raise NotFound()
+
+    return LapResponse.model_validate(lap)
+
+
+@api.delete("/lap/<int:lap_id>")
+@permission_required(SystemDefaultPerms.MARSHAL_RACES)
+@validate_response(LapResponse)
+async def delete_lap(lap_id: int) -> LapResponse:
+    """
+    Delete a false lap from a saved race
+
+    :return: The deleted lap
+    """
+    try:
+        lap = await marshal.delete_lap(lap_id)
+    except ValueError as ex:
+        raise Conflict(str(ex)) from ex
+
+    if lap is None:
+        raise NotFound()
+
+    return LapResponse.model_validate(lap)
+
+
+@api.post("/heats/generate")
+@permission_required(SystemDefaultPerms.WRITE_HEATS)
+@validate_request(HeatGenerateRequest)
+@validate_response(HeatGenerateResponse)
+async def generate_heats(data: HeatGenerateRequest) -> HeatGenerateResponse:
+    """
+    Seed pilots into the heats of a round. Without a ranking, pilots are
+    seeded by their event results.
+
+    :return: The generated heats
+    """
+    settings = HeatSettings(tuple(data.frequencies), data.method, data.tolerance)
+
+    try:
+        heats = await current_app.race_manager.heat_generator.create_round(
+            settings, data.round_index, data.ranking
+        )
+    except ValueError as ex:
+        raise BadRequest(str(ex)) from ex
+    return HeatGenerateResponse.model_validate(heats)
+
+
+@api.post("/frequencies")
+@permission_required(SystemDefaultPerms.READ_HEATS)
+@validate_request(FrequencyRequest)
+@validate_response(FrequencyResponse)
+async def get_frequencies(data: FrequencyRequest) -> FrequencyResponse:
     """
-    A streaming route for getting all pilots currently stored in the
-    database.
+    Find the frequencies with the least interference for the pilots of a
+    heat, preferring frequencies the pilots have recently used
 
-    :yield: A generator yielding pilots converted
-    to a encoded JSON object.
+    :return: The best frequencies
     """
-    return await PilotModelList.from_queryset(Pilot.all())
+    settings = FrequencySettings(tuple(data.bands), data.min_spacing)
+
+    try:
+        plan = await plan_frequencies(data.pilot_ids, data.count, settings)
+    except ValueError as ex:
+        raise BadRequest(str(ex)) from ex
+
+    if plan is None:
+        raise BadRequest("No frequency set satisfies the request")
+
+    assignments = [
+        {"pilot_id": pilot_id, "frequency": frequency}
+        for pilot_id, frequency in zip(data.pilot_ids, plan.assignment)
+    ]
+    return FrequencyResponse.model_validate(
+        {**plan._asdict(), "assignments": assignments}
+    )
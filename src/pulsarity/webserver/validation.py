@@ -2,7 +2,12 @@
 Validation Models for API 
 """
 
-from pydantic import BaseModel
+from uuid import UUID
+from typing import Literal
+
+from pydantic import BaseModel, Field, RootModel, field_validator
+
+from ..race.enums import SeedingMethod
 
 
 class BaseResponse(BaseModel):
@@ -37,3 +42,290 @@ class ResetPasswordRequest(BaseModel):
 
     old_password: str
     new_password: str
+
+
+class PilotAttributeResponse(BaseModel):
+    """
+    An attribute of a pilot
+    """
+
+    id: int
+    name: str
+    value: str | None
+
+
+class PilotResponse(BaseModel):
+    """
+    A pilot of the event
+    """
+
+    id: int
+    callsign: str
+    phonetic: str
+    name: str
+    used_frequencies: str | None
+    active: bool
+    attributes: list[PilotAttributeResponse]
+
+
+class PilotListResponse(RootModel[list[PilotResponse]]):  # pylint: disable=R0903
+    """
+    Every pilot of the event
+    """
+
+
+class PilotPageQuery(BaseModel):
+    """
+    Query for a page of pilots
+    """
+
+    after: int = 0
+    limit: int = Field(100, ge=1, le=1000)
+
+
+class PilotPageResponse(BaseModel):
+    """
+    A page of pilots ordered by id
+    """
+
+    pilots: list[PilotResponse]
+    next_after: int | None
+    """Id to request the next page after, None on the last page"""
+
+
+class PilotStreamQuery(BaseModel):
+    """
+    Query for streaming pilots
+    """
+
+    after: int = 0
+    batch_size: int = Field(500, ge=1, le=5000)
+
+
+class PilotImportError(BaseModel):
+    """
+    A row of a pilot import failing validation
+    """
+
+    row: int
+    error: str
+
+
+class PilotImportResponse(BaseModel):
+    """
+    The outcome of a pilot import
+    """
+
+    created: int
+    skipped: int
+    failed: int
+    errors: list[PilotImportError]
+
+
+class EventListResponse(BaseModel):
+    """
+    The event databases
+    """
+
+    active: str | None
+    events: list[str]
+    archives: list[str]
+
+
+class EventRequest(BaseModel):
+    """
+    Request to switch to or archive an event
+    """
+
+    name: str = Field(pattern=r"^[A-Za-z0-9][A-Za-z0-9_\-]{0,63}$")
+    create: bool = False
+
+
+class QueryStatsResponse(BaseModel):
+    """
+    Latency of the queries of a model and operation
+    """
+
+    model: str
+    operation: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    buckets: dict[str, int]
+
+
+class SlowQueryResponse(BaseModel):
+    """
+    A query exceeding the slow query threshold
+    """
+
+    duration_ms: float
+    model: str
+    operation: str
+    query: str
+    location: str
+
+
+class QueryTimingResponse(BaseModel):
+    """
+    Recorded database query latency
+    """
+
+    slow_threshold_ms: float
+    queries: list[QueryStatsResponse]
+    slow_queries: list[SlowQueryResponse]
+
+
+class LeaderboardStanding(BaseModel):
+    """
+    A row of the leaderboard
+    """
+
+    pilot_id: int
+    position: int
+    laps: int
+    total_time: float
+    fastest_lap: float | None
+    consecutive: float | None
+
+
+class LeaderboardSnapshot(BaseModel):
+    """
+    The full leaderboard at a version
+    """
+
+    version: int
+    ranking: str
+    standings: list[LeaderboardStanding]
+
+
+class LapAddRequest(BaseModel):
+    """
+    Request to add a lap to a saved race
+    """
+
+    race_uuid: UUID
+    pilot_id: int
+    timestamp: float
+    node_index: int = 0
+    peak_rssi: float = 0.0
+
+
+class LapAlterRequest(BaseModel):
+    """
+    Request to alter a lap of a saved race
+    """
+
+    timestamp: float | None = None
+    pilot_id: int | None = None
+
+
+class LapResponse(BaseModel):
+    """
+    A lap of a saved race
+    """
+
+    id: int
+    race_uuid: UUID
+    node_index: int
+    pilot_id: int | None
+    timestamp: float
+    peak_rssi: float
+
+
+class ArchivedRaceResponse(BaseModel):
+    """
+    A saved race of an archived event
+    """
+
+    uuid: UUID
+    start_time: float
+    laps: list[LapResponse]
+
+
+class ArchivedEventResponse(BaseModel):
+    """
+    The saved races of an archived event
+    """
+
+    name: str
+    races: list[ArchivedRaceResponse]
+
+
+class HeatGenerateRequest(BaseModel):
+    """
+    Request to generate the heats of a round
+    """
+
+    frequencies: list[int] = Field(max_length=8)
+    round_index: int = 0
+    method: SeedingMethod = SeedingMethod.LADDER
+    tolerance: int = 2
+    ranking: list[int] | None = None
+
+    @field_validator("frequencies")
+    @classmethod
+    def distinct_frequencies(cls, frequencies: list[int]) -> list[int]:
+        """
+        Reject a frequency used by more than one timer node
+
+        :param frequencies: Frequency of each timer node
+        :raises ValueError: A frequency is repeated
+        :return: The frequencies
+        """
+        if len(set(frequencies)) != len(frequencies):
+            raise ValueError("Each timer node needs a distinct frequency")
+        return frequencies
+
+
+class HeatResponse(BaseModel):
+    """
+    A generated heat
+    """
+
+    id: int
+    name: str
+    pilots: list[int]
+    seeds: list[int]
+
+
+class HeatGenerateResponse(BaseModel):
+    """
+    The generated heats of a round
+    """
+
+    round_index: int
+    heats: list[HeatResponse]
+
+
+class FrequencyRequest(BaseModel):
+    """
+    Request to find the best frequencies for the pilots of a heat
+    """
+
+    pilot_ids: list[int] = Field(max_length=8)
+    count: int | None = Field(None, ge=1, le=8)
+    bands: list[Literal["A", "B", "E", "F", "R"]] = ["R", "F", "E", "A", "B"]
+    min_spacing: int = Field(30, ge=1)
+
+
+class FrequencyAssignment(BaseModel):
+    """
+    The frequency assigned to a pilot
+    """
+
+    pilot_id: int
+    frequency: int
+
+
+class FrequencyResponse(BaseModel):
+    """
+    The best frequencies for the pilots of a heat
+    """
+
+    frequencies: list[int]
+    assignments: list[FrequencyAssignment]
+    score: float
+    imd: float
+    spacing: int
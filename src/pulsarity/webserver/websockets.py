@@ -18,7 +18,9 @@ from .auth import permission_required
 from ..database.permission import SystemDefaultPerms, UserPermission
 from ..database.raceformat import RaceSchedule
 from ..extensions import current_app, current_user
-from ..events import _ApplicationEvt, SpecialEvt, RaceSequenceEvt
+from ..events import _ApplicationEvt, SpecialEvt, RaceSequenceEvt, RaceResultsEvt
+from ..race import marshal
+from .validation import LapAddRequest, LapAlterRequest
 
 T = TypeVar("T")
 P = ParamSpec("P")
@@ -148,10 +150,21 @@ async def restart_server():
 @ws_event(RaceSequenceEvt.RACE_SCHEDULE)
 async def schedule_race(ws_data: WSEventData):
     """
-    Schedule the start of a race.
+    Schedule the start of a race. The pilots of the heat given by
+    `heat_id` are raced, otherwise the previously selected heat.
 
     :param ws_data: Recieved websocket event data
     """
+    if "heat_id" in ws_data.data:
+        heat_id = ws_data.data["heat_id"]
+        try:
+            await current_app.race_manager.select_heat(
+                None if heat_id is None else int(heat_id)
+            )
+        except (ValueError, TypeError, LookupError):
+            logger.warning("Unable to select heat %s for the race", heat_id)
+            return
+
     schedule = RaceSchedule(
         stage_time_sec=3,
         random_stage_delay=0,
@@ -170,3 +183,46 @@ async def race_stop():
     :param _ws_data: Recieved websocket event data
     """
     current_app.race_manager.stop_race()
+
+
+@ws_event(RaceResultsEvt.LAP_ADD)
+async def add_lap(ws_data: WSEventData):
+    """
+    Add a lap missed by the timer to a saved race
+
+    :param ws_data: Recieved websocket event data
+    """
+    try:
+        data = LapAddRequest.model_validate(ws_data.data)
+        await marshal.add_lap(**data.model_dump())
+    except (ValidationError, KeyError, ValueError):
+        logger.warning("Unable to add lap to race %s", ws_data.data.get("race_uuid"))
+
+
+@ws_event(RaceResultsEvt.LAP_ALTER)
+async def alter_lap(ws_data: WSEventData):
+    """
+    Alter the timing or the pilot of a lap of a saved race
+
+    :param ws_data: Recieved websocket event data
+    """
+    try:
+        lap_id = int(ws_data.data["id"])
+        data = LapAlterRequest.model_validate(ws_data.data)
+        await marshal.alter_lap(lap_id, **data.model_dump())
+    except (ValidationError, KeyError, ValueError, TypeError):
+        logger.warning("Unable to alter lap %s", ws_data.data.get("id"))
+
+
+@ws_event(RaceResultsEvt.LAP_DELETE)
+async def delete_lap(ws_data: WSEventData):
+    """
+    Delete a false lap from a saved race
+
+    :param ws_data: Recieved websocket event data
+    """
+    try:
+        lap_id = int(ws_data.data["id"])
+        await marshal.delete_lap(lap_id)
+    except (KeyError, ValueError, TypeError):
+        logger.warning("Unable to delete lap %s", ws_data.data.get("id"))
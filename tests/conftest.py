@@ -9,7 +9,15 @@ from pulsarity.database import setup_default_objects
 
 from pulsarity.database.raceformat import RaceSchedule
 
-from pulsarity.utils.config import get_configs_defaults
+from pulsarity.utils.config import configs, get_configs_defaults
+
+
+@pytest.fixture(autouse=True)
+def _config_file(tmp_path, monkeypatch):
+    # Keep the config file and the files resolved against it out of the
+    # working directory
+    monkeypatch.setattr(configs, "_config_filename", str(tmp_path / "config.toml"))
+    monkeypatch.setattr(configs, "_configs", None)
 
 
 @pytest.fixture()
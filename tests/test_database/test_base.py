@@ -12,3 +12,11 @@ async def test_pydaantic_model():
 @pytest.mark.asyncio
 async def test_pydaantic_queryset():
     assert issubclass(_PulsarityBase.generate_pydaantic_queryset(), BaseModel)
+
+
+def test_pydaantic_models_cached():
+    model = _PulsarityBase.generate_pydaantic_model()
+    assert _PulsarityBase.generate_pydaantic_model() is model
+
+    queryset = _PulsarityBase.generate_pydaantic_queryset()
+    assert _PulsarityBase.generate_pydaantic_queryset() is queryset
@@ -0,0 +1,128 @@
+import pytest
+import pytest_asyncio
+from tortoise import Tortoise, connections
+from tortoise.exceptions import OperationalError
+
+from pulsarity.database import Pilot, SavedRace, Lap
+from pulsarity.database.eventfiles import EventDatabases
+from pulsarity.utils.config import configs
+
+
+async def init_databases(databases: EventDatabases):
+    await Tortoise.init(
+        {
+            "connections": {
+                "system": {
+                    "engine": "tortoise.backends.sqlite",
+                    "credentials": {"file_path": ":memory:"},
+                },
+                "event": {
+                    "engine": "tortoise.backends.sqlite",
+                    "credentials": {"file_path": str(databases.directory / "first.db")},
+                },
+            },
+            "apps": {
+                "system": {
+                    "models": ["pulsarity.database"],
+                    "default_connection": "system",
+                },
+                "event": {
+                    "models": ["pulsarity.database"],
+                    "default_connection": "event",
+                },
+            },
+        }
+    )
+    await Tortoise.generate_schemas()
+
+
+@pytest_asyncio.fixture(name="event_databases")
+async def _event_databases(tmp_path):
+    databases = EventDatabases(tmp_path / "events")
+    databases.directory.mkdir()
+
+    await init_databases(databases)
+
+    yield databases
+
+    await connections.close_all()
+
+
+@pytest.mark.asyncio
+async def test_switch_event(event_databases: EventDatabases):
+    await Pilot.create(callsign="First")
+    assert event_databases.active == "first"
+
+    with pytest.raises(FileNotFoundError):
+        await event_databases.switch("second")
+
+    with pytest.raises(ValueError):
+        await event_databases.switch("../second", create=True)
+
+    await event_databases.switch("second", create=True)
+    assert event_databases.active == "second"
+    assert event_databases.list_events() == ["first", "second"]
+    assert await Pilot.all().count() == 0
+
+    await Pilot.create(callsign="Second")
+    await event_databases.switch("first")
+    assert await Pilot.all().values_list("callsign", flat=True) == ["First"]
+    await configs.flush()
+
+
+@pytest.mark.asyncio
+async def test_reopen_after_restart(event_databases: EventDatabases):
+    assert await event_databases.reopen() is None
+
+    await event_databases.switch("second", create=True)
+    await Pilot.create(callsign="Second")
+    assert configs.get_config("GENERAL", "ACTIVE_EVENT") == "second"
+
+    # Restart with the configured event database
+    await connections.close_all()
+    await init_databases(event_databases)
+    assert event_databases.active == "first"
+
+    assert await event_databases.reopen() == "second"
+    assert event_databases.active == "second"
+    assert await Pilot.all().values_list("callsign", flat=True) == ["Second"]
+
+    configs.set_config("GENERAL", "ACTIVE_EVENT", "missing")
+    assert await event_databases.reopen() is None
+    assert event_databases.active == "second"
+    await configs.flush()
+
+
+@pytest.mark.asyncio
+async def test_archive_event(event_databases: EventDatabases):
+    with pytest.raises(ValueError):
+        await event_databases.archive("first")
+
+    await event_databases.switch("second", create=True)
+    race = await SavedRace.create(start_time=1.0)
+    await Lap.create(race=race, node_index=0, pilot_id=3, timestamp=2.5, peak_rssi=1.0)
+    await event_databases.switch("first")
+
+    await event_databases.archive("second")
+    assert event_databases.list_events() == ["first"]
+    assert event_databases.list_archives() == ["second"]
+
+    with pytest.raises(FileNotFoundError):
+        await event_databases.archive("second")
+
+    client = await event_databases.attach("second")
+    assert event_databases.attached() == ["second"]
+    assert await SavedRace.all().using_db(client).count() == 1
+    assert await SavedRace.all().count() == 0
+
+    with pytest.raises(OperationalError):
+        await SavedRace.create(start_time=2.0, using_db=client)
+
+    races = await event_databases.read_archive("second")
+    assert [saved["uuid"] for saved in races] == [race.uuid]
+    assert [lap["pilot_id"] for lap in races[0]["laps"]] == [3]
+    assert races[0]["laps"][0]["race_uuid"] == race.uuid
+
+    await event_databases.detach("second")
+    assert not event_databases.attached()
+    await configs.flush()
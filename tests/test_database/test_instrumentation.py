@@ -0,0 +1,51 @@
+import logging
+
+import pytest
+
+from pulsarity.database import Pilot
+from pulsarity.database.instrumentation import BUCKETS_MS, QueryTimer
+
+
+@pytest.mark.asyncio
+async def test_query_timing(_setup_database):
+    timer = QueryTimer()
+    timer.install()
+    try:
+        await Pilot.create(callsign="pilot1")
+        await Pilot.filter(callsign="pilot1").first()
+        await Pilot.filter(callsign="pilot1").update(name="One")
+    finally:
+        timer.uninstall()
+
+    await Pilot.all().count()
+
+    stats = timer.stats
+    assert stats[("Pilot", "INSERT")].count == 1
+    assert stats[("Pilot", "SELECT")].count == 1
+    assert stats[("Pilot", "UPDATE")].count == 1
+
+    select = stats[("Pilot", "SELECT")]
+    assert len(select.buckets) == len(BUCKETS_MS) + 1
+    assert sum(select.buckets) == 1
+    assert select.max_ms == select.total_ms > 0
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(_setup_database, caplog):
+    timer = QueryTimer()
+    timer.slow_threshold_ms = 1e-9
+    timer.install()
+    try:
+        with caplog.at_level(logging.WARNING):
+            await Pilot.all().count()
+    finally:
+        timer.uninstall()
+
+    (slow,) = timer.slow_queries
+    assert slow.model == "Pilot"
+    assert slow.location.startswith("tests/test_database/test_instrumentation.py")
+    assert "test_slow_query_log" in slow.location
+    assert slow.location in caplog.text
+
+    timer.reset()
+    assert not timer.stats and not timer.slow_queries
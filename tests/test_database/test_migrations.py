@@ -0,0 +1,106 @@
+import pickle
+
+import pytest
+from tortoise import connections
+
+from pulsarity.database import RaceFormat, RaceSchedule
+from pulsarity.database import migrations
+from pulsarity.database.migrations import (
+    migrate_race_formats,
+    migrate_pilot_attributes,
+    load_pickled_schedule,
+    outdated_connections,
+    stamp_connections,
+)
+
+
+class _Payload:
+    def __reduce__(self):
+        return (print, ("unsafe",))
+
+
+async def _legacy_table(blobs: list[bytes]) -> None:
+    connection = connections.get("event")
+    await connection.execute_script(
+        'DROP TABLE "format";'
+        'CREATE TABLE "format" ("id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, '
+        '"name" VARCHAR(80) NOT NULL, "_schedule" BLOB NOT NULL);'
+    )
+    for i, blob in enumerate(blobs):
+        await connection.execute_query(
+            'INSERT INTO "format" ("name", "_schedule") VALUES (?, ?)',
+            [f"format {i}", blob],
+        )
+
+
+def test_safe_unpickler(limited_schedule: RaceSchedule):
+    assert load_pickled_schedule(pickle.dumps(limited_schedule)) == limited_schedule
+
+    for data in (pickle.dumps(_Payload()), pickle.dumps({"a": 1}), b"garbage"):
+        with pytest.raises(pickle.UnpicklingError):
+            load_pickled_schedule(data)
+
+
+@pytest.mark.asyncio
+async def test_migrate_race_formats(
+    _setup_database, limited_schedule: RaceSchedule, unlimited_schedule: RaceSchedule
+):
+    await _legacy_table(
+        [
+            pickle.dumps(limited_schedule),
+            pickle.dumps(unlimited_schedule),
+            pickle.dumps(_Payload()),
+        ]
+    )
+
+    assert await migrate_race_formats() == 2
+    assert await migrate_race_formats() == 0
+
+    formats = await RaceFormat.all().order_by("id")
+    assert formats[0].schedule == limited_schedule
+    assert formats[1].schedule == unlimited_schedule
+    assert formats[2].race_time_sec == 0
+
+    assert await RaceFormat.filter(unlimited_time=True).count() == 1
+
+    race_format = RaceFormat("new", limited_schedule)
+    await race_format.save()
+    assert (await RaceFormat.get(id=race_format.id)).schedule == limited_schedule
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache(_setup_database, limited_schedule, unlimited_schedule):
+    race_format = RaceFormat("format", limited_schedule)
+    await race_format.save()
+
+    loaded = await RaceFormat.get(id=race_format.id)
+    assert loaded.schedule is loaded.schedule
+
+    loaded.schedule = unlimited_schedule
+    assert loaded.schedule is unlimited_schedule
+    assert loaded.race_time_sec == unlimited_schedule.race_time_sec
+
+
+@pytest.mark.asyncio
+async def test_migrate_pilot_attributes(_setup_database):
+    connection = connections.get("event")
+    await connection.execute_script(
+        'DROP TABLE "pilot_attr";'
+        'CREATE TABLE "pilot_attr" ("id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, '
+        '"name" VARCHAR(80) NOT NULL, "pilot_id" INT NOT NULL);'
+    )
+
+    assert await migrate_pilot_attributes()
+    assert not await migrate_pilot_attributes()
+
+
+@pytest.mark.asyncio
+async def test_schema_stamp(_setup_database, monkeypatch):
+    outdated = await outdated_connections()
+    assert len(outdated) == len(connections.all())
+
+    await stamp_connections(outdated)
+    assert not await outdated_connections()
+
+    monkeypatch.setattr(migrations, "SCHEMA_REVISION", migrations.SCHEMA_REVISION + 1)
+    assert len(await outdated_connections()) == len(connections.all())
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from tortoise import Tortoise, connections
+
+from pulsarity.database import SavedRace
+from pulsarity.database.tuning import (
+    SQLITE_PROFILES,
+    WalCheckpointer,
+    apply_sqlite_profile,
+)
+
+
+def test_apply_sqlite_profile():
+    config = {
+        "system_db": {
+            "engine": "tortoise.backends.sqlite",
+            "credentials": {"file_path": "system.db", "synchronous": "FULL"},
+        },
+        "other_db": "postgres://localhost/pulsarity",
+    }
+
+    applied = apply_sqlite_profile(config, "performance")
+
+    credentials = applied["system_db"]["credentials"]
+    assert credentials["synchronous"] == "FULL"
+    assert credentials["mmap_size"] == SQLITE_PROFILES["performance"]["mmap_size"]
+    assert applied["other_db"] == config["other_db"]
+    assert "mmap_size" not in config["system_db"]["credentials"]
+
+    with pytest.raises(ValueError):
+        apply_sqlite_profile(config, "unknown")
+
+
+@pytest.mark.asyncio
+async def test_profile_pragmas(tmp_path):
+    config = {
+        "event": {
+            "engine": "tortoise.backends.sqlite",
+            "credentials": {"file_path": str(tmp_path / "event.db")},
+        }
+    }
+    await Tortoise.init(
+        {
+            "connections": apply_sqlite_profile(config, "performance"),
+            "apps": {
+                "event": {
+                    "models": ["pulsarity.database.race"],
+                    "default_connection": "event",
+                }
+            },
+        }
+    )
+
+    try:
+        await Tortoise.generate_schemas()
+        client = connections.get("event")
+
+        _, rows = await client.execute_query("PRAGMA journal_mode")
+        assert rows[0][0] == "wal"
+        _, rows = await client.execute_query("PRAGMA synchronous")
+        assert rows[0][0] == 1
+        _, rows = await client.execute_query("PRAGMA wal_autocheckpoint")
+        assert rows[0][0] == 0
+
+        await SavedRace.create(start_time=0.0)
+        results = await WalCheckpointer.checkpoint()
+        busy, pages, checkpointed = results["event"]
+        assert busy == 0
+        assert pages > 0 and checkpointed == pages
+    finally:
+        await connections.close_all()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_postponed(_setup_database, monkeypatch):
+    checkpoints = []
+
+    async def _checkpoint(mode: str = "PASSIVE"):
+        checkpoints.append(mode)
+        return {}
+
+    checkpointer = WalCheckpointer()
+    checkpointer.interval = 0.01
+    checkpointer.retry_interval = 0.01
+    monkeypatch.setattr(checkpointer, "checkpoint", _checkpoint)
+
+    busy = True
+    checkpointer.start(lambda: busy)
+
+    await asyncio.sleep(0.1)
+    assert not checkpoints
+
+    busy = False
+    await asyncio.sleep(0.1)
+    assert checkpoints
+
+    await checkpointer.stop()
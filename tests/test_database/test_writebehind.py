@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from pulsarity.database import User, Pilot
+from pulsarity.database.writebehind import WriteBehindQueue
+
+
+@pytest.mark.asyncio
+async def test_coalesced_flush(_setup_database):
+    pilots = [
+        await Pilot.create(callsign=f"pilot{i}", name="", phonetic="") for i in range(3)
+    ]
+
+    queue = WriteBehindQueue()
+    for i in range(10):
+        queue.update(Pilot, pilots[0].id, callsign=f"renamed{i}")
+    queue.update(Pilot, pilots[0].id, name="Name")
+    queue.update(Pilot, pilots[1].id, active=False)
+    queue.update(User, 1, reset_required=False)
+    assert len(queue) == 3
+
+    assert await queue.flush() == 3
+    assert len(queue) == 0
+
+    pilot = await Pilot.get(id=pilots[0].id)
+    assert (pilot.callsign, pilot.name) == ("renamed9", "Name")
+    assert not (await Pilot.get(id=pilots[1].id)).active
+    assert (await Pilot.get(id=pilots[2].id)).callsign == "pilot2"
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeued(_setup_database):
+    queue = WriteBehindQueue()
+    queue.update(Pilot, 1, missing_field=1)
+
+    assert await queue.flush() == 0
+    assert len(queue) == 1
+
+
+@pytest.mark.asyncio
+async def test_threshold_and_shutdown(_setup_database):
+    pilots = [
+        await Pilot.create(callsign=f"pilot{i}", name="", phonetic="") for i in range(4)
+    ]
+
+    queue = WriteBehindQueue()
+    queue.interval = 60.0
+    queue.threshold = 3
+    queue.start()
+
+    for pilot in pilots[:3]:
+        queue.update(Pilot, pilot.id, name="flushed")
+    await asyncio.sleep(0.05)
+    assert len(queue) == 0
+    assert await Pilot.filter(name="flushed").count() == 3
+
+    queue.update(Pilot, pilots[3].id, name="shutdown")
+    await queue.stop()
+    assert (await Pilot.get(id=pilots[3].id)).name == "shutdown"
+
+
+@pytest.mark.asyncio
+async def test_deferred_login_time(_setup_database, default_user_creds, monkeypatch):
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+    assert user.last_login is None
+
+    queue = WriteBehindQueue()
+    monkeypatch.setattr("pulsarity.database.user.write_behind", queue)
+
+    user.defer_login_time_update()
+    assert len(queue) == 1
+
+    await queue.flush()
+    assert (await User.get(id=user.id)).last_login is not None
@@ -0,0 +1,87 @@
+import time
+import asyncio
+import random
+
+import numpy as np
+import pytest
+
+from pulsarity.utils.clock import ClockFilter, ClockService
+from pulsarity.utils.time import (
+    epoch_millis_to_monotonic,
+    monotonic_to_epoch_millis,
+    get_server_start_time_seconds,
+)
+
+
+def _feed(clock: ClockFilter, offset: float, drift: float, count: int, start=0.0):
+    rng = random.Random(0)
+    for i in range(count):
+        local = start + i * 10.0
+        remote = local + offset + drift * local + rng.gauss(0.0, 1e-4)
+        clock.update(local, remote)
+
+
+def test_filter_tracks_drift():
+    clock = ClockFilter()
+    _feed(clock, 1000.0, 50e-6, 200)
+
+    estimate = clock.estimate
+    assert estimate.drift == pytest.approx(50e-6, abs=5e-6)
+
+    local = 2500.0
+    assert estimate.to_remote(local) == pytest.approx(
+        local + 1000.0 + 50e-6 * local, abs=1e-3
+    )
+    assert estimate.to_local(estimate.to_remote(local)) == pytest.approx(local)
+
+
+def test_filter_outliers_and_steps():
+    clock = ClockFilter()
+    _feed(clock, 5.0, 0.0, 20)
+    before = clock.estimate
+
+    clock.update(200.0, 200.0 + 5.0 + 0.5)
+    assert clock.estimate == before
+
+    for i in range(clock.step_count):
+        local = 210.0 + i * 10.0
+        clock.update(local, local + 65.0)
+
+    assert clock.estimate.to_remote(240.0) == pytest.approx(305.0)
+
+
+def test_vectorized_conversions():
+    service = ClockService()
+    service.update_node(1, 100.0, 5.0)
+    service.update_node(1, 110.001, 15.0)
+
+    monotonic = np.linspace(5.0, 25.0, 5)
+    node_times = service.monotonic_to_node(1, monotonic)
+    assert isinstance(node_times, np.ndarray)
+    np.testing.assert_allclose(service.node_to_monotonic(1, node_times), monotonic)
+
+    with pytest.raises(KeyError):
+        service.node_to_monotonic(2, 1.0)
+
+    now = time.monotonic()
+    millis = monotonic_to_epoch_millis(np.array([now, now + 1.0]))
+    assert millis[1] - millis[0] == pytest.approx(1000.0, abs=1e-3)
+    assert millis[0] == pytest.approx(time.time() * 1000, abs=50)
+    assert epoch_millis_to_monotonic(millis[0]) == pytest.approx(now)
+
+    assert get_server_start_time_seconds() <= time.time()
+
+
+@pytest.mark.asyncio
+async def test_service_sampling():
+    service = ClockService()
+    service.interval = 0.01
+
+    service.start()
+    await asyncio.sleep(0.1)
+    await service.stop()
+
+    assert service.realtime.samples > 2
+    assert service.monotonic_to_epoch(time.monotonic()) == pytest.approx(
+        time.time(), abs=0.05
+    )
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from pulsarity.utils.config import ConfigManager, configs
+
+
+def test_resolve_path(tmp_path):
+    manager = ConfigManager(str(tmp_path / "config.toml"))
+
+    assert manager.resolve_path("race.checkpoint") == tmp_path / "race.checkpoint"
+    assert manager.resolve_path("data/race.checkpoint") == (
+        tmp_path / "data" / "race.checkpoint"
+    )
+
+    absolute = Path(tmp_path / "other" / "race.checkpoint")
+    assert manager.resolve_path(str(absolute)) == absolute
+
+
+def test_tests_config_file(tmp_path):
+    assert configs.directory == tmp_path
+    assert configs.get_config("GENERAL", "RACE_CHECKPOINT_FILE") == "race.checkpoint"
+    assert (tmp_path / "config.toml").is_file()
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 from pulsarity.extensions import PulsarityApp
@@ -56,3 +58,22 @@ async def test_multi_event_handling(app: PulsarityApp):
     async with app.test_app():
         app.add_background_task(broker_subscriber, broker, test_order)
         broker_publisher(broker, event_values)
+
+
+@pytest.mark.asyncio
+async def test_same_priority_order():
+    broker = EventBroker()
+    subscription = broker.subscribe()
+    first = asyncio.create_task(anext(subscription))
+    await asyncio.sleep(0)
+
+    values = [{"version": version} for version in range(20)]
+    for value in values:
+        broker.publish(RaceSequenceEvt.LEADERBOARD_UPDATE, value)
+
+    received = [(await first)[4]]
+    while len(received) < len(values):
+        received.append((await anext(subscription))[4])
+
+    await subscription.aclose()
+    assert received == values
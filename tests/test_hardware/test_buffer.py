@@ -0,0 +1,66 @@
+import sys
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from pulsarity.hardware import SharedRssiBuffer
+from pulsarity.hardware.buffer import read_span, span_valid
+
+
+@pytest.fixture()
+def buffer():
+    buffer = SharedRssiBuffer(100)
+    yield buffer
+    buffer.close()
+
+
+def _span_sum(span) -> float:
+    return float(read_span(span).sum())
+
+
+def test_buffer_wrap(buffer: SharedRssiBuffer):
+    first = buffer.write(np.arange(60, dtype=np.float32))
+    second = buffer.write(np.arange(60, dtype=np.float32) + 100)
+
+    assert second.position == 100
+    assert read_span(second)[0] == 100
+    assert not span_valid(first)
+
+    with pytest.raises(ValueError):
+        read_span(first)
+
+
+@pytest.mark.asyncio
+async def test_buffer_worker_read(buffer: SharedRssiBuffer):
+    samples = np.linspace(0, 1, 50, dtype=np.float32)
+    span = buffer.write(samples)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(1) as pool:
+        total = await loop.run_in_executor(pool, _span_sum, span)
+
+    assert total == pytest.approx(float(samples.sum()))
+
+
+def _mapped(name: str) -> bool:
+    with open("/proc/self/maps", encoding="utf-8") as maps:
+        return name in maps.read()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Reads the mappings from /proc")
+@pytest.mark.asyncio
+async def test_buffer_worker_release():
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(1) as pool:
+        # Start the worker before the buffer exists so it is not inherited
+        await loop.run_in_executor(pool, _mapped, "")
+
+        buffer = SharedRssiBuffer(100)
+        span = buffer.write(np.ones(50, dtype=np.float32))
+        try:
+            assert await loop.run_in_executor(pool, _span_sum, span) == 50
+            assert not await loop.run_in_executor(pool, _mapped, span.name)
+        finally:
+            buffer.close()
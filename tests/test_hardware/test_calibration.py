@@ -0,0 +1,85 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from pulsarity.hardware import CalibrationTrace, SimulatedNode, calibrate
+from pulsarity.hardware.calibration import calibrate_traces
+from pulsarity.hardware.detection import DetectorState, detect_block
+from pulsarity.utils.executor import executor
+
+
+async def _record(node: SimulatedNode, pilot_id: int, duration: float):
+    await node.connect()
+    start = asyncio.get_running_loop().time()
+
+    times = start + np.arange(int(duration * node.sample_rate)) / node.sample_rate
+    rng = np.random.default_rng(node.index)
+    samples = np.array([node.signal_at(time) for time in times])
+    samples += rng.normal(0, node.noise, len(samples))
+
+    # Passes too close to the ends of the recording are not complete
+    margin = 4 * node.pass_width
+    crossings = sum(start + margin < time < times[-1] - margin for time in node.passes)
+
+    return CalibrationTrace(node.index, pilot_id, samples, crossings)
+
+
+@pytest.mark.asyncio
+async def test_calibration():
+    traces = []
+    for index, peak in enumerate((130.0, 150.0)):
+        node = SimulatedNode(
+            index, lap_time=4.0, lap_variation=0.5, peak_rssi=peak, seed=index
+        )
+        traces.append(await _record(node, 7, 30.0))
+
+    executor.set_executor()
+    try:
+        result = await calibrate(traces)
+    finally:
+        await executor.shutdown_executor()
+
+    assert set(result.nodes) == {0, 1}
+    assert set(result.pilots) == {7}
+    assert result.pilots[7].error == 0
+
+    for trace in traces:
+        proposal = result.nodes[trace.node_index]
+        assert proposal.error == 0
+        assert proposal.noise_floor == pytest.approx(40.0, abs=2.0)
+
+        found, _ = detect_block(
+            trace.samples, 0.0, 1000.0, proposal.settings, DetectorState()
+        )
+        assert len(found) == trace.crossings
+
+
+def test_calibration_no_signal():
+    flat = CalibrationTrace(0, 7, np.full(2000, 40.0), 3)
+    empty = CalibrationTrace(1, 7, np.empty(0), 3)
+
+    assert calibrate_traces([flat]) is None
+    assert calibrate_traces([empty]) is None
+    assert calibrate_traces([]) is None
+
+
+@pytest.mark.asyncio
+async def test_calibration_unusable_node():
+    node = SimulatedNode(0, lap_time=4.0, lap_variation=0.5, seed=0)
+    traces = [
+        await _record(node, 7, 30.0),
+        CalibrationTrace(1, 8, np.full(30000, 40.0), 5),
+        CalibrationTrace(2, 9, np.empty(0), 5),
+    ]
+
+    executor.set_executor()
+    try:
+        result = await calibrate(traces)
+    finally:
+        await executor.shutdown_executor()
+
+    assert result.nodes[0] is not None and result.nodes[0].error == 0
+    assert result.nodes[1] is None and result.nodes[2] is None
+    assert result.pilots[7] is not None
+    assert result.pilots[8] is None and result.pilots[9] is None
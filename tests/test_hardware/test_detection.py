@@ -0,0 +1,129 @@
+import asyncio
+from array import array
+
+import numpy as np
+import pytest
+
+from pulsarity.hardware import (
+    CrossingDetector,
+    DetectorSettings,
+    RssiBlock,
+    SimulatedNode,
+)
+from pulsarity.hardware.detection import DetectorState, detect_block
+from pulsarity.utils.executor import executor
+
+
+@pytest.fixture()
+def quiet_node():
+    yield SimulatedNode(0, lap_time=2.0, lap_variation=0.1, pass_width=0.05, seed=3)
+
+
+def _blocks(node: SimulatedNode, start: float, count: int, size: int):
+    for block in range(count):
+        block_start = start + block * size / node.sample_rate
+        samples = array(
+            "f",
+            (node.signal_at(block_start + i / node.sample_rate) for i in range(size)),
+        )
+        yield RssiBlock(node.index, block_start, node.sample_rate, samples)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [7, 50, 1000])
+async def test_detected_crossings(quiet_node: SimulatedNode, size: int):
+    await quiet_node.connect()
+    quiet_node.pilot_id = 4
+    start = asyncio.get_running_loop().time()
+
+    detector = CrossingDetector(quiet_node, DetectorSettings(120.0, 80.0, 5))
+
+    crossings = []
+    for block in _blocks(quiet_node, start, 8000 // size, size):
+        crossings.extend(await detector.process(block))
+
+    await quiet_node.disconnect()
+
+    expected = [time for time in quiet_node.passes if time < start + 7.5]
+    assert len(crossings) == len(expected)
+
+    for crossing, pass_time in zip(crossings, expected):
+        assert crossing.node_index == 0
+        assert crossing.pilot_id == 4
+        assert crossing.timestamp == pytest.approx(pass_time, abs=0.002)
+        assert crossing.peak_rssi == pytest.approx(quiet_node.peak_rssi, abs=1.0)
+
+
+@pytest.mark.asyncio
+async def test_pooled_detection(quiet_node: SimulatedNode):
+    await quiet_node.connect()
+    start = asyncio.get_running_loop().time()
+
+    detector = CrossingDetector(quiet_node, DetectorSettings(120.0, 80.0, 5))
+    detector.inline_block_size = 0
+
+    executor.set_executor()
+    try:
+        crossings = []
+        for block in _blocks(quiet_node, start, 8, 1000):
+            crossings.extend(await detector.process(block))
+    finally:
+        detector.close()
+        await executor.shutdown_executor()
+
+    await quiet_node.disconnect()
+
+    expected = [time for time in quiet_node.passes if time < start + 7.5]
+    assert [crossing.timestamp for crossing in crossings] == pytest.approx(
+        expected, abs=0.002
+    )
+
+
+def _detect_all(samples, size: int, settings: DetectorSettings):
+    state = DetectorState()
+    found = []
+    for offset in range(0, len(samples), size):
+        results, state = detect_block(
+            samples[offset : offset + size], offset / 1000.0, 1000.0, settings, state
+        )
+        found.extend(results)
+        assert state.pending.size <= 2
+
+    return found
+
+
+def test_block_sizes_agree():
+    rng = np.random.default_rng(5)
+    times = np.arange(20000) / 1000.0
+    samples = 40.0 + 100.0 * np.exp(-0.5 * ((times % 2.0 - 1.0) / 0.1) ** 2)
+    samples += rng.normal(0, 3.0, len(samples))
+    settings = DetectorSettings(110.0, 90.0, 8)
+
+    expected = _detect_all(samples, len(samples), settings)
+    assert len(expected) == 10
+
+    for size in (1, 7, 50, 129, 1000):
+        found = _detect_all(samples, size, settings)
+        assert len(found) == len(expected)
+        assert np.allclose(found, expected)
+
+
+def test_long_crossing():
+    samples = np.concatenate(
+        (np.full(100, 40.0), np.full(5000, 150.0), [170.0], np.full(5000, 150.0))
+    )
+    samples = np.concatenate((samples, np.full(100, 40.0)))
+    settings = DetectorSettings(120.0, 80.0)
+
+    for size in (50, 1000):
+        found = _detect_all(samples, size, settings)
+        assert len(found) == 1
+        assert found[0] == pytest.approx((5.1, 170.0))
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        DetectorSettings(80.0, 80.0)
+
+    with pytest.raises(ValueError):
+        DetectorSettings(enter_at=80.0, exit_at=120.0)
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from pulsarity.database import Pilot, Heat, HeatSlot
+from pulsarity.database.raceformat import RaceSchedule
+from pulsarity.extensions import PulsarityApp
+from pulsarity.hardware import SimulatedNode, TimerInterface
+from pulsarity.race.enums import RaceStatus
+
+
+@pytest.fixture()
+def fast_node():
+    yield SimulatedNode(
+        0,
+        sample_rate=500.0,
+        block_size=25,
+        lap_time=0.4,
+        lap_variation=0.05,
+        pass_width=0.02,
+        seed=1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_simulated_rssi(fast_node: SimulatedNode):
+    await fast_node.connect()
+
+    blocks = []
+    async for block in fast_node.rssi_samples():
+        blocks.append(block)
+        if len(blocks) == 4:
+            break
+
+    await fast_node.disconnect()
+
+    assert all(len(block.samples) == fast_node.block_size for block in blocks)
+    assert blocks[1].start_time == pytest.approx(blocks[0].sample_time(25))
+
+
+@pytest.mark.asyncio
+async def test_simulated_passes_trimmed(fast_node: SimulatedNode):
+    await fast_node.connect()
+    fast_node.retained_passes = 4
+    start = asyncio.get_running_loop().time()
+
+    for step in range(2000):
+        fast_node.signal_at(start + step * 0.01)
+
+    await fast_node.disconnect()
+
+    assert len(fast_node.passes) <= 6
+    assert fast_node.passes[-1] >= start + 19.9
+
+
+@pytest.mark.asyncio
+async def test_simulated_crossings(fast_node: SimulatedNode):
+    await fast_node.connect()
+
+    crossings = []
+    async with asyncio.timeout(3):
+        async for crossing in fast_node.crossings():
+            crossings.append(crossing)
+            if len(crossings) == 3:
+                break
+
+    await fast_node.disconnect()
+
+    assert [crossing.timestamp for crossing in crossings] == fast_node.passes[:3]
+    for crossing in crossings:
+        assert crossing.peak_rssi > fast_node.noise_floor + 60
+
+
+@pytest.mark.asyncio
+async def test_interface_recording(
+    app: PulsarityApp, fast_node: SimulatedNode, _setup_database
+):
+    interface = TimerInterface()
+    interface.add_node(fast_node)
+
+    blocks = []
+    interface.add_rssi_listener(blocks.append)
+
+    async with app.test_app(), app.app_context():
+        recorder = app.race_manager.lap_recorder
+        recorder.begin(asyncio.get_running_loop().time())
+
+        await interface.start()
+        await asyncio.sleep(1.5)
+        await interface.stop()
+
+        recorder.end()
+
+    assert len(recorder) >= 2
+    assert blocks
+
+
+@pytest.mark.asyncio
+async def test_heat_race_leaderboard(
+    app: PulsarityApp, fast_node: SimulatedNode, _setup_database
+):
+    pilot = await Pilot.create(callsign="Simulated")
+    heat = await Heat.create(name="Heat 1")
+    await HeatSlot.create(heat=heat, node_index=0, pilot=pilot)
+
+    schedule = RaceSchedule(
+        stage_time_sec=0,
+        random_stage_delay=0,
+        unlimited_time=True,
+        race_time_sec=0,
+        overtime_sec=0,
+    )
+
+    async with app.test_app(), app.app_context():
+        manager = app.race_manager
+        await manager.select_heat(heat.id)
+
+        app.timer_interface.add_node(fast_node)
+        await app.timer_interface.start()
+
+        start = asyncio.get_running_loop().time() + 0.05
+        manager.schedule_race(schedule, assigned_start=start)
+        await asyncio.sleep(1.5)
+
+        assert manager.status == RaceStatus.RACING
+        assert fast_node.pilot_id == pilot.id
+
+        manager.stop_race()
+        await app.timer_interface.stop()
+
+    standing = manager.leaderboard.standing(pilot.id)
+    assert standing is not None
+    assert standing.laps >= 2
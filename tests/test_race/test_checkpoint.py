@@ -0,0 +1,203 @@
+import time
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from pulsarity.events import RaceSequenceEvt
+from pulsarity.extensions import PulsarityApp
+from pulsarity.race.enums import RaceStatus
+from pulsarity.race.checkpoint import RaceCheckpoint, CheckpointState
+from pulsarity.database import RaceSchedule, Pilot, SavedRace, Lap
+from pulsarity.race.laps import CrossingRecord
+from pulsarity.utils.time import monotonic_to_epoch_millis
+
+
+def test_checkpoint_roundtrip(tmp_path, limited_schedule: RaceSchedule):
+    checkpoint = RaceCheckpoint(str(tmp_path / "race.checkpoint"))
+    checkpoint.open()
+
+    assert checkpoint.read() is None
+
+    state = CheckpointState(RaceStatus.RACING, limited_schedule, 1000.0, 4000.0)
+    checkpoint.write(state)
+    checkpoint.close()
+
+    checkpoint.open()
+    assert checkpoint.read() == state
+    checkpoint.close()
+
+
+@pytest.mark.asyncio
+async def test_restore_racing(
+    app: PulsarityApp, tmp_path, limited_schedule: RaceSchedule
+):
+    checkpoint = RaceCheckpoint(str(tmp_path / "race.checkpoint"))
+    checkpoint.open()
+
+    start = time.monotonic() - 1
+    state = CheckpointState(
+        RaceStatus.RACING,
+        limited_schedule,
+        monotonic_to_epoch_millis(start - limited_schedule.stage_time_sec),
+        monotonic_to_epoch_millis(start),
+    )
+    checkpoint.write(state)
+
+    async with app.app_context():
+        await app.race_manager.restore_checkpoint(checkpoint)
+
+    assert app.race_manager.status == RaceStatus.RACING
+    assert app.race_manager._program_handles
+
+    await asyncio.sleep(limited_schedule.race_time_sec - 1 + 0.1)
+
+    assert app.race_manager.status == RaceStatus.OVERTIME
+    assert checkpoint.read().status == RaceStatus.OVERTIME
+
+    async with app.app_context():
+        app.race_manager.stop_race()
+
+    app.race_manager.close_checkpoint()
+
+
+@pytest.mark.asyncio
+async def test_restore_finished(
+    app: PulsarityApp, tmp_path, limited_schedule: RaceSchedule
+):
+    checkpoint = RaceCheckpoint(str(tmp_path / "race.checkpoint"))
+    checkpoint.open()
+
+    start = time.monotonic() - 60
+    state = CheckpointState(
+        RaceStatus.RACING,
+        limited_schedule,
+        monotonic_to_epoch_millis(start - limited_schedule.stage_time_sec),
+        monotonic_to_epoch_millis(start),
+    )
+    checkpoint.write(state)
+
+    async with app.app_context():
+        await app.race_manager.restore_checkpoint(checkpoint)
+
+    assert app.race_manager.status == RaceStatus.STOPPED
+    assert not app.race_manager._program_handles
+
+    app.race_manager.close_checkpoint()
+
+
+@pytest.mark.asyncio
+async def test_restore_saved_laps(
+    app: PulsarityApp, _setup_database, tmp_path, limited_schedule: RaceSchedule
+):
+    pilot = await Pilot.create(callsign="pilot")
+    start = time.monotonic() - 2
+    race = await SavedRace.create(
+        uuid=uuid4(), start_time=monotonic_to_epoch_millis(start)
+    )
+    for timestamp in (0.5, 1.5):
+        await Lap.create(
+            race=race,
+            node_index=0,
+            pilot_id=pilot.id,
+            timestamp=timestamp,
+            peak_rssi=100,
+        )
+
+    checkpoint = RaceCheckpoint(str(tmp_path / "race.checkpoint"))
+    checkpoint.open()
+    state = CheckpointState(
+        RaceStatus.RACING,
+        limited_schedule,
+        monotonic_to_epoch_millis(start - limited_schedule.stage_time_sec),
+        monotonic_to_epoch_millis(start),
+        race.uuid,
+    )
+    checkpoint.write(state)
+
+    manager = app.race_manager
+    async with app.test_app(), app.app_context():
+        await manager.restore_checkpoint(checkpoint)
+
+        assert manager.status == RaceStatus.RACING
+        assert manager.lap_recorder.race_uuid == race.uuid
+        assert len(manager.lap_recorder) == 2
+        assert manager.leaderboard.standing(pilot.id).laps == 1
+
+        crossing = CrossingRecord(0, pilot.id, start + 2.5, 100.0)
+        assert manager.lap_recorder.record(crossing)
+        assert manager.lap_recorder._laps.lap_number[-1] == 2
+
+        manager.stop_race()
+        await asyncio.gather(*app.background_tasks)
+
+    assert await Lap.filter(race=race).count() == 3
+    manager.close_checkpoint()
+
+
+@pytest.mark.asyncio
+async def test_restore_stopped_while_down(
+    app: PulsarityApp, _setup_database, tmp_path, limited_schedule: RaceSchedule
+):
+    start = time.monotonic() - 60
+    race = await SavedRace.create(
+        uuid=uuid4(), start_time=monotonic_to_epoch_millis(start)
+    )
+
+    checkpoint = RaceCheckpoint(str(tmp_path / "race.checkpoint"))
+    checkpoint.open()
+    state = CheckpointState(
+        RaceStatus.OVERTIME,
+        limited_schedule,
+        monotonic_to_epoch_millis(start - limited_schedule.stage_time_sec),
+        monotonic_to_epoch_millis(start),
+        race.uuid,
+    )
+    checkpoint.write(state)
+
+    stopped = []
+
+    async def _race_stop(**data):
+        stopped.append(data)
+
+    app.event_broker.register_event_callback(RaceSequenceEvt.RACE_STOP, _race_stop)
+
+    async with app.test_app(), app.app_context():
+        await app.race_manager.restore_checkpoint(checkpoint)
+        await asyncio.gather(*app.background_tasks)
+
+    assert app.race_manager.status == RaceStatus.STOPPED
+    assert checkpoint.read().status == RaceStatus.STOPPED
+    assert stopped
+    app.race_manager.close_checkpoint()
+
+
+@pytest.mark.asyncio
+async def test_restore_missing_heat(
+    app: PulsarityApp, _setup_database, tmp_path, limited_schedule: RaceSchedule
+):
+    checkpoint = RaceCheckpoint(str(tmp_path / "race.checkpoint"))
+    checkpoint.open()
+
+    start = time.monotonic() - 1
+    state = CheckpointState(
+        RaceStatus.RACING,
+        limited_schedule,
+        monotonic_to_epoch_millis(start - limited_schedule.stage_time_sec),
+        monotonic_to_epoch_millis(start),
+        heat_id=999,
+    )
+    checkpoint.write(state)
+
+    manager = app.race_manager
+    async with app.test_app(), app.app_context():
+        await manager.restore_checkpoint(checkpoint)
+
+        assert manager.status == RaceStatus.RACING
+        assert manager.heat_id is None
+        assert checkpoint.read().heat_id is None
+
+        manager.stop_race()
+        await asyncio.gather(*app.background_tasks)
+
+    manager.close_checkpoint()
@@ -0,0 +1,64 @@
+import json
+from uuid import uuid4
+
+import pytest
+
+from pulsarity.database import SavedRace, Lap
+from pulsarity.race.data import RaceData, PILOT_ID_NONE
+
+ROWS = [
+    (0, 1, 1.0, 120.0),
+    (1, 2, 1.5, 110.0),
+    (0, 1, 11.0, 125.0),
+    (2, PILOT_ID_NONE, 12.0, 90.0),
+    (1, 2, 13.5, 115.0),
+    (0, 1, 21.0, 130.0),
+    (3, PILOT_ID_NONE, 22.0, 95.0),
+    (2, PILOT_ID_NONE, 22.5, 92.0),
+]
+
+
+def test_race_data_columns():
+    data = RaceData(uuid4())
+    data.extend(ROWS)
+
+    assert len(data) == len(ROWS)
+    assert data.lap_number.tolist() == [0, 0, 1, 0, 1, 2, 0, 1]
+    assert data.nbytes == 24 * len(ROWS)
+    assert list(data.rows(1, 3)) == [row for row in ROWS[1:3]]
+
+    crossing = data.crossing(5)
+    assert crossing["pilot_id"] == 1
+    assert crossing["lap_number"] == 2
+
+
+def test_race_data_json():
+    data = RaceData(uuid4())
+    data.extend(ROWS)
+
+    loaded = RaceData.from_json(json.loads(json.dumps(data.to_json())))
+
+    assert loaded.uuid == data.uuid
+    assert list(loaded.rows()) == list(data.rows())
+    assert loaded.lap_number == data.lap_number
+    assert loaded.append(0, 1, 31.0, 120.0) == 3
+    assert loaded.append(3, PILOT_ID_NONE, 32.0, 90.0) == 1
+
+    broken = data.to_json()
+    broken["timestamp"].pop()
+    with pytest.raises(ValueError):
+        RaceData.from_json(broken)
+
+
+@pytest.mark.asyncio
+async def test_race_data_db(_setup_database):
+    race = await SavedRace.create(start_time=0.0)
+    data = RaceData(race.uuid)
+    data.extend(ROWS)
+
+    await Lap.bulk_create(data.to_laps(race))
+    assert await Lap.filter(race=race, pilot_id__isnull=True).count() == 3
+
+    loaded = await RaceData.from_db(race)
+    assert list(loaded.rows()) == list(data.rows())
+    assert loaded.lap_number == data.lap_number
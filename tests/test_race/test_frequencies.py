@@ -0,0 +1,73 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from pulsarity.race.frequencies import (
+    MAX_FREQUENCIES,
+    FrequencySettings,
+    band_frequencies,
+    candidate_sets,
+    optimize_frequencies,
+    preference_weights,
+    score_sets,
+)
+
+
+@pytest.mark.parametrize("count", [1, 3, 5])
+@pytest.mark.parametrize("spacing", [20, 40])
+def test_candidate_sets(count: int, spacing: int):
+    frequencies = band_frequencies(("R", "F"))
+
+    sets = candidate_sets(frequencies, count, spacing, 10**6)
+
+    expected = [
+        combo
+        for combo in combinations(range(len(frequencies)), count)
+        if all(np.diff(frequencies[list(combo)]) >= spacing)
+    ]
+    assert sorted(map(tuple, sets.tolist())) == expected
+
+
+def test_candidate_limit():
+    frequencies = band_frequencies(("R", "F", "E", "A", "B"))
+
+    with pytest.raises(ValueError):
+        candidate_sets(frequencies, 6, 10, 1000)
+
+
+def test_score_imd():
+    frequencies = np.array([5740, 5760, 5780, 5658, 5843, 5917], np.int32)
+    sets = np.array([[0, 1, 2], [3, 4, 5]])
+    weights = np.zeros((0, len(frequencies)))
+
+    _, imd, spacing = score_sets(sets, frequencies, weights, FrequencySettings())
+
+    assert imd[0] > imd[1]
+    assert spacing.tolist() == [20, 74]
+
+
+def test_optimize_preferences():
+    histories = [[5740, 5658], [5658], [5695, 5917], []]
+
+    plan = optimize_frequencies(4, histories)[0]
+
+    assert len(set(plan.frequencies)) == 4
+    assert plan.spacing >= FrequencySettings().min_spacing
+    assert plan.assignment[:3] == (5740, 5658, 5917)
+    assert plan.assignment[3] in plan.frequencies
+
+    weights = preference_weights(histories, band_frequencies(("R",)), 0.5)
+    assert weights[0].max() == 0.5
+    assert weights[3].max() == 0.0
+
+
+def test_optimize_too_many_pilots():
+    with pytest.raises(ValueError):
+        optimize_frequencies(2, [[], [], []])
+
+    with pytest.raises(ValueError):
+        optimize_frequencies(MAX_FREQUENCIES + 1)
+
+    with pytest.raises(ValueError):
+        optimize_frequencies(2, settings=FrequencySettings(min_spacing=0))
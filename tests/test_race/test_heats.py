@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+from pulsarity.extensions import PulsarityApp
+from pulsarity.database import Pilot, Heat, HeatSlot
+from pulsarity.race.enums import SeedingMethod
+from pulsarity.race.heats import HeatGenerator, HeatSettings, seed_heats
+from pulsarity.utils.executor import executor
+
+FREQUENCIES = (5658, 5695, 5732, 5769)
+
+
+def _conflicts(plans, ranking, preferences):
+    preferred = dict(zip(ranking, preferences))
+    total = 0
+    for plan in plans:
+        for node, pilot_id in enumerate(plan.pilots):
+            if pilot_id and preferred[pilot_id] not in (0, FREQUENCIES[node]):
+                total += 1
+    return total
+
+
+def test_seed_ladder():
+    ranking = list(range(101, 111))
+    plans = seed_heats(ranking, [0] * 10, HeatSettings(FREQUENCIES))
+
+    assert [sum(1 for id_ in plan.pilots if id_) for plan in plans] == [4, 3, 3]
+    assert sorted(seed for seed in plans[0].seeds if seed) == [1, 2, 3, 4]
+    assert sorted(seed for seed in plans[2].seeds if seed) == [8, 9, 10]
+
+
+def test_seed_balanced():
+    ranking = list(range(1, 13))
+    settings = HeatSettings(FREQUENCIES, SeedingMethod.BALANCED)
+    plans = seed_heats(ranking, [0] * 12, settings)
+
+    seeds = [sorted(seed for seed in plan.seeds if seed) for plan in plans]
+    assert seeds == [[1, 6, 7, 12], [2, 5, 8, 11], [3, 4, 9, 10]]
+
+
+def test_seed_duplicate_frequencies():
+    settings = HeatSettings((5658, 5695, 5658, 5769))
+
+    with pytest.raises(ValueError):
+        seed_heats(list(range(1, 9)), [5658] * 8, settings)
+
+
+@pytest.mark.parametrize("method", [SeedingMethod.LADDER, SeedingMethod.BALANCED])
+def test_seed_frequency_conflicts(method: SeedingMethod):
+    count = 64
+    ranking = list(range(1, count + 1))
+    preferences = [FREQUENCIES[(i // 2) % 4] for i in range(count)]
+    settings = HeatSettings(FREQUENCIES, method)
+
+    plans = seed_heats(ranking, preferences, settings)
+
+    placed = sorted(id_ for plan in plans for id_ in plan.pilots if id_)
+    assert placed == ranking
+    assert _conflicts(plans, ranking, preferences) < count // 8
+
+    for plan in plans:
+        for pilot_id, seed in zip(plan.pilots, plan.seeds):
+            if pilot_id:
+                assert ranking[seed - 1] == pilot_id
+
+
+@pytest.mark.asyncio
+async def test_generate_cached():
+    executor.set_executor()
+
+    try:
+        generator = HeatGenerator()
+        ranking = list(range(1, 41))
+        settings = HeatSettings(FREQUENCIES)
+
+        first = await generator.generate(ranking, [0] * 40, settings)
+        second = await generator.generate(ranking, [0] * 40, settings)
+        assert first is second
+
+        other = await generator.generate(ranking[::-1], [0] * 40, settings)
+        assert other is not first
+    finally:
+        await executor.shutdown_executor()
+
+
+@pytest.mark.asyncio
+async def test_create_round(app: PulsarityApp, _setup_database):
+    for i in range(6):
+        pilot = Pilot(callsign=f"pilot{i}")
+        pilot.used_frequencies = json.dumps([{"b": "R", "c": 1, "f": 5658}])
+        await pilot.save()
+
+    executor.set_executor()
+
+    try:
+        async with app.app_context():
+            data = await app.race_manager.heat_generator.create_round(
+                HeatSettings(FREQUENCIES), 0
+            )
+    finally:
+        await executor.shutdown_executor()
+
+    assert len(data["heats"]) == 2
+    assert await Heat.filter(round_index=0).count() == 2
+    assert await HeatSlot.filter(pilot_id__isnull=False).count() == 6
+
+    for heat in data["heats"]:
+        assert heat["pilots"][0] != 0
+
+
+@pytest.mark.asyncio
+async def test_create_round_ranking(app: PulsarityApp, _setup_database):
+    pilots = [await Pilot.create(callsign=f"pilot{i}") for i in range(4)]
+    ids = [pilot.id for pilot in pilots]
+
+    executor.set_executor()
+
+    try:
+        async with app.app_context():
+            generator = app.race_manager.heat_generator
+            with pytest.raises(ValueError):
+                await generator.create_round(HeatSettings(FREQUENCIES), 0, [*ids, 999])
+
+            data = await generator.create_round(
+                HeatSettings(FREQUENCIES), 0, [*ids, ids[0]]
+            )
+    finally:
+        await executor.shutdown_executor()
+
+    seeded = [id_ for heat in data["heats"] for id_ in heat["pilots"] if id_]
+    assert sorted(seeded) == sorted(ids)
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from tortoise.exceptions import OperationalError
+
+from pulsarity.extensions import PulsarityApp
+from pulsarity.database import SavedRace, Lap
+from pulsarity.race.laps import LapRecorder, CrossingRecord
+
+
+@pytest.mark.asyncio
+async def test_record_not_accepting(app: PulsarityApp):
+    recorder = LapRecorder()
+
+    async with app.app_context():
+        assert not recorder.accepting
+        assert not recorder.record(CrossingRecord(0, 1, 1.0, 100.0))
+
+    assert len(recorder) == 0
+
+
+@pytest.mark.asyncio
+async def test_record_persist(app: PulsarityApp, _setup_database):
+    recorder = LapRecorder()
+    loop = asyncio.get_running_loop()
+    count = 600
+
+    async with app.test_app(), app.app_context():
+        start = loop.time()
+        race_uuid = recorder.begin(start)
+
+        for i in range(count):
+            crossing = CrossingRecord(i % 8, i % 8 + 1, start + i * 0.01, 150.0)
+            assert recorder.record(crossing)
+
+        recorder.end()
+        assert not recorder.record(CrossingRecord(0, 1, start + count, 150.0))
+
+        await asyncio.gather(*app.background_tasks)
+
+    race = await SavedRace.get(uuid=race_uuid)
+    assert await Lap.filter(race=race).count() == count
+
+    lap = await Lap.filter(race=race).order_by("timestamp").first()
+    assert lap is not None
+    assert lap.pilot_id == 1
+    assert lap.timestamp == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_persist_retry(app: PulsarityApp, _setup_database, monkeypatch):
+    recorder = LapRecorder()
+    recorder.flush_interval = 0.01
+    loop = asyncio.get_running_loop()
+    bulk_create = Lap.bulk_create
+    failures = []
+
+    async def _failing_bulk_create(*args, **kwargs):
+        if not failures:
+            failures.append(True)
+            raise OperationalError("database is locked")
+        return await bulk_create(*args, **kwargs)
+
+    monkeypatch.setattr(Lap, "bulk_create", _failing_bulk_create)
+
+    async with app.test_app(), app.app_context():
+        start = loop.time()
+        race_uuid = recorder.begin(start)
+
+        for i in range(10):
+            assert recorder.record(CrossingRecord(0, 1, start + i, 150.0))
+
+        recorder.end()
+        await asyncio.gather(*app.background_tasks)
+
+    assert failures
+    race = await SavedRace.get(uuid=race_uuid)
+    assert await Lap.filter(race=race).count() == 10
+
+
+@pytest.mark.asyncio
+async def test_wait_written(app: PulsarityApp, _setup_database):
+    recorder = LapRecorder()
+    recorder.flush_interval = 10.0
+    loop = asyncio.get_running_loop()
+
+    async with app.test_app(), app.app_context():
+        await recorder.wait_written()
+
+        start = loop.time()
+        race_uuid = recorder.begin(start)
+        for i in range(5):
+            assert recorder.record(CrossingRecord(0, 1, start + i, 150.0))
+        recorder.end()
+
+        await asyncio.wait_for(recorder.wait_written(), 5)
+        assert await Lap.filter(race__uuid=race_uuid).count() == 5
@@ -0,0 +1,134 @@
+import asyncio
+import random
+
+import pytest
+
+from pulsarity.extensions import PulsarityApp
+from pulsarity.events import RaceSequenceEvt
+from pulsarity.race.enums import RankingMethod
+from pulsarity.race.leaderboard import Leaderboard
+from pulsarity.race.laps import CrossingRecord
+
+
+def test_pilot_statistics():
+    leaderboard = Leaderboard(consecutive_count=2)
+
+    for timestamp in (1.0, 11.0, 20.0, 32.0, 40.0):
+        leaderboard.add_crossing(1, timestamp)
+
+    (standing,) = leaderboard.standings
+    assert standing.laps == 4
+    assert standing.total_time == 40.0
+    assert standing.fastest_lap == 8.0
+    assert standing.consecutive == 19.0
+
+
+def test_no_holeshot():
+    leaderboard = Leaderboard(holeshot=False)
+    leaderboard.add_crossing(1, 5.0)
+
+    (standing,) = leaderboard.standings
+    assert standing.laps == 1
+    assert standing.fastest_lap == 5.0
+
+
+@pytest.mark.parametrize("ranking", list(RankingMethod))
+def test_ranking_order(ranking: RankingMethod):
+    leaderboard = Leaderboard(ranking=ranking)
+    rng = random.Random(1)
+    times = {pilot_id: 0.0 for pilot_id in range(1, 17)}
+
+    for _ in range(500):
+        pilot_id = rng.choice(list(times))
+        times[pilot_id] += rng.uniform(5.0, 15.0)
+
+        before = [standing.pilot_id for standing in leaderboard.standings]
+        delta = leaderboard.add_crossing(pilot_id, times[pilot_id])
+        after = [standing.pilot_id for standing in leaderboard.standings]
+
+        assert after == sorted(
+            after, key=lambda id_: leaderboard._key(leaderboard._standings[id_])
+        )
+        assert after[delta.position - 1] == pilot_id
+        for moved_id, position in delta.moved:
+            assert after[position - 1] == moved_id
+
+        changed = {
+            id_
+            for id_ in before
+            if id_ != pilot_id and after.index(id_) != before.index(id_)
+        }
+        assert changed == {moved_id for moved_id, _ in delta.moved}
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_updates(app: PulsarityApp, _setup_database):
+    updates = []
+
+    async def _subscriber():
+        async for _, _, event_id, _, data in app.event_broker.subscribe():
+            if event_id == RaceSequenceEvt.LEADERBOARD_UPDATE.id:
+                updates.append(data)
+
+    async with app.test_app(), app.app_context():
+        subscriber = asyncio.create_task(_subscriber())
+        await asyncio.sleep(0)
+
+        manager = app.race_manager
+        start = asyncio.get_running_loop().time()
+        manager.lap_recorder.begin(start)
+
+        for pilot_id, offset in ((1, 1.0), (2, 1.5), (2, 9.0), (1, 10.0)):
+            manager.lap_recorder.record(
+                CrossingRecord(pilot_id - 1, pilot_id, start + offset, 150.0)
+            )
+
+        manager.lap_recorder.end()
+        await asyncio.gather(*app.background_tasks)
+        await asyncio.sleep(0)
+        subscriber.cancel()
+
+    assert sorted(update["version"] for update in updates) == [1, 2, 3, 4]
+
+    update = next(update for update in updates if update["version"] == 3)
+    assert update["rows"] == [
+        {"pilot_id": 2, "laps": 1, "total_time": 9.0, "fastest_lap": 7.5, "position": 1}
+    ]
+    assert update["moves"] == [(1, 2)]
+    assert [standing.pilot_id for standing in manager.leaderboard.standings] == [2, 1]
+
+
+def test_diffs_resume_snapshot():
+    leaderboard = Leaderboard()
+    rng = random.Random(2)
+    times = {pilot_id: 0.0 for pilot_id in range(1, 9)}
+
+    for _ in range(20):
+        pilot_id = rng.choice(list(times))
+        times[pilot_id] += rng.uniform(5.0, 15.0)
+        leaderboard.add_crossing(pilot_id, times[pilot_id])
+
+    snapshot = leaderboard.snapshot()
+    assert leaderboard.snapshot() is snapshot
+
+    rows = {row["pilot_id"]: dict(row) for row in snapshot["standings"]}
+    version = snapshot["version"]
+
+    for _ in range(200):
+        pilot_id = rng.choice(list(times))
+        times[pilot_id] += rng.uniform(5.0, 15.0)
+        diff = leaderboard.add_crossing(pilot_id, times[pilot_id]).to_dict()
+
+        assert diff["version"] == version + 1
+        version = diff["version"]
+
+        for row in diff["rows"]:
+            rows.setdefault(row["pilot_id"], {}).update(row)
+        for moved_id, position in diff["moves"]:
+            rows[moved_id]["position"] = position
+
+    expected = leaderboard.snapshot()
+    assert expected["version"] == version
+    assert (
+        sorted(rows.values(), key=lambda row: row["position"]) == expected["standings"]
+    )
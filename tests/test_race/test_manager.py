@@ -5,6 +5,7 @@ import asyncio
 from pulsarity.extensions import PulsarityApp
 from pulsarity.race.enums import RaceStatus
 from pulsarity.database import RaceSchedule
+from pulsarity.events import RaceSequenceEvt
 
 
 async def future_schedule(app_: PulsarityApp, limited_schedule_: RaceSchedule):
@@ -65,7 +66,7 @@ async def test_limited_sequence(app: PulsarityApp, limited_schedule: RaceSchedul
     await asyncio.sleep(limited_schedule.overtime_sec)
 
     assert app.race_manager.status == RaceStatus.STOPPED
-    assert app.race_manager._program_handle is None
+    assert not app.race_manager._program_handles
 
 
 @pytest.mark.asyncio
@@ -78,7 +79,7 @@ async def test_scheduled_stopped(app: PulsarityApp, limited_schedule: RaceSchedu
     await cancel_race(app)
 
     assert app.race_manager.status == RaceStatus.READY
-    assert app.race_manager._program_handle is None
+    assert not app.race_manager._program_handles
 
 
 @pytest.mark.asyncio
@@ -95,11 +96,27 @@ async def test_staging_stopped(app: PulsarityApp, limited_schedule: RaceSchedule
     await cancel_race(app)
 
     assert app.race_manager.status == RaceStatus.READY
-    assert app.race_manager._program_handle is None
+    assert not app.race_manager._program_handles
+
+
+def _record_transitions(app_: PulsarityApp, *events: RaceSequenceEvt) -> dict:
+    broadcasts: dict[str, dict] = {}
+
+    for event in events:
+
+        async def callback(event_=event, **data):
+            broadcasts[event_.id] = data
+
+        app_.event_broker.register_event_callback(event, callback)
+
+    return broadcasts
 
 
 @pytest.mark.asyncio
 async def test_racing_stopped(app: PulsarityApp, limited_schedule: RaceSchedule):
+    broadcasts = _record_transitions(
+        app, RaceSequenceEvt.RACE_FINISH, RaceSequenceEvt.RACE_STOP
+    )
 
     offset = await future_schedule(app, limited_schedule)
 
@@ -112,13 +129,20 @@ async def test_racing_stopped(app: PulsarityApp, limited_schedule: RaceSchedule)
     assert app.race_manager.status == RaceStatus.RACING
 
     await cancel_race(app)
+    await asyncio.sleep(0.1)
 
     assert app.race_manager.status == RaceStatus.STOPPED
-    assert app.race_manager._program_handle is None
+    assert not app.race_manager._program_handles
+    assert broadcasts[RaceSequenceEvt.RACE_FINISH.id]["time"] is not None
+    assert (
+        broadcasts[RaceSequenceEvt.RACE_STOP.id]
+        == broadcasts[RaceSequenceEvt.RACE_FINISH.id]
+    )
 
 
 @pytest.mark.asyncio
 async def test_overtime_stopped(app: PulsarityApp, limited_schedule: RaceSchedule):
+    broadcasts = _record_transitions(app, RaceSequenceEvt.RACE_STOP)
 
     offset = await future_schedule(app, limited_schedule)
 
@@ -133,9 +157,11 @@ async def test_overtime_stopped(app: PulsarityApp, limited_schedule: RaceSchedul
     assert app.race_manager.status == RaceStatus.OVERTIME
 
     await cancel_race(app)
+    await asyncio.sleep(0.1)
 
     assert app.race_manager.status == RaceStatus.STOPPED
-    assert app.race_manager._program_handle is None
+    assert not app.race_manager._program_handles
+    assert broadcasts[RaceSequenceEvt.RACE_STOP.id]["time"] is not None
 
 
 @pytest.mark.asyncio
@@ -154,7 +180,7 @@ async def test_no_overtime(app: PulsarityApp, limited_no_ot_schedule: RaceSchedu
     await asyncio.sleep(limited_no_ot_schedule.race_time_sec)
 
     assert app.race_manager.status == RaceStatus.STOPPED
-    assert app.race_manager._program_handle is None
+    assert not app.race_manager._program_handles
 
 
 @pytest.mark.asyncio
@@ -175,4 +201,37 @@ async def test_unlimited_sequence(app: PulsarityApp, unlimited_schedule: RaceSch
     await asyncio.sleep(unlimited_schedule.race_time_sec)
 
     assert app.race_manager.status == RaceStatus.RACING
-    assert app.race_manager._program_handle is None
+    assert not app.race_manager._program_handles
+
+
+@pytest.mark.asyncio
+async def test_start_reveal(app: PulsarityApp):
+    schedule = RaceSchedule(1, 1000, False, 5, 0)
+    broadcasts: dict[str, dict] = {}
+
+    async def schedule_callback(**data):
+        broadcasts["schedule"] = data
+
+    async def reveal_callback(**data):
+        broadcasts["reveal"] = data
+
+    app.event_broker.register_event_callback(
+        RaceSequenceEvt.RACE_SCHEDULE, schedule_callback
+    )
+    app.event_broker.register_event_callback(
+        RaceSequenceEvt.RACE_START_REVEAL, reveal_callback
+    )
+
+    offset = await future_schedule(app, schedule)
+    await asyncio.sleep(0.1)
+
+    assert broadcasts["schedule"]["stage"] is not None
+    assert broadcasts["schedule"]["start"] is None
+    assert RaceSequenceEvt.RACE_START_REVEAL.id in app.race_manager._program_handles
+
+    await asyncio.sleep(offset + schedule.stage_time_sec + 1)
+
+    assert app.race_manager.status == RaceStatus.RACING
+    assert broadcasts["reveal"]["start"] is not None
+
+    await cancel_race(app)
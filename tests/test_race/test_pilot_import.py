@@ -0,0 +1,74 @@
+import pytest
+
+from pulsarity.extensions import PulsarityApp
+from pulsarity.database import Pilot, PilotAttribute
+from pulsarity.race.pilot_import import (
+    csv_rows,
+    ndjson_rows,
+    iterate_rows,
+    import_pilots,
+    parse_pilot,
+)
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def test_parse_pilot():
+    pilot, attributes = parse_pilot({"callsign": " pilot ", "team": "red", "club": ""})
+    assert pilot == {"callsign": "pilot", "name": "", "phonetic": ""}
+    assert attributes == {"team": "red"}
+
+    _, attributes = parse_pilot({"callsign": "pilot", "attributes": {"class": 2}})
+    assert attributes == {"class": "2"}
+
+    for row in ({"name": "no callsign"}, {"callsign": 5}, {"callsign": "a" * 81}, []):
+        with pytest.raises(ValueError):
+            parse_pilot(row)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 7, 4096])
+async def test_csv_rows(size: int):
+    data = 'Callsign,Name,Team\npilot1,"One, First",red\npilot2,"Two\nLines",blue\n'
+    rows = [row async for row in csv_rows(_chunks(data.encode(), size))]
+
+    assert rows == [
+        {"callsign": "pilot1", "name": "One, First", "team": "red"},
+        {"callsign": "pilot2", "name": "Two\nLines", "team": "blue"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rows():
+    data = b'{"callsign": "pilot1"}\n\nnot json\n{"callsign": "pilot2"}'
+    rows = [row async for row in ndjson_rows(_chunks(data, 5))]
+
+    assert rows[0] == {"callsign": "pilot1"}
+    assert isinstance(rows[1], ValueError)
+    assert rows[2] == {"callsign": "pilot2"}
+
+
+@pytest.mark.asyncio
+async def test_import_pilots(app: PulsarityApp, _setup_database):
+    await Pilot.create(callsign="Existing", name="", phonetic="")
+
+    rows = [
+        {"callsign": f"pilot{i}", "attributes": {"team": str(i % 3)}} for i in range(25)
+    ]
+    rows += [{"callsign": "PILOT3"}, {"callsign": "existing"}, {"name": "invalid"}]
+
+    async with app.app_context():
+        summary = await import_pilots(iterate_rows(rows), batch_size=10)
+
+    assert summary.created == 25
+    assert summary.skipped == 2
+    assert summary.failed == 1
+    assert summary.errors == [{"row": 28, "error": "callsign is required"}]
+
+    assert await Pilot.all().count() == 26
+    pilot = await Pilot.get(callsign="pilot7")
+    attribute = await PilotAttribute.get(pilot=pilot)
+    assert (attribute.name, attribute.value) == ("team", "1")
@@ -0,0 +1,100 @@
+import pytest
+
+from pulsarity.extensions import PulsarityApp
+from pulsarity.database import SavedRace, Lap
+from pulsarity.race import marshal
+from pulsarity.race.results import EventResults
+
+
+async def _saved_race(laps: dict[int, list[float]]) -> SavedRace:
+    race = await SavedRace.create(start_time=0.0)
+    for pilot_id, timestamps in laps.items():
+        for timestamp in timestamps:
+            await Lap.create(
+                race=race,
+                node_index=0,
+                pilot_id=pilot_id,
+                timestamp=timestamp,
+                peak_rssi=0.0,
+            )
+
+    return race
+
+
+@pytest.mark.asyncio
+async def test_results_load(_setup_database):
+    await _saved_race({1: [1.0, 11.0, 21.0], 2: [1.5, 13.5]})
+    await _saved_race({1: [1.0, 12.0], 2: [1.5, 10.5, 19.5]})
+
+    results = EventResults()
+    await results.load()
+
+    totals = results.totals()
+    assert [row["pilot_id"] for row in totals] == [1, 2]
+    assert totals[0]["races"] == 2
+    assert totals[0]["laps"] == 3
+    assert totals[0]["fastest_lap"] == 10.0
+    assert totals[1]["laps"] == 3
+    assert totals[1]["fastest_lap"] == 9.0
+
+    assert await results.refresh() is None
+
+
+@pytest.mark.asyncio
+async def test_results_incremental(_setup_database):
+    race = await _saved_race({1: [1.0, 11.0, 21.0], 2: [1.5, 13.5], 3: [2.0]})
+
+    results = EventResults()
+    await results.load()
+    assert [row["pilot_id"] for row in results.totals()] == [1, 2, 3]
+
+    for timestamp in (23.0, 31.0):
+        await Lap.create(
+            race=race, node_index=0, pilot_id=2, timestamp=timestamp, peak_rssi=0.0
+        )
+    results.invalidate(race.id, 2)
+
+    changes = await results.refresh()
+    assert changes is not None
+    assert [entry["race_id"] for entry in changes["races"]] == [race.id]
+    assert [row["pilot_id"] for row in changes["totals"]] == [2]
+    assert changes["totals"][0]["position"] == 1
+    assert changes["moves"] == [(1, 2)]
+
+    assert [row["pilot_id"] for row in results.totals()] == [2, 1, 3]
+    assert results.race_standings(race.id)[0]["pilot_id"] == 2
+
+    await Lap.filter(race_id=race.id, pilot_id=3).delete()
+    results.invalidate(race.id, 3)
+
+    changes = await results.refresh()
+    assert changes is not None
+    assert changes["totals"] == [{"pilot_id": 3, "position": None}]
+    assert [row["pilot_id"] for row in results.totals()] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_marshal_laps(app: PulsarityApp, _setup_database):
+    race = await _saved_race({1: [1.0, 11.0], 2: [1.5, 13.5, 25.0]})
+    results = app.race_manager.results
+
+    async with app.app_context():
+        await results.load()
+        assert results.totals()[0]["pilot_id"] == 2
+
+        added = await marshal.add_lap(race.uuid, 1, 20.5)
+        assert added is not None
+        assert added["race_uuid"] == str(race.uuid)
+        assert results.totals()[0]["pilot_id"] == 1
+
+        altered = await marshal.alter_lap(added["id"], pilot_id=2)
+        assert altered is not None
+        assert altered["pilot_id"] == 2
+        assert [row["laps"] for row in results.totals()] == [3, 1]
+
+        deleted = await marshal.delete_lap(added["id"])
+        assert deleted is not None
+        assert await Lap.get_or_none(id=added["id"]) is None
+        assert [row["laps"] for row in results.totals()] == [2, 1]
+
+        assert await marshal.delete_lap(added["id"]) is None
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from pulsarity.database import Pilot, PilotAttribute
+from pulsarity.race.roster import PilotRoster, pilot_batches
+
+
+@pytest.mark.asyncio
+async def test_roster_load(_setup_database):
+    pilot = await Pilot.create(callsign="pilot1", name="Pilot One", phonetic="")
+    await PilotAttribute.create(pilot=pilot, name="team", value="red")
+
+    roster = PilotRoster()
+    data = await roster.get(pilot.id)
+
+    assert data is not None
+    assert data["callsign"] == "pilot1"
+    assert data["active"] is True
+    assert data["attributes"] == [
+        {"id": 1, "name": "team", "value": "red"},
+    ]
+    assert await roster.get(pilot.id + 1) is None
+
+
+@pytest.mark.asyncio
+async def test_roster_callbacks(_setup_database):
+    roster = PilotRoster()
+    assert await roster.all() == []
+
+    encoded = await roster.encoded()
+    assert json.loads(encoded) == []
+    assert await roster.encoded() is encoded
+
+    pilot = await Pilot.create(callsign="pilot1", name="", phonetic="")
+    await roster.pilot_changed(id=pilot.id)
+    assert [data["id"] for data in await roster.all()] == [pilot.id]
+
+    encoded = await roster.encoded()
+    assert json.loads(encoded)[0]["callsign"] == "pilot1"
+
+    pilot.callsign = "renamed"
+    await pilot.save()
+    await PilotAttribute.create(pilot=pilot, name="team", value="blue")
+    await roster.pilot_changed(id=pilot.id)
+
+    data = await roster.get(pilot.id)
+    assert data is not None
+    assert data["callsign"] == "renamed"
+    assert data["attributes"][0]["value"] == "blue"
+    assert await roster.encoded() is not encoded
+
+    version = roster.version
+    await roster.pilot_deleted(id=pilot.id)
+    assert roster.version == version + 1
+    assert await roster.get(pilot.id) is None
+
+
+@pytest.mark.asyncio
+async def test_pilot_batches(_setup_database):
+    pilots = [
+        await Pilot.create(callsign=f"pilot{i}", name="", phonetic="") for i in range(7)
+    ]
+    await PilotAttribute.create(pilot=pilots[3], name="team", value="red")
+
+    batches = [batch async for batch in pilot_batches(batch_size=3)]
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert batches[1][0]["attributes"][0]["value"] == "red"
+
+    batches = [batch async for batch in pilot_batches(pilots[5].id, batch_size=3)]
+    assert [data["id"] for batch in batches for data in batch] == [pilots[6].id]
@@ -0,0 +1,33 @@
+from pulsarity.race.enums import RaceStatus
+from pulsarity.race.timeline import RaceTimeline
+from pulsarity.database import RaceSchedule
+
+
+def test_limited_timeline(limited_schedule: RaceSchedule):
+    timeline = RaceTimeline.from_schedule(limited_schedule, 10.0, 13.0)
+
+    assert timeline.finish == 13.0 + limited_schedule.race_time_sec
+    assert timeline.stop == timeline.finish + limited_schedule.overtime_sec
+
+    assert timeline.status_at(9.0) == RaceStatus.SCHEDULED
+    assert timeline.status_at(11.0) == RaceStatus.STAGING
+    assert timeline.status_at(14.0) == RaceStatus.RACING
+    assert timeline.status_at(timeline.finish) == RaceStatus.OVERTIME
+    assert timeline.status_at(timeline.stop) == RaceStatus.STOPPED
+
+
+def test_unlimited_timeline(unlimited_schedule: RaceSchedule):
+    timeline = RaceTimeline.from_schedule(unlimited_schedule, 10.0, 15.0)
+
+    assert timeline.finish is None
+    assert timeline.stop is None
+    assert timeline.status_at(1000.0) == RaceStatus.RACING
+
+
+def test_unlimited_overtime_timeline():
+    schedule = RaceSchedule(3, 0, False, 5, -1)
+    timeline = RaceTimeline.from_schedule(schedule, 10.0, 13.0)
+
+    assert timeline.finish == 18.0
+    assert timeline.stop is None
+    assert timeline.status_at(1000.0) == RaceStatus.OVERTIME
@@ -1,10 +1,14 @@
+import json
+
 import pytest
 
 from quart.typing import TestClientProtocol
 from quart_auth import authenticated_client
 
 from pulsarity.extensions import PulsarityApp
-from pulsarity.database import User
+from pulsarity.database import User, SavedRace, Lap, Pilot
+from pulsarity.utils.executor import executor
+from pulsarity.database.instrumentation import query_timer
 
 
 async def webserver_login_valid(
@@ -101,3 +105,279 @@ async def test_password_reset_valid(
 
         reset_required = await webserver_login_valid(client, new_creds)
         assert reset_required is False
+
+
+@pytest.mark.asyncio
+async def test_pilots(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    pilot = await Pilot.create(callsign="pilot", name="", phonetic="")
+
+    async with authenticated_client(client, user.auth_id.hex):
+        response = await client.get(f"/api/pilot/{pilot.id}")
+        assert response.status_code == 200
+
+        data = await response.get_json()
+        assert data["callsign"] == "pilot"
+        assert data["attributes"] == []
+
+        response = await client.get(f"/api/pilot/{pilot.id + 1}")
+        assert response.status_code == 404
+
+        await app.race_manager.roster.pilot_deleted(id=pilot.id)
+
+        response = await client.get("/api/pilot/all")
+        assert response.status_code == 200
+        assert await response.get_json() == []
+
+
+@pytest.mark.asyncio
+async def test_pilot_pages(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    for i in range(5):
+        await Pilot.create(callsign=f"pilot{i}", name="", phonetic="")
+
+    async with authenticated_client(client, user.auth_id.hex):
+        response = await client.get("/api/pilot/page", query_string={"limit": 2})
+        assert response.status_code == 200
+
+        data = await response.get_json()
+        assert [pilot["callsign"] for pilot in data["pilots"]] == ["pilot0", "pilot1"]
+
+        query = {"limit": 3, "after": data["next_after"]}
+        response = await client.get("/api/pilot/page", query_string=query)
+        data = await response.get_json()
+        assert len(data["pilots"]) == 3
+        assert data["next_after"] is None
+
+        response = await client.get("/api/pilot/stream", query_string={"batch_size": 2})
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+
+        lines = (await response.get_data(as_text=True)).splitlines()
+        assert [json.loads(line)["callsign"] for line in lines] == [
+            f"pilot{i}" for i in range(5)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_pilot_import(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    data = "callsign,name,team\npilot1,One,red\npilot2,Two,\npilot1,Again,blue\n"
+
+    async with authenticated_client(client, user.auth_id.hex):
+        response = await client.post(
+            "/api/pilot/import", data=data, headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == 200
+        assert await response.get_json() == {
+            "created": 2,
+            "skipped": 1,
+            "failed": 0,
+            "errors": [],
+        }
+
+        response = await client.post("/api/pilot/import", json=[{"name": "invalid"}])
+        assert response.status_code == 200
+        assert (await response.get_json())["failed"] == 1
+
+        response = await client.post("/api/pilot/import", json={"callsign": "pilot3"})
+        assert response.status_code == 400
+
+        response = await client.post(
+            "/api/pilot/import", data="", headers={"Content-Type": "text/plain"}
+        )
+        assert response.status_code == 415
+
+    assert await Pilot.all().count() == 2
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_snapshot(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    leaderboard = app.race_manager.leaderboard
+    leaderboard.add_crossing(1, 2.0)
+    leaderboard.add_crossing(1, 12.0)
+
+    async with authenticated_client(client, user.auth_id.hex):
+        response = await client.get("/api/leaderboard")
+        assert response.status_code == 200
+
+        data = await response.get_json()
+
+    assert data["version"] == leaderboard.version
+    assert data["standings"] == [
+        {
+            "pilot_id": 1,
+            "position": 1,
+            "laps": 1,
+            "total_time": 12.0,
+            "fastest_lap": 10.0,
+            "consecutive": None,
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lap_marshaling(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    race = await SavedRace.create(start_time=0.0)
+
+    async with authenticated_client(client, user.auth_id.hex):
+        lap_data = {"race_uuid": str(race.uuid), "pilot_id": 1, "timestamp": 12.0}
+        response = await client.post("/api/lap", json=lap_data)
+        assert response.status_code == 200
+
+        data = await response.get_json()
+        assert data["pilot_id"] == 1
+        lap_id = data["id"]
+
+        response = await client.patch(f"/api/lap/{lap_id}", json={"timestamp": 11.5})
+        assert response.status_code == 200
+
+        data = await response.get_json()
+        assert data["timestamp"] == 11.5
+
+        response = await client.delete(f"/api/lap/{lap_id}")
+        assert response.status_code == 200
+
+        response = await client.delete(f"/api/lap/{lap_id}")
+        assert response.status_code == 404
+
+    assert await Lap.filter(race=race).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_frequencies(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    pilot = Pilot(callsign="pilot")
+    pilot.used_frequencies = "[5695]"
+    await pilot.save()
+
+    executor.set_executor()
+
+    try:
+        async with authenticated_client(client, user.auth_id.hex):
+            request = {"pilot_ids": [pilot.id], "count": 4, "bands": ["R"]}
+            response = await client.post("/api/frequencies", json=request)
+            assert response.status_code == 200
+
+            data = await response.get_json()
+
+            for request in (
+                {"pilot_ids": list(range(9))},
+                {"pilot_ids": [pilot.id], "count": 9},
+                {"pilot_ids": [pilot.id], "min_spacing": 0},
+            ):
+                response = await client.post("/api/frequencies", json=request)
+                assert response.status_code == 400
+    finally:
+        await executor.shutdown_executor()
+
+    assert len(data["frequencies"]) == 4
+    assert data["assignments"] == [{"pilot_id": pilot.id, "frequency": 5695}]
+
+
+@pytest.mark.asyncio
+async def test_generate_heats_invalid(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    async with authenticated_client(client, user.auth_id.hex):
+        for frequencies in ([5658, 5695, 5658], list(range(5600, 5960, 40))):
+            response = await client.post(
+                "/api/heats/generate", json={"frequencies": frequencies}
+            )
+            assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_events(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    async with authenticated_client(client, user.auth_id.hex):
+        response = await client.get("/api/event")
+        assert response.status_code == 200
+        assert (await response.get_json())["active"] is None
+
+        response = await client.post("/api/event/switch", json={"name": "../x"})
+        assert response.status_code == 400
+
+        response = await client.post(
+            "/api/event/archive", json={"name": "missing-event"}
+        )
+        assert response.status_code == 404
+
+        response = await client.get("/api/event/archive/missing-event")
+        assert response.status_code == 404
+
+        response = await client.get("/api/event/archive/.hidden")
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_query_timing(
+    app: PulsarityApp, default_user_creds: tuple[str], _setup_database
+):
+    client: TestClientProtocol = app.test_client()
+
+    user = await User.get_by_username(default_user_creds[0])
+    assert user is not None
+
+    query_timer.install()
+    try:
+        async with authenticated_client(client, user.auth_id.hex):
+            response = await client.get("/api/system/queries")
+            assert response.status_code == 200
+            data = await response.get_json()
+            assert {query["model"] for query in data["queries"]} >= {"User"}
+
+            response = await client.delete("/api/system/queries")
+            assert response.status_code == 200
+            assert not query_timer.stats
+    finally:
+        query_timer.uninstall()
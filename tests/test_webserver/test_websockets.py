@@ -7,6 +7,12 @@ from quart.typing import TestClientProtocol
 
 from pulsarity.extensions import PulsarityApp
 from pulsarity.database import User
+from pulsarity.webserver.websockets import (
+    WSEventData,
+    add_lap,
+    alter_lap,
+    delete_lap,
+)
 
 
 @pytest.mark.asyncio
@@ -44,3 +50,18 @@ async def test_server_websocket_auth(
             recieved = await test_websocket.receive_json()
 
         assert recieved == payload
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "handler, data",
+    [
+        (add_lap, {"race_uuid": "invalid"}),
+        (alter_lap, {"timestamp": 1.0}),
+        (alter_lap, {"id": "one"}),
+        (delete_lap, {}),
+    ],
+)
+async def test_malformed_lap_events(handler, data: dict):
+    ws_data = WSEventData(id=uuid.uuid4(), event_id="lap", data=data)
+    await handler(ws_data)